@@ -0,0 +1 @@
+"""Micro-benchmarks for the logic modules (run with `python -m backend.bench.<name>`)."""
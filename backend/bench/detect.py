@@ -0,0 +1,79 @@
+"""Benchmark the array-backed drain detector against the original list-based scan.
+
+    python -m backend.bench.detect [sizes...]
+
+Each size is the number of level points in a single synthetic series. Both
+implementations run on the same input and their events must be identical;
+the original is frozen in tests/legacy.py, so run this from the repository
+root.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from backend.logic import detect
+from tests.legacy import detect_run as legacy_run
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def synthetic_series(n: int, *, seed: int = 7) -> List[list]:
+    """Minute-resolution fill curve with noise and a drain roughly every 6 hours."""
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    points: List[list] = []
+    volume = 300.0
+    drain_left = 0
+    for i in range(n):
+        if drain_left == 0 and rng.random() < 1 / 360:
+            drain_left = rng.randint(4, 30)
+        if drain_left:
+            volume -= rng.uniform(3.0, 8.0)
+            drain_left -= 1
+        else:
+            volume += 0.9
+        volume = max(0.0, min(1000.0, volume))
+        ts = (start + timedelta(minutes=i)).isoformat().replace("+00:00", "Z")
+        points.append([ts, round(volume + rng.gauss(0.0, 0.4), 2)])
+    return points
+
+
+def bench(n: int) -> Dict[str, float]:
+    payload = {"series": [{"cauldron_id": "C1", "r_fill": 0.9, "points": synthetic_series(n)}]}
+
+    t0 = time.perf_counter()
+    legacy = legacy_run(payload)
+    t1 = time.perf_counter()
+    vectorized = detect.run(payload)
+    t2 = time.perf_counter()
+
+    if legacy != vectorized:
+        raise AssertionError(f"event mismatch at n={n}")
+    return {
+        "points": n,
+        "events": len(vectorized["drain_events"]),
+        "legacy_s": t1 - t0,
+        "vectorized_s": t2 - t1,
+        "speedup": (t1 - t0) / max(t2 - t1, 1e-9),
+    }
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(arg) for arg in argv] or list(DEFAULT_SIZES)
+    print(f"{'points':>10} {'events':>7} {'legacy s':>10} {'vector s':>10} {'speedup':>8}")
+    for n in sizes:
+        row = bench(n)
+        print(
+            f"{row['points']:>10} {row['events']:>7} {row['legacy_s']:>10.3f} "
+            f"{row['vectorized_s']:>10.3f} {row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+"""Benchmark the array-based forecast simulator against the original minute loop.
+
+    python -m backend.bench.forecast [cauldrons...]
+
+Each size is the number of cauldrons forecast over HORIZON minutes. Noise
+is switched off so both simulators are deterministic and their series
+must agree to the rounding of the output.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from backend.logic import forecast
+
+DEFAULT_SIZES = (10, 100, 1_000)
+HORIZON = 1440
+LEGACY_MAX = 100
+
+
+def _legacy_run(input_json: Dict) -> Dict:
+    """Frozen copy of the pre-vectorization ``forecast.run`` minus the noise term."""
+
+    H = int(input_json.get("horizon_min", 240))
+    cur = input_json["current"]
+    vmax = float(cur["vmax"])
+    last_val = float(cur["volume"])
+    r = float(cur.get("r_fill", 0.0))
+    now = datetime.fromisoformat(cur["ts"].replace("Z", "+00:00")).astimezone(timezone.utc)
+    drains = input_json.get("scheduled_drains", [])
+    history = input_json.get("history", [])
+    slope_per_min = 0.6 * forecast._learn_slope(history, r) + 0.4 * r
+
+    series = []
+    if history:
+        series.extend((ts, float(v)) for ts, v in sorted(history, key=lambda p: p[0])[-180:])
+    series.append((forecast._iso(now), round(last_val, 2)))
+    overflow: Optional[str] = None
+    for m in range(1, H + 1):
+        t = now + timedelta(minutes=m)
+        net = slope_per_min
+        for d in drains:
+            dt = datetime.fromisoformat(d["ts"].replace("Z", "+00:00")).astimezone(timezone.utc)
+            if 0 <= (t - dt).total_seconds() / 60.0 < int(d.get("minutes", 0)):
+                net += float(d.get("rate", 0.0))
+        last_val = max(0.0, min(vmax, last_val + net))
+        ts = forecast._iso(t)
+        series.append((ts, round(last_val, 2)))
+        if overflow is None and abs(last_val - vmax) < 1e-6:
+            overflow = ts
+    return {"now_ts": forecast._iso(now), "overflow_eta": overflow, "series": series}
+
+
+def synthetic_items(n: int, *, seed: int = 5) -> List[Dict]:
+    """n cauldrons with 60 minutes of history and a few scheduled drains each."""
+
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for _ in range(n):
+        volume = rng.uniform(100.0, 900.0)
+        items.append({
+            "horizon_min": HORIZON,
+            "current": {"ts": forecast._iso(now), "volume": volume, "vmax": 1000.0, "r_fill": rng.uniform(0.2, 1.5)},
+            "scheduled_drains": [
+                {"ts": forecast._iso(now + timedelta(minutes=rng.randrange(HORIZON))), "minutes": rng.randint(5, 30), "rate": -rng.uniform(3.0, 8.0)}
+                for _ in range(rng.randint(0, 4))
+            ],
+            "history": [
+                [forecast._iso(now - timedelta(minutes=k)), volume - 0.9 * k + rng.gauss(0.0, 0.5)]
+                for k in range(60, 0, -1)
+            ],
+            "noise_sigma": 0.0,
+        })
+    return items
+
+
+def bench(n: int) -> Dict[str, Optional[float]]:
+    items = synthetic_items(n)
+
+    t0 = time.perf_counter()
+    batch = forecast.run_batch(items)
+    t1 = time.perf_counter()
+
+    legacy_s = None
+    if n <= LEGACY_MAX:
+        legacy = [_legacy_run(item) for item in items]
+        legacy_s = time.perf_counter() - t1
+        for old, new in zip(legacy, batch):
+            if old["overflow_eta"] != new["overflow_eta"] or any(
+                a[0] != b[0] or abs(a[1] - b[1]) > 0.011 for a, b in zip(old["series"], new["series"])
+            ):
+                raise AssertionError(f"forecast mismatch at n={n}")
+    return {"cauldrons": n, "batch_s": t1 - t0, "legacy_s": legacy_s}
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(arg) for arg in argv] or list(DEFAULT_SIZES)
+    print(f"{'cauldrons':>9} {'minutes':>8} {'batch s':>10} {'legacy s':>10}")
+    for n in sizes:
+        row = bench(n)
+        legacy = f"{row['legacy_s']:>10.3f}" if row["legacy_s"] is not None else f"{'skipped':>10}"
+        print(f"{n:>9} {HORIZON:>8} {row['batch_s']:>10.3f} {legacy}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
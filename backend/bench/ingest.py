@@ -0,0 +1,125 @@
+"""Benchmark bulk level ingestion against the original row-per-object path.
+
+    python -m backend.bench.ingest [cauldrons...]
+
+Each size is a number of cauldrons with DAYS of one-minute readings,
+written to a scratch SQLite file. The bulk path is run twice to show that
+re-ingesting the same rows inserts nothing; the original path (one ORM
+object and one ``session.add`` per row) is only run up to LEGACY_MAX.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from backend.core import models, queries
+from backend.core.db import Base
+
+DEFAULT_SIZES = (10, 100)
+DAYS = 30
+LEGACY_MAX = 2
+
+
+def _legacy_record_levels(session: Session, cauldron_id: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """Frozen copy of the per-row ``record_levels`` (without the derived tables)."""
+
+    count = 0
+    for row in rows:
+        observed_at = queries._safe_datetime(row.get("timestamp") or row.get("observed_at"))
+        if not observed_at:
+            continue
+        session.add(
+            models.CauldronLevel(
+                cauldron_id=cauldron_id,
+                observed_at=observed_at,
+                volume=queries._safe_float(row.get("volume")),
+                fill_percent=queries._safe_float(row.get("fill_percent")),
+                payload=row,
+            )
+        )
+        count += 1
+    return count
+
+
+def synthetic_rows(n: int, *, days: int = DAYS, seed: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+    """``days`` of one-minute readings for n cauldrons, as the seeder receives them."""
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    minutes = days * 1440
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for c in range(n):
+        volume = rng.uniform(100, 900)
+        rows = []
+        for i in range(minutes):
+            volume = min(1000.0, max(0.0, volume + rng.uniform(-2.0, 2.5)))
+            rows.append(
+                {
+                    "timestamp": (start + timedelta(minutes=i)).isoformat() + "Z",
+                    "volume": round(volume, 2),
+                    "fill_percent": round(volume / 10, 2),
+                }
+            )
+        out[f"cauldron_{c:03d}"] = rows
+    return out
+
+
+def _session() -> Session:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = Session(bind=engine, autoflush=False, future=True)
+    for cid in ("cauldron_%03d" % c for c in range(1000)):
+        session.add(models.Cauldron(id=cid, name=cid))
+    session.commit()
+    return session
+
+
+def bench(n: int) -> Dict[str, Optional[float]]:
+    rows = synthetic_rows(n)
+    total = sum(len(r) for r in rows.values())
+
+    session = _session()
+    t0 = time.perf_counter()
+    first = queries.ingest_levels(session, rows, commit=True)
+    t1 = time.perf_counter()
+    again = queries.ingest_levels(session, rows, commit=True)
+    t2 = time.perf_counter()
+    stored = session.execute(select(func.count()).select_from(models.CauldronLevel)).scalar()
+    session.close()
+    if first["inserted"] != total or again["duplicates"] != total or stored != total:
+        raise AssertionError(f"ingest mismatch at n={n}: {first} {again} stored={stored}")
+
+    legacy_s = None
+    if n <= LEGACY_MAX:
+        session = _session()
+        t3 = time.perf_counter()
+        for cid, cauldron_rows in rows.items():
+            _legacy_record_levels(session, cid, cauldron_rows)
+        session.commit()
+        legacy_s = time.perf_counter() - t3
+        session.close()
+    return {"cauldrons": n, "rows": total, "bulk_s": t1 - t0, "rerun_s": t2 - t1, "legacy_s": legacy_s}
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(arg) for arg in argv] or list(DEFAULT_SIZES)
+    print(f"{'cauldrons':>9} {'rows':>9} {'bulk s':>8} {'rerun s':>8} {'legacy s':>9}")
+    for n in sizes:
+        row = bench(n)
+        legacy = f"{row['legacy_s']:>9.2f}" if row["legacy_s"] is not None else f"{'skipped':>9}"
+        print(f"{n:>9} {row['rows']:>9} {row['bulk_s']:>8.2f} {row['rerun_s']:>8.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
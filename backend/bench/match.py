@@ -0,0 +1,74 @@
+"""Benchmark the indexed ticket/drain matcher against the original linear scan.
+
+    python -m backend.bench.match [sizes...]
+
+Each size is the number of tickets and of drain events. The original
+matcher (frozen in tests/legacy.py, so run this from the repository root)
+is quadratic, so it is only run (and compared for identical output) up to
+LEGACY_MAX.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from backend.logic import match
+from tests.legacy import match_run as legacy_run
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+LEGACY_MAX = 5_000
+
+
+def synthetic_payload(n: int, *, cauldrons: int = 100, seed: int = 11) -> Dict:
+    """n tickets and n drains; 10% of tickets carry no cauldron id."""
+
+    rng = random.Random(seed)
+    drains = [
+        {
+            "id": str(i),
+            "cauldron_id": f"C{rng.randrange(cauldrons)}",
+            "true_volume": round(rng.uniform(20.0, 200.0), 2),
+        }
+        for i in range(n)
+    ]
+    tickets = [
+        {
+            "id": f"T{i}",
+            "volume": round(rng.uniform(20.0, 200.0), 2),
+            "cauldron_id": None if rng.random() < 0.1 else f"C{rng.randrange(cauldrons)}",
+        }
+        for i in range(n)
+    ]
+    return {"tickets": tickets, "drain_events": drains}
+
+
+def bench(n: int) -> Dict[str, Optional[float]]:
+    payload = synthetic_payload(n)
+
+    t0 = time.perf_counter()
+    indexed = match.run(payload)
+    t1 = time.perf_counter()
+
+    legacy_s = None
+    if n <= LEGACY_MAX:
+        legacy = legacy_run(payload)
+        legacy_s = time.perf_counter() - t1
+        if legacy != indexed:
+            raise AssertionError(f"match mismatch at n={n}")
+    return {"size": n, "matches": len(indexed["matches"]), "indexed_s": t1 - t0, "legacy_s": legacy_s}
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(arg) for arg in argv] or list(DEFAULT_SIZES)
+    print(f"{'tickets':>8} {'drains':>8} {'matches':>8} {'indexed s':>10} {'legacy s':>10}")
+    for n in sizes:
+        row = bench(n)
+        legacy = f"{row['legacy_s']:>10.3f}" if row["legacy_s"] is not None else f"{'skipped':>10}"
+        print(f"{n:>8} {n:>8} {row['matches']:>8} {row['indexed_s']:>10.3f} {legacy}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,5 +1,5 @@
 """Core DB/ORM helpers."""
 
-from . import db, models, queries, seed  # noqa: F401
+from . import cache, db, models, queries, rollup, seed, version  # noqa: F401
 
-__all__ = ["db", "models", "queries", "seed"]
+__all__ = ["cache", "db", "models", "queries", "rollup", "seed", "version"]
@@ -0,0 +1,94 @@
+"""In-process cache for forecast results."""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "1024"))
+
+
+class ForecastCache:
+    """Bounded LRU of forecast results.
+
+    Keys are tuples whose first element is the cauldron id and whose second
+    is that cauldron's latest ``observed_at``; the rest are the forecast
+    parameters. A forecast can only change when a new level arrives, which
+    also changes the key, so ingest just evicts the cauldron's stale entries
+    to free their slots. Safe to share between request threads.
+    """
+
+    def __init__(self, capacity: int = FORECAST_CACHE_SIZE) -> None:
+        self.capacity = max(0, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._by_cauldron: Dict[str, Set[Tuple[Hashable, ...]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def seed(key: Tuple[Hashable, ...]) -> int:
+        """Noise seed for ``key``, so a recomputed entry reproduces the cached one."""
+
+        return zlib.crc32(repr(key).encode())
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """A deep copy of the cached value, so callers may mutate what they get back."""
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)  # bytes and str come back as-is
+
+    def put(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._by_cauldron.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.capacity:
+                old, _ = self._entries.popitem(last=False)
+                self._forget(old)
+
+    def invalidate(self, cauldron_id: str) -> int:
+        with self._lock:
+            keys = self._by_cauldron.pop(cauldron_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_cauldron.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "capacity": self.capacity,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def _forget(self, key: Tuple[Hashable, ...]) -> None:
+        keys = self._by_cauldron.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_cauldron[key[0]]
+
+
+forecast_cache = ForecastCache()
@@ -7,7 +7,7 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 
@@ -46,9 +46,67 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+# Rows a new unique index would reject, merged into the oldest copy before the index is built.
+_DEDUPE_LEVELS = """
+DELETE FROM levels WHERE id NOT IN (SELECT MIN(id) FROM levels GROUP BY cauldron_id, observed_at)
+"""
+_REPOINT_DRAIN_MATCHES = """
+UPDATE matches SET drain_event_id = (
+    SELECT MIN(twin.id) FROM drain_events AS event
+    JOIN drain_events AS twin
+      ON twin.cauldron_id = event.cauldron_id
+     AND COALESCE(twin.started_at, twin.detected_at) = COALESCE(event.started_at, event.detected_at)
+     AND twin.detected_at = event.detected_at
+    WHERE event.id = matches.drain_event_id
+)
+WHERE drain_event_id IS NOT NULL
+"""
+_DEDUPE_DRAINS = """
+DELETE FROM drain_events WHERE id NOT IN (
+    SELECT MIN(id) FROM drain_events GROUP BY cauldron_id, COALESCE(started_at, detected_at), detected_at
+)
+"""
+
+
+def _upgrade_schema() -> None:
+    """Bring tables created by an older version up to the current models.
+
+    ``create_all`` only creates missing tables, so columns and indexes added
+    to existing tables since are applied here. Rows a new unique index would
+    reject are merged into their oldest copy first (matches follow a merged
+    drain event). SQLite cannot add NOT NULL to an existing column, so
+    ``drain_events.started_at`` stays nullable there; writers always set it.
+    """
+
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        if "started_at" not in {column["name"] for column in inspector.get_columns("drain_events")}:
+            connection.execute(text("ALTER TABLE drain_events ADD COLUMN started_at DATETIME"))
+        indexes = {index["name"] for table in ("levels", "drain_events") for index in inspector.get_indexes(table)}
+        if "ux_levels_cauldron_observed" not in indexes:
+            connection.execute(text(_DEDUPE_LEVELS))
+        unstarted = connection.execute(text("SELECT 1 FROM drain_events WHERE started_at IS NULL LIMIT 1")).first()
+        if unstarted or "ux_drain_events_natural_key" not in indexes:
+            connection.execute(text(_REPOINT_DRAIN_MATCHES))
+            connection.execute(text(_DEDUPE_DRAINS))
+            connection.execute(text("UPDATE drain_events SET started_at = detected_at WHERE started_at IS NULL"))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
 def init_db() -> None:
-    """Create database tables if they do not yet exist."""
+    """Create or upgrade the schema, backfill tables derived from the levels and matches, sync the level store."""
 
     from . import models  # noqa: F401 ensure models are imported
+    from .levelstore import level_store, sync
+    from .queries import backfill_audit_findings, backfill_latest_levels, backfill_slope_states
 
     Base.metadata.create_all(bind=engine)
+    _upgrade_schema()
+    with session_scope() as session:
+        backfill_latest_levels(session)
+        backfill_slope_states(session)
+        backfill_audit_findings(session)
+        if level_store is not None:
+            sync(session, level_store)
@@ -0,0 +1,276 @@
+"""Append-only, memory-mapped column files for cauldron level history.
+
+    LEVEL_STORE=backend/data/levels python -m backend.core.levelstore   # rebuild from SQL
+
+Each cauldron gets a directory with three little-endian column files:
+``t.i64`` (epoch microseconds), ``v.f64`` (volume) and ``f.f64`` (fill
+percent), at the precision SQL stores them. Reads map the files and return slices of the mapping, so a range
+scan copies nothing. The SQL ``levels`` table stays the system of record;
+the store is enabled by pointing LEVEL_STORE at a directory, after which
+``queries.record_levels`` appends every new reading to it as well, once
+the transaction that stored the reading has committed. ``init_db`` calls
+``sync``, which rebuilds any cauldron whose columns lack readings SQL has
+(a store that was never built, or appends lost to a crash after commit).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from backend.logic.series import LevelSeries, to_epoch_us
+
+from .models import CauldronLevel
+
+LEVEL_STORE = os.getenv("LEVEL_STORE")
+_COLUMNS = (("t.i64", np.dtype("<i8")), ("v.f64", np.dtype("<f8")), ("f.f64", np.dtype("<f8")))
+_PENDING = "level_store_pending"
+# Suffixes of the directories a column rewrite goes through; quote() never emits "#".
+_NEW, _OLD = "#new", "#old"
+
+logger = logging.getLogger(__name__)
+
+Reading = Tuple[datetime, Optional[float], Optional[float]]
+
+
+class LevelStore:
+    """Per-cauldron ``(t, volume, fill)`` columns under ``root``.
+
+    Every column stays sorted by time for binary-searched range scans.
+    Readings newer than a cauldron's stored tail are appended in place:
+    volume and fill first, time last, and a reader only trusts the shortest
+    column, so a torn append is simply not visible. A late reading is
+    merged in by rewriting the cauldron's columns into a new directory that
+    then replaces the old one. Safe to share between request threads.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, cauldron_id: str) -> Path:
+        return self.root / quote(cauldron_id, safe="-_.")
+
+    def _length(self, folder: Path) -> int:
+        try:
+            return min((folder / name).stat().st_size // dtype.itemsize for name, dtype in _COLUMNS)
+        except FileNotFoundError:
+            return 0
+
+    def columns(self, cauldron_id: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Read-only ``(t, volume, fill)`` arrays over everything stored for the cauldron."""
+
+        folder = self._dir(cauldron_id)
+        n = self._length(folder)
+        with self._lock:
+            cached = self._maps.get(cauldron_id)
+            if cached is not None and len(cached[0]) == n:
+                return cached
+            if n == 0:
+                columns = tuple(np.empty(0, dtype=dtype) for _, dtype in _COLUMNS)
+            else:
+                columns = tuple(np.memmap(folder / name, dtype=dtype, mode="r", shape=(n,)) for name, dtype in _COLUMNS)
+            self._maps[cauldron_id] = columns  # type: ignore[assignment]
+            return columns  # type: ignore[return-value]
+
+    def append(self, cauldron_id: str, readings: Iterable[Reading]) -> int:
+        """Store readings whose timestamp is not stored yet; returns how many were written."""
+
+        rows = sorted(readings, key=lambda row: row[0])
+        if not rows:
+            return 0
+        t = np.array([to_epoch_us(ts) for ts, _, _ in rows], dtype="<i8")
+        # Time strictly increasing within the batch too.
+        fresh = np.r_[True, t[1:] > t[:-1]]
+        if not fresh.all():
+            rows = [row for row, keep in zip(rows, fresh.tolist()) if keep]
+            t = t[fresh]
+        v = np.array([row[1] or 0.0 for row in rows], dtype="<f8")
+        f = np.array([row[2] if row[2] is not None else np.nan for row in rows], dtype="<f8")
+        folder = self._dir(cauldron_id)
+        with self._lock:
+            n = self._length(folder)
+            if n and t[0] <= self._last(folder, n):
+                return self._merge(cauldron_id, folder, n, (t, v, f))
+            folder.mkdir(parents=True, exist_ok=True)
+            for (name, _), column in zip(_COLUMNS[::-1], (f, v, t)):
+                with open(folder / name, "r+b" if (folder / name).exists() else "wb") as fh:
+                    fh.seek(n * column.itemsize)  # drop a torn tail left by an interrupted append
+                    fh.write(column.tobytes())
+                    fh.truncate()
+            self._maps.pop(cauldron_id, None)
+        return len(t)
+
+    def _merge(self, cauldron_id: str, folder: Path, n: int, columns: Tuple[np.ndarray, ...]) -> int:
+        """Rewrite the cauldron's columns with ``columns`` merged in; called with the lock held."""
+
+        stored = [np.fromfile(folder / name, dtype=dtype, count=n) for name, dtype in _COLUMNS]
+        new = ~np.isin(columns[0], stored[0])
+        added = int(new.sum())
+        if not added:
+            return 0
+        late = int((columns[0][new] <= stored[0][-1]).sum())
+        logger.warning("Level store: merging %d late readings into %s", late, cauldron_id)
+        merged = [np.concatenate([old, column[new]]) for old, column in zip(stored, columns)]
+        order = np.argsort(merged[0], kind="stable")
+        staging = folder.with_name(folder.name + _NEW)
+        retired = folder.with_name(folder.name + _OLD)
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        for (name, dtype), column in zip(_COLUMNS, merged):
+            column[order].astype(dtype).tofile(staging / name)
+        # Mappings already handed out keep the old files alive until they are dropped.
+        # A crash between the renames leaves no columns at all, which sync() rebuilds.
+        shutil.rmtree(retired, ignore_errors=True)
+        os.replace(folder, retired)
+        os.replace(staging, folder)
+        shutil.rmtree(retired, ignore_errors=True)
+        self._maps.pop(cauldron_id, None)
+        return added
+
+    @staticmethod
+    def _last(folder: Path, n: int) -> int:
+        with open(folder / "t.i64", "rb") as fh:
+            fh.seek((n - 1) * 8)
+            return int(np.frombuffer(fh.read(8), dtype="<i8")[0])
+
+    def read(
+        self,
+        cauldron_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        *,
+        after: bool = False,
+    ) -> LevelSeries:
+        """Readings with start <= ts < end (start < ts with ``after``), as views of the mapping.
+
+        Missing volumes were stored as 0.0, as the SQL loaders return them;
+        a missing fill percent is stored as NaN.
+        """
+
+        t, v, _ = self.columns(cauldron_id)
+        lo = int(np.searchsorted(t, to_epoch_us(start), "right" if after else "left")) if start else 0
+        hi = int(np.searchsorted(t, to_epoch_us(end), "left")) if end else len(t)
+        return LevelSeries(t[lo:hi], v[lo:hi])
+
+    def tail(self, cauldron_id: str, n: int) -> LevelSeries:
+        t, v, _ = self.columns(cauldron_id)
+        return LevelSeries(t[max(0, len(t) - n):], v[max(0, len(t) - n):])
+
+    def drop(self, cauldron_id: str) -> None:
+        folder = self._dir(cauldron_id)
+        with self._lock:
+            self._maps.pop(cauldron_id, None)
+            for path in (folder, folder.with_name(folder.name + _NEW), folder.with_name(folder.name + _OLD)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._maps.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root.mkdir(parents=True, exist_ok=True)
+
+
+level_store: Optional[LevelStore] = LevelStore(LEVEL_STORE) if LEVEL_STORE else None
+
+
+def append_after_commit(session: Session, store: LevelStore, cauldron_id: str, readings: List[Reading]) -> None:
+    """Queue readings for ``store.append`` once ``session`` commits; a rollback drops them.
+
+    Appends skip timestamps the store already holds, so writing ahead of
+    the transaction would leave the store holding rows SQL never kept, with
+    no way to converge again.
+    """
+
+    session.info.setdefault(_PENDING, []).append((store, cauldron_id, readings))
+
+
+@event.listens_for(Session, "after_commit")
+def _append_pending(session: Session) -> None:
+    for store, cauldron_id, readings in session.info.pop(_PENDING, []):
+        store.append(cauldron_id, readings)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def rebuild(
+    session: Session, store: LevelStore, cauldron_ids: Optional[Iterable[str]] = None, chunk: int = 100_000
+) -> Dict[str, int]:
+    """Replace the store's contents (or just those cauldrons') with the levels in SQL.
+
+    Returns readings written per cauldron.
+    """
+
+    stmt = (
+        select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume, CauldronLevel.fill_percent)
+        .where(CauldronLevel.observed_at.is_not(None))
+        .order_by(CauldronLevel.cauldron_id, CauldronLevel.observed_at)
+        .execution_options(yield_per=chunk)
+    )
+    if cauldron_ids is None:
+        store.clear()
+    else:
+        cauldron_ids = list(cauldron_ids)
+        for cauldron_id in cauldron_ids:
+            store.drop(cauldron_id)
+        stmt = stmt.where(CauldronLevel.cauldron_id.in_(cauldron_ids))
+    counts: Dict[str, int] = {}
+    pending: Dict[str, List[Reading]] = {}
+    for cauldron_id, observed_at, volume, fill in session.execute(stmt):
+        rows = pending.setdefault(cauldron_id, [])
+        rows.append((observed_at, volume, fill))
+        if len(rows) >= chunk:
+            counts[cauldron_id] = counts.get(cauldron_id, 0) + store.append(cauldron_id, pending.pop(cauldron_id))
+    for cauldron_id, rows in pending.items():
+        counts[cauldron_id] = counts.get(cauldron_id, 0) + store.append(cauldron_id, rows)
+    return counts
+
+
+def sync(session: Session, store: LevelStore) -> Dict[str, int]:
+    """Rebuild the cauldrons whose columns are behind SQL; returns readings written per cauldron.
+
+    A cauldron is behind when it holds fewer readings than SQL or an older
+    newest one. Raw levels purged by retention stay in the store.
+    """
+
+    stmt = (
+        select(CauldronLevel.cauldron_id, func.count(), func.max(CauldronLevel.observed_at))
+        .where(CauldronLevel.observed_at.is_not(None))
+        .group_by(CauldronLevel.cauldron_id)
+    )
+    stale = []
+    for cauldron_id, count, newest in session.execute(stmt):
+        t = store.columns(cauldron_id)[0]
+        if len(t) < count or int(t[-1]) < to_epoch_us(newest):
+            stale.append(cauldron_id)
+    if not stale:
+        return {}
+    logger.warning("Level store is behind SQL for %d cauldrons; rebuilding them", len(stale))
+    return rebuild(session, store, stale)
+
+
+if __name__ == "__main__":
+    from .db import init_db, session_scope
+
+    if level_store is None:
+        raise SystemExit("Set LEVEL_STORE to the directory the level store should live in.")
+    init_db()
+    with session_scope() as session:
+        stats = rebuild(session, level_store)
+    print(json.dumps({"cauldrons": len(stats), "levels": sum(stats.values())}, indent=2))
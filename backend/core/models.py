@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy import JSON, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -38,6 +38,7 @@ class Cauldron(Base, TimestampMixin):
 
 class CauldronLevel(Base, TimestampMixin):
     __tablename__ = "levels"
+    __table_args__ = (Index("ux_levels_cauldron_observed", "cauldron_id", "observed_at", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     cauldron_id: Mapped[str] = mapped_column(String, ForeignKey("cauldrons.id", ondelete="CASCADE"), index=True)
@@ -49,8 +50,49 @@ class CauldronLevel(Base, TimestampMixin):
     cauldron: Mapped[Cauldron] = relationship("Cauldron", back_populates="levels")
 
 
+class CauldronLatest(Base, TimestampMixin):
+    """Newest level per cauldron, kept current by queries.record_levels."""
+
+    __tablename__ = "cauldron_latest"
+
+    cauldron_id: Mapped[str] = mapped_column(
+        String, ForeignKey("cauldrons.id", ondelete="CASCADE"), primary_key=True
+    )
+    observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=False))
+    volume: Mapped[Optional[float]] = mapped_column(Float)
+    fill_percent: Mapped[Optional[float]] = mapped_column(Float)
+
+
+class LevelRollupMixin:
+    """One cauldron's levels over one bucket; mean = vsum / n (see core.rollup)."""
+
+    cauldron_id: Mapped[str] = mapped_column(
+        String, ForeignKey("cauldrons.id", ondelete="CASCADE"), primary_key=True
+    )
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=False), primary_key=True)
+    n: Mapped[int] = mapped_column(Integer, default=0)
+    vmin: Mapped[float] = mapped_column(Float)
+    vmax: Mapped[float] = mapped_column(Float)
+    vsum: Mapped[float] = mapped_column(Float)
+    last: Mapped[float] = mapped_column(Float)
+    last_at: Mapped[datetime] = mapped_column(DateTime(timezone=False))
+
+
+class LevelRollup1m(Base, LevelRollupMixin):
+    __tablename__ = "levels_1m"
+
+
+class LevelRollup15m(Base, LevelRollupMixin):
+    __tablename__ = "levels_15m"
+
+
+class LevelRollup1h(Base, LevelRollupMixin):
+    __tablename__ = "levels_1h"
+
+
 class Ticket(Base, TimestampMixin):
     __tablename__ = "tickets"
+    __table_args__ = (Index("ix_tickets_scheduled_for_id", "scheduled_for", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     ticket_code: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -67,9 +109,14 @@ class Ticket(Base, TimestampMixin):
 
 class DrainEvent(Base, TimestampMixin):
     __tablename__ = "drain_events"
+    __table_args__ = (
+        Index("ux_drain_events_natural_key", "cauldron_id", "started_at", "detected_at", unique=True),
+        Index("ix_drain_events_detected_at_id", "detected_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     cauldron_id: Mapped[str] = mapped_column(String, ForeignKey("cauldrons.id", ondelete="CASCADE"), index=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=False))  # detected_at when the start is unknown
     detected_at: Mapped[datetime] = mapped_column(DateTime(timezone=False))
     estimated_loss: Mapped[Optional[float]] = mapped_column(Float)
     reason: Mapped[Optional[str]] = mapped_column(String)
@@ -79,8 +126,31 @@ class DrainEvent(Base, TimestampMixin):
     cauldron: Mapped[Cauldron] = relationship("Cauldron", back_populates="drain_events")
 
 
+class DetectorState(Base, TimestampMixin):
+    __tablename__ = "detector_state"
+
+    cauldron_id: Mapped[str] = mapped_column(
+        String, ForeignKey("cauldrons.id", ondelete="CASCADE"), primary_key=True
+    )
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False))
+    state: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+
+
+class SlopeState(Base, TimestampMixin):
+    """Running weighted regression sums behind a cauldron's fill slope (see logic.trend)."""
+
+    __tablename__ = "slope_state"
+
+    cauldron_id: Mapped[str] = mapped_column(
+        String, ForeignKey("cauldrons.id", ondelete="CASCADE"), primary_key=True
+    )
+    observed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False))
+    state: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+
+
 class MatchRecord(Base, TimestampMixin):
     __tablename__ = "matches"
+    __table_args__ = (Index("ix_matches_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     cauldron_id: Mapped[str] = mapped_column(String, ForeignKey("cauldrons.id", ondelete="CASCADE"), index=True)
@@ -97,8 +167,45 @@ class MatchRecord(Base, TimestampMixin):
     drain_event: Mapped[Optional[DrainEvent]] = relationship("DrainEvent")
 
 
+class AuditFinding(Base, TimestampMixin):
+    """Materialized audit result for one match; maintained by queries.refresh_audit_findings."""
+
+    __tablename__ = "audit_findings"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    match_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("matches.id", ondelete="CASCADE"), unique=True, index=True
+    )
+    cauldron_id: Mapped[str] = mapped_column(String, nullable=False)
+    ticket_code: Mapped[Optional[str]] = mapped_column(String)
+    drain_event_id: Mapped[Optional[int]] = mapped_column(Integer)
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    diff_volume: Mapped[float] = mapped_column(Float, default=0.0)
+    reason: Mapped[Optional[str]] = mapped_column(Text)
+
+
+class Watermark(Base):
+    """High-water mark (the last processed row id) for a named background job."""
+
+    __tablename__ = "watermarks"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[Optional[int]] = mapped_column(Integer)
+
+
+class StateVersion(Base):
+    """Single row counting committed writes; bumped by ``core.version`` in the writing transaction."""
+
+    __tablename__ = "state_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    epoch: Mapped[str] = mapped_column(String, nullable=False)  # new per database, so versions never repeat
+    value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class AgentTrace(Base):
     __tablename__ = "agent_trace"
+    __table_args__ = (Index("ix_agent_trace_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     agent: Mapped[str] = mapped_column(String, nullable=False)
@@ -2,22 +2,36 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import Row, delete, desc, func, insert, literal, select, true
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from backend.logic import audit as audit_logic
+from backend.logic import trend as trend_logic
+from backend.logic.series import LevelSeries
+
+from .cache import forecast_cache
+from .levelstore import append_after_commit, level_store
 from .models import (
     AgentTrace,
+    AuditFinding,
     Cauldron,
+    CauldronLatest,
     CauldronLevel,
     DrainEvent,
     MatchRecord,
     NetworkRoute,
+    SlopeState,
     Ticket,
+    Watermark,
 )
 
+
 def upsert_cauldron(session: Session, payload: Dict[str, Any]) -> Cauldron:
     cauldron_id = str(payload.get("id") or payload.get("cauldron_id"))
     if not cauldron_id:
@@ -36,22 +50,268 @@ def upsert_cauldron(session: Session, payload: Dict[str, Any]) -> Cauldron:
     return cauldron
 
 
+LEVEL_CHUNK = 5_000  # level rows converted, checked and inserted per statement
+_LEVEL_FIELDS = {"timestamp", "observed_at", "volume", "fill_percent"}
+
+
 def record_levels(session: Session, cauldron_id: str, rows: Iterable[Dict[str, Any]]) -> int:
-    count = 0
-    for row in rows:
-        observed_at = _safe_datetime(row.get("timestamp") or row.get("observed_at"))
-        if not observed_at:
-            continue
-        level = CauldronLevel(
-            cauldron_id=cauldron_id,
-            observed_at=observed_at,
-            volume=_safe_float(row.get("volume")),
-            fill_percent=_safe_float(row.get("fill_percent")),
-            payload=row,
+    """Store one cauldron's levels, skipping readings already stored; returns how many were inserted."""
+
+    return ingest_levels(session, {cauldron_id: rows})["inserted"]
+
+
+def ingest_levels(
+    session: Session,
+    rows_by_cauldron: Mapping[str, Iterable[Dict[str, Any]]],
+    *,
+    chunk: int = LEVEL_CHUNK,
+    commit: bool = False,
+) -> Dict[str, int]:
+    """Bulk-insert level rows, deduplicated on ``(cauldron_id, observed_at)``.
+
+    Rows are converted ``chunk`` at a time and inserted with one executemany
+    of INSERT ... ON CONFLICT DO NOTHING RETURNING observed_at, so the unique
+    index does the deduplication and the returned keys say which readings
+    were new; no lookup query runs first. The cauldron id, timestamps and an
+    empty ``payload`` are part of the statement rather than bound per row;
+    ``payload`` keeps only the fields that have no column of their own.
+    Timestamps are stored as naive UTC. Only new readings advance the trend
+    state, ``cauldron_latest`` and the level store, and evict the cauldron's
+    cached forecasts; each chunk updates them in the same transaction as its
+    rows. With ``commit`` every chunk is committed as soon as it is written.
+    Returns inserted, duplicate and invalid (no usable timestamp) counts.
+    """
+
+    counts = {"inserted": 0, "duplicates": 0, "invalid": 0}
+    # Core table insert: skips the ORM bulk-insert bookkeeping per row.
+    statement = _insert_ignore(session, CauldronLevel.__table__, ["cauldron_id", "observed_at"])
+    for cauldron_id, rows in rows_by_cauldron.items():
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, chunk))
+            if not batch:
+                break
+            values: Dict[datetime, Dict[str, Any]] = {}
+            for row in batch:
+                observed_at = _utc_time(row.get("timestamp") or row.get("observed_at"))
+                if observed_at is None:
+                    counts["invalid"] += 1
+                elif observed_at in values:
+                    counts["duplicates"] += 1
+                else:
+                    value = {
+                        "observed_at": observed_at,
+                        "volume": _safe_float(row.get("volume")),
+                        "fill_percent": _safe_float(row.get("fill_percent")),
+                    }
+                    if not _LEVEL_FIELDS.issuperset(row):
+                        value["payload"] = {key: val for key, val in row.items() if key not in _LEVEL_FIELDS}
+                    values[observed_at] = value
+            if not values:
+                continue
+            now = datetime.utcnow()
+            common = statement.values(cauldron_id=cauldron_id, created_at=now, updated_at=now)
+            plain = [value for value in values.values() if "payload" not in value]
+            extra = [value for value in values.values() if "payload" in value]
+            inserted = set()
+            for stmt, params in ((common.values(payload=literal("{}")), plain), (common, extra)):
+                if params:
+                    inserted.update(session.execute(stmt.returning(CauldronLevel.observed_at), params).scalars())
+            counts["inserted"] += len(inserted)
+            counts["duplicates"] += len(values) - len(inserted)
+            if inserted:
+                fresh = sorted(
+                    ({"cauldron_id": cauldron_id, **values[observed_at]} for observed_at in inserted),
+                    key=lambda value: value["observed_at"],
+                )
+                # Derived state goes into the same transaction as the rows, so a
+                # failure cannot leave stored levels that were never folded in.
+                _levels_added(session, cauldron_id, fresh)
+            if commit:
+                session.commit()
+    return counts
+
+
+def _levels_added(session: Session, cauldron_id: str, fresh: List[Dict[str, Any]]) -> None:
+    """Fold newly inserted readings (oldest first) into everything derived from the levels table."""
+
+    newest = fresh[-1]["observed_at"]
+    samples = [(value["observed_at"], value["volume"] or 0.0) for value in fresh]
+    slope = session.get(SlopeState, cauldron_id)
+    if slope is None:
+        slope = SlopeState(cauldron_id=cauldron_id, state=None)
+        session.add(slope)
+    slope.state = trend_logic.update_many(slope.state, samples)
+    slope.observed_at = max(slope.observed_at, newest) if slope.observed_at else newest
+    _advance_latest(session, fresh[-1])
+    if level_store is not None:
+        readings = [(value["observed_at"], value["volume"], value["fill_percent"]) for value in fresh]
+        append_after_commit(session, level_store, cauldron_id, readings)
+    forecast_cache.invalidate(cauldron_id)
+    # Sessions do not autoflush, and session.get only finds flushed rows: without
+    # this the next chunk of a new cauldron would add a second latest/slope row.
+    session.flush()
+
+
+def _advance_latest(session: Session, level: Dict[str, Any]) -> None:
+    """Point ``cauldron_latest`` at ``level`` unless it already holds a newer reading."""
+
+    row = session.get(CauldronLatest, level["cauldron_id"])
+    if row is None:
+        row = CauldronLatest(cauldron_id=level["cauldron_id"])
+        session.add(row)
+    elif _naive_utc(row.observed_at) > level["observed_at"]:
+        return
+    row.observed_at = level["observed_at"]
+    row.volume = level["volume"]
+    row.fill_percent = level["fill_percent"]
+
+
+def backfill_latest_levels(session: Session) -> int:
+    """Fill an empty ``cauldron_latest`` from the levels table (databases created before it existed)."""
+
+    if session.execute(select(CauldronLatest.cauldron_id).limit(1)).first():
+        return 0
+    newest = (
+        select(CauldronLevel.cauldron_id.label("cid"), func.max(CauldronLevel.observed_at).label("observed_at"))
+        .group_by(CauldronLevel.cauldron_id)
+        .subquery()
+    )
+    rows = {
+        cauldron_id: {
+            "cauldron_id": cauldron_id,
+            "observed_at": observed_at,
+            "volume": volume,
+            "fill_percent": fill_percent,
+        }
+        for cauldron_id, observed_at, volume, fill_percent in session.execute(
+            select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume, CauldronLevel.fill_percent)
+            .join(
+                newest,
+                (CauldronLevel.cauldron_id == newest.c.cid) & (CauldronLevel.observed_at == newest.c.observed_at),
+            )
+            .order_by(CauldronLevel.id)
         )
-        session.add(level)
-        count += 1
-    return count
+    }
+    if rows:
+        session.execute(insert(CauldronLatest), list(rows.values()))
+    return len(rows)
+
+
+def backfill_slope_states(session: Session, chunk: int = 100_000) -> int:
+    """Refold ``slope_state`` from the levels table where it has seen fewer readings than are stored.
+
+    Covers databases from before the trend state existed, where it would
+    otherwise start from the first new reading. Returns how many cauldrons
+    were refolded.
+    """
+
+    counts = dict(
+        session.execute(
+            select(CauldronLevel.cauldron_id, func.count())
+            .where(CauldronLevel.observed_at.is_not(None))
+            .group_by(CauldronLevel.cauldron_id)
+        ).all()
+    )
+    rows = {row.cauldron_id: row for row in session.execute(select(SlopeState)).scalars()}
+    stale = [cid for cid, count in counts.items() if cid not in rows or (rows[cid].state or {}).get("n", 0) < count]
+    if not stale:
+        return 0
+    states: Dict[str, Optional[Dict[str, Any]]] = {}
+    newest: Dict[str, datetime] = {}
+    stmt = (
+        select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume)
+        .where(CauldronLevel.observed_at.is_not(None), CauldronLevel.cauldron_id.in_(stale))
+        .order_by(CauldronLevel.cauldron_id, CauldronLevel.observed_at)
+        .execution_options(yield_per=chunk)
+    )
+    for part in session.execute(stmt).partitions():
+        by_cauldron: Dict[str, List[Tuple[datetime, float]]] = {}
+        for cauldron_id, observed_at, volume in part:
+            by_cauldron.setdefault(cauldron_id, []).append((observed_at, volume or 0.0))
+        for cauldron_id, samples in by_cauldron.items():
+            states[cauldron_id] = trend_logic.update_many(states.get(cauldron_id), samples)
+            newest[cauldron_id] = samples[-1][0]
+    for cauldron_id in stale:
+        row = rows.get(cauldron_id)
+        if row is None:
+            row = SlopeState(cauldron_id=cauldron_id)
+            session.add(row)
+        row.state = states[cauldron_id]
+        row.observed_at = newest[cauldron_id]
+    return len(stale)
+
+
+def slope_states(session: Session, cauldron_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Stored trend state per cauldron (see ``logic.trend``)."""
+
+    stmt = select(SlopeState.cauldron_id, SlopeState.state)
+    if cauldron_ids is not None:
+        stmt = stmt.where(SlopeState.cauldron_id.in_(list(cauldron_ids)))
+    return {cauldron_id: state for cauldron_id, state in session.execute(stmt) if state}
+
+
+def load_level_arrays(
+    session: Session,
+    cauldron_ids: Optional[Iterable[str]] = None,
+    *,
+    since: Optional[datetime] = None,
+    where: Any = None,
+) -> Dict[str, LevelSeries]:
+    """Fetch level history for many cauldrons in a single query.
+
+    Only ``(cauldron_id, observed_at, volume)`` is selected. The result maps
+    each cauldron id to a :class:`LevelSeries` in ascending time order
+    (missing volumes read as 0.0). ``where`` adds an extra filter clause.
+    """
+
+    stmt = select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume).where(
+        CauldronLevel.observed_at.is_not(None)
+    )
+    if cauldron_ids is not None:
+        stmt = stmt.where(CauldronLevel.cauldron_id.in_(list(cauldron_ids)))
+    if since is not None:
+        stmt = stmt.where(CauldronLevel.observed_at >= since)
+    if where is not None:
+        stmt = stmt.where(where)
+    stmt = stmt.order_by(CauldronLevel.cauldron_id, CauldronLevel.observed_at)
+    return _group_series(session.execute(stmt))
+
+
+def latest_observations(session: Session, cauldron_ids: Optional[Iterable[str]] = None) -> Dict[str, datetime]:
+    """Newest ``observed_at`` per cauldron."""
+
+    stmt = select(CauldronLatest.cauldron_id, CauldronLatest.observed_at)
+    if cauldron_ids is not None:
+        stmt = stmt.where(CauldronLatest.cauldron_id.in_(list(cauldron_ids)))
+    return {cauldron_id: observed_at for cauldron_id, observed_at in session.execute(stmt) if observed_at is not None}
+
+
+def load_recent_levels(
+    session: Session,
+    cauldron_ids: Optional[Iterable[str]] = None,
+    *,
+    limit: int = 360,
+) -> Dict[str, LevelSeries]:
+    """Last ``limit`` levels of each cauldron, oldest first, from one windowed query."""
+
+    ranked = select(
+        CauldronLevel.cauldron_id,
+        CauldronLevel.observed_at,
+        CauldronLevel.volume,
+        func.row_number()
+        .over(partition_by=CauldronLevel.cauldron_id, order_by=CauldronLevel.observed_at.desc())
+        .label("rn"),
+    ).where(CauldronLevel.observed_at.is_not(None))
+    if cauldron_ids is not None:
+        ranked = ranked.where(CauldronLevel.cauldron_id.in_(list(cauldron_ids)))
+    ranked = ranked.subquery()
+    stmt = (
+        select(ranked.c.cauldron_id, ranked.c.observed_at, ranked.c.volume)
+        .where(ranked.c.rn <= limit)
+        .order_by(ranked.c.cauldron_id, ranked.c.observed_at)
+    )
+    return _group_series(session.execute(stmt))
 
 
 def upsert_ticket(session: Session, payload: Dict[str, Any]) -> Ticket:
@@ -70,52 +330,133 @@ def upsert_ticket(session: Session, payload: Dict[str, Any]) -> Ticket:
     return ticket
 
 
-def latest_levels(session: Session) -> List[Dict[str, Any]]:
-    subq = (
-        select(
-            CauldronLevel.cauldron_id.label("cid"),
-            func.max(CauldronLevel.observed_at).label("observed_at"),
+def record_drain_events(
+    session: Session,
+    events: Iterable[Dict[str, Any]],
+    *,
+    reason: str,
+    confidence: Optional[float] = None,
+) -> int:
+    """Insert detector events that are not stored yet; returns the number inserted.
+
+    Events are keyed on ``(cauldron_id, t_start, t_end)``, which maps onto the
+    unique ``ux_drain_events_natural_key`` index; a missing ``t_start`` is
+    stored as ``t_end``, since the index treats NULLs as distinct. Keys already present are
+    filtered out with one lookup query, so re-detecting a known window issues
+    no INSERT at all. The rest goes in as a single bulk insert that also
+    ignores conflicts from concurrent writers.
+    """
+
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for event in events:
+        detected_at = _naive_utc(_safe_datetime(event.get("t_end")))
+        if not detected_at:
+            continue
+        started_at = _naive_utc(_safe_datetime(event.get("t_start"))) or detected_at
+        key = (event["cauldron_id"], started_at, detected_at)
+        rows.setdefault(
+            key,
+            {
+                "cauldron_id": event["cauldron_id"],
+                "started_at": started_at,
+                "detected_at": detected_at,
+                "estimated_loss": event.get("true_volume"),
+                "reason": reason,
+                "confidence": confidence,
+                "extra": event,
+            },
         )
-        .group_by(CauldronLevel.cauldron_id)
-        .subquery()
-    )
+    if not rows:
+        return 0
 
-    rows = (
-        session.query(Cauldron, CauldronLevel)
-        .join(subq, Cauldron.id == subq.c.cid)
-        .join(
-            CauldronLevel,
-            (CauldronLevel.cauldron_id == subq.c.cid)
-            & (CauldronLevel.observed_at == subq.c.observed_at),
+    existing = session.execute(
+        select(DrainEvent.cauldron_id, DrainEvent.started_at, DrainEvent.detected_at).where(
+            DrainEvent.cauldron_id.in_({key[0] for key in rows}),
+            DrainEvent.detected_at.between(min(key[2] for key in rows), max(key[2] for key in rows)),
         )
-        .order_by(Cauldron.id)
-        .all()
     )
+    for key in existing:
+        rows.pop(tuple(key), None)
+    if not rows:
+        return 0
 
-    result: List[Dict[str, Any]] = []
-    for cauldron, level in rows:
-        result.append(
-            {
-                "cauldron_id": cauldron.id,
-                "name": cauldron.name,
-                "fill_percent": level.fill_percent,
-                "volume": level.volume,
-                "observed_at": level.observed_at.isoformat() if level.observed_at else None,
-                "max_volume": cauldron.max_volume,
-                "fill_rate": cauldron.fill_rate,
-                "metadata": cauldron.extra,
-            }
-        )
-    return result
+    session.execute(_insert_ignore(session, DrainEvent, ["cauldron_id", "started_at", "detected_at"]), list(rows.values()))
+    return len(rows)
 
 
-def recent_tickets(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
-    rows = (
-        session.query(Ticket)
-        .order_by(Ticket.scheduled_for.is_(None), desc(Ticket.scheduled_for), desc(Ticket.created_at))
-        .limit(limit)
-        .all()
+def latest_levels(session: Session) -> List[Dict[str, Any]]:
+    """Newest reading of every cauldron, read from ``cauldron_latest`` (one row per cauldron)."""
+
+    rows = session.execute(
+        select(
+            Cauldron.id,
+            Cauldron.name,
+            Cauldron.max_volume,
+            Cauldron.fill_rate,
+            Cauldron.extra,
+            CauldronLatest.fill_percent,
+            CauldronLatest.volume,
+            CauldronLatest.observed_at,
+        )
+        .join(CauldronLatest, CauldronLatest.cauldron_id == Cauldron.id)
+        .order_by(Cauldron.id)
     )
+    return [
+        {
+            "cauldron_id": row.id,
+            "name": row.name,
+            "fill_percent": row.fill_percent,
+            "volume": row.volume,
+            "observed_at": row.observed_at.isoformat() if row.observed_at else None,
+            "max_volume": row.max_volume,
+            "fill_rate": row.fill_rate,
+            "metadata": row.extra,
+        }
+        for row in rows
+    ]
+
+
+Keyset = Tuple[Optional[datetime], int]  # (sort key, id) of the last row of a page
+
+
+def _keyset_page(
+    session: Session, stmt: Any, sort_col: Any, id_col: Any, limit: int, after: Optional[Keyset]
+) -> Tuple[List[Row], Optional[Keyset]]:
+    """One page of ``stmt`` newest first by ``(sort_col, id_col)``, starting after the ``after`` key.
+
+    The bound is ``sort <= s AND (sort < s OR id < i)`` rather than an OR of
+    the two cases, so the database can range-scan a ``(sort_col, id)`` index
+    and every page costs the same however deep it is. Rows whose sort key is
+    NULL come last, ordered by id. ``stmt`` must select both columns.
+    Returns the rows and the key to pass as ``after`` for the next page, or
+    None on the last page.
+    """
+
+    rows: List[Row] = []
+    if after is None or after[0] is not None:
+        dated = stmt.where(sort_col.is_not(None))
+        if after is not None:
+            sort, row_id = after
+            dated = dated.where(sort_col <= sort, (sort_col < sort) | (id_col < row_id))
+        rows = session.execute(dated.order_by(desc(sort_col), desc(id_col)).limit(limit + 1)).all()
+    if len(rows) <= limit and sort_col.expression.nullable:
+        undated = stmt.where(sort_col.is_(None))
+        if after is not None and after[0] is None:
+            undated = undated.where(id_col < after[1])
+        rows += session.execute(undated.order_by(desc(id_col)).limit(limit + 1 - len(rows))).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]._mapping[sort_col], rows[-1]._mapping[id_col])
+
+
+def page_tickets(
+    session: Session, limit: int = 50, after: Optional[Keyset] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Keyset]]:
+    """Tickets by ``scheduled_for`` (unscheduled last), newest first."""
+
+    stmt = select(Ticket.id, Ticket.ticket_code, Ticket.cauldron_id, Ticket.scheduled_for, Ticket.volume, Ticket.status)
+    rows, next_key = _keyset_page(session, stmt, Ticket.scheduled_for, Ticket.id, limit, after)
     return [
         {
             "ticket_code": row.ticket_code,
@@ -125,59 +466,103 @@ def recent_tickets(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
             "status": row.status,
         }
         for row in rows
-    ]
+    ], next_key
 
 
-def recent_matches(session: Session, limit: int = 25) -> List[Dict[str, Any]]:
-    rows = (
-        session.query(MatchRecord, Cauldron, Ticket)
+def recent_tickets(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
+    return page_tickets(session, limit)[0]
+
+
+def page_matches(
+    session: Session, limit: int = 25, after: Optional[Keyset] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Keyset]]:
+    """Matches by ``created_at``, newest first."""
+
+    stmt = (
+        select(
+            MatchRecord.id,
+            MatchRecord.created_at,
+            MatchRecord.status,
+            MatchRecord.drain_event_id,
+            MatchRecord.discrepancy,
+            MatchRecord.confidence,
+            Cauldron.id.label("cauldron_id"),
+            Cauldron.name.label("cauldron"),
+            Ticket.ticket_code,
+        )
         .join(Cauldron, MatchRecord.cauldron_id == Cauldron.id)
         .outerjoin(Ticket, MatchRecord.ticket_id == Ticket.id)
-        .order_by(desc(MatchRecord.created_at))
-        .limit(limit)
-        .all()
     )
+    rows, next_key = _keyset_page(session, stmt, MatchRecord.created_at, MatchRecord.id, limit, after)
     return [
         {
-            "match_id": match.id,
-            "cauldron": cauldron.name,
-            "cauldron_id": cauldron.id,
-            "ticket": ticket.ticket_code if ticket else None,
-            "status": match.status,
-            "drain_event_id": match.drain_event_id,
-            "discrepancy": match.discrepancy,
-            "confidence": match.confidence,
-            "created_at": match.created_at.isoformat(),
+            "match_id": row.id,
+            "cauldron": row.cauldron,
+            "cauldron_id": row.cauldron_id,
+            "ticket": row.ticket_code,
+            "status": row.status,
+            "drain_event_id": row.drain_event_id,
+            "discrepancy": row.discrepancy,
+            "confidence": row.confidence,
+            "created_at": row.created_at.isoformat(),
         }
-        for match, cauldron, ticket in rows
-    ]
+        for row in rows
+    ], next_key
 
 
-def recent_drain_events(session: Session, limit: int = 25) -> List[Dict[str, Any]]:
-    rows = (
-        session.query(DrainEvent, Cauldron)
-        .join(Cauldron, DrainEvent.cauldron_id == Cauldron.id)
-        .order_by(desc(DrainEvent.detected_at))
-        .limit(limit)
-        .all()
-    )
+def recent_matches(session: Session, limit: int = 25) -> List[Dict[str, Any]]:
+    return page_matches(session, limit)[0]
+
+
+def page_drain_events(
+    session: Session, limit: int = 25, after: Optional[Keyset] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Keyset]]:
+    """Drain events by ``detected_at``, newest first."""
+
+    stmt = select(
+        DrainEvent.id,
+        DrainEvent.detected_at,
+        DrainEvent.estimated_loss,
+        DrainEvent.reason,
+        Cauldron.id.label("cauldron_id"),
+        Cauldron.name.label("cauldron"),
+    ).join(Cauldron, DrainEvent.cauldron_id == Cauldron.id)
+    rows, next_key = _keyset_page(session, stmt, DrainEvent.detected_at, DrainEvent.id, limit, after)
     return [
         {
-            "event_id": event.id,
-            "cauldron": cauldron.name,
-            "cauldron_id": cauldron.id,
-            "detected_at": event.detected_at.isoformat(),
-            "estimated_loss": event.estimated_loss,
-            "reason": event.reason,
+            "event_id": row.id,
+            "cauldron": row.cauldron,
+            "cauldron_id": row.cauldron_id,
+            "detected_at": row.detected_at.isoformat(),
+            "estimated_loss": row.estimated_loss,
+            "reason": row.reason,
         }
-        for event, cauldron in rows
-    ]
+        for row in rows
+    ], next_key
 
 
-def agent_trace(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
-    rows = session.query(AgentTrace).order_by(desc(AgentTrace.created_at), desc(AgentTrace.id)).limit(limit).all()
+def recent_drain_events(session: Session, limit: int = 25) -> List[Dict[str, Any]]:
+    return page_drain_events(session, limit)[0]
+
+
+def page_agent_trace(
+    session: Session, limit: int = 50, after: Optional[Keyset] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Keyset]]:
+    """Agent trace by ``created_at``, newest first."""
+
+    stmt = select(
+        AgentTrace.id,
+        AgentTrace.agent,
+        AgentTrace.action,
+        AgentTrace.tags,
+        AgentTrace.created_at,
+        AgentTrace.input_payload,
+        AgentTrace.output_payload,
+    )
+    rows, next_key = _keyset_page(session, stmt, AgentTrace.created_at, AgentTrace.id, limit, after)
     return [
         {
+            "trace_id": row.id,
             "agent": row.agent,
             "action": row.action,
             "tags": row.tags,
@@ -188,10 +573,16 @@ def agent_trace(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
             "output_payload": _serialize_payload(row.output_payload or {}),
         }
         for row in rows
-    ]
+    ], next_key
+
+
+def agent_trace(session: Session, limit: int = 50) -> List[Dict[str, Any]]:
+    return page_agent_trace(session, limit)[0]
 
 
-def _trace_context(row: AgentTrace) -> Dict[str, Any]:
+def _trace_context(row: Any) -> Dict[str, Any]:
+    """``row`` is an AgentTrace or a result row with its payload columns."""
+
     raw_input = row.input_payload if isinstance(row.input_payload, dict) else {}
     raw_output = row.output_payload if isinstance(row.output_payload, dict) else {}
     context_section = raw_input.get("context") if isinstance(raw_input.get("context"), dict) else {}
@@ -295,9 +686,117 @@ def create_match(
         extra=extra or {},
     )
     session.add(record)
+    session.flush()
+    refresh_audit_findings(session, [record.id])
     return record
 
 
+def get_watermark(session: Session, name: str) -> Optional[int]:
+    row = session.get(Watermark, name)
+    return row.value if row else None
+
+
+def set_watermark(session: Session, name: str, value: Optional[int]) -> None:
+    row = session.get(Watermark, name)
+    if row is None:
+        session.add(Watermark(name=name, value=value))
+    else:
+        row.value = value
+
+
+def refresh_audit_findings(session: Session, match_ids: Optional[Iterable[int]] = None) -> int:
+    """Re-check the given matches (every match when None) and return how many were evaluated.
+
+    Writers of matches call this in their own transaction with the ids they
+    inserted, updated or deleted, so findings commit together with the
+    matches they describe. Ids that no longer exist just lose their findings.
+    """
+
+    if match_ids is None:
+        session.execute(delete(AuditFinding))
+        changed = true()
+    else:
+        ids = sorted(set(match_ids))
+        if not ids:
+            return 0
+        session.execute(delete(AuditFinding).where(AuditFinding.match_id.in_(ids)))
+        changed = MatchRecord.id.in_(ids)
+
+    rows = session.execute(
+        select(
+            MatchRecord.id,
+            MatchRecord.discrepancy,
+            MatchRecord.drain_event_id,
+            Ticket.ticket_code,
+            DrainEvent.cauldron_id,
+            DrainEvent.estimated_loss,
+        )
+        .outerjoin(Ticket, MatchRecord.ticket_id == Ticket.id)
+        .outerjoin(DrainEvent, MatchRecord.drain_event_id == DrainEvent.id)
+        .where(changed)
+    ).all()
+
+    findings: List[Dict[str, Any]] = []
+    for row in rows:
+        match = {
+            "ticket_id": row.ticket_code or "unknown",
+            "drain_event_id": str(row.drain_event_id) if row.drain_event_id else "unknown",
+            "diff_volume": row.discrepancy or 0.0,
+        }
+        drain = (
+            {"cauldron_id": row.cauldron_id, "true_volume": float(row.estimated_loss or 0.0)}
+            if row.cauldron_id
+            else {}
+        )
+        finding = audit_logic.check_match(match, drain)
+        if finding:
+            findings.append(
+                {
+                    "match_id": row.id,
+                    "cauldron_id": finding["cauldron_id"],
+                    "ticket_code": row.ticket_code,
+                    "drain_event_id": row.drain_event_id,
+                    "type": finding["type"],
+                    "diff_volume": finding["diff_volume"],
+                    "reason": finding["reason"],
+                }
+            )
+    if findings:
+        session.execute(insert(AuditFinding), findings)
+    return len(rows)
+
+
+def backfill_audit_findings(session: Session) -> int:
+    """Audit every match once when ``audit_findings`` is empty (databases created before it existed)."""
+
+    if session.execute(select(AuditFinding.id).limit(1)).first():
+        return 0
+    if not session.execute(select(MatchRecord.id).limit(1)).first():
+        return 0
+    return refresh_audit_findings(session)
+
+
+def audit_findings(session: Session) -> List[Dict[str, Any]]:
+    """Stored findings in the order of their matches' ``created_at``."""
+
+    rows = session.execute(
+        select(AuditFinding)
+        .join(MatchRecord, MatchRecord.id == AuditFinding.match_id)
+        .order_by(MatchRecord.created_at, MatchRecord.id)
+    ).scalars()
+    return [
+        {
+            "type": row.type,
+            "cauldron_id": row.cauldron_id,
+            "ticket_id": row.ticket_code or "unknown",
+            "drain_event_id": str(row.drain_event_id) if row.drain_event_id else "unknown",
+            "diff_volume": row.diff_volume,
+            "reason": row.reason,
+        }
+        for row in rows
+    ]
+
+
 def build_state_overview(session: Session) -> Dict[str, Any]:
     cauldron_states = latest_levels(session)
     tickets = recent_tickets(session)
@@ -338,19 +837,28 @@ def _build_network_graph(cauldrons: List[Dict[str, Any]], session: Session) -> D
         for c in cauldrons
     ]
 
-    routes = session.query(NetworkRoute).all()
-    links = [
-        {
-            "source": route.origin,
-            "target": route.destination,
-        }
-        for route in routes
-        if route.origin and route.destination
-    ]
+    routes = session.execute(
+        select(NetworkRoute.origin, NetworkRoute.destination).where(
+            NetworkRoute.origin.is_not(None), NetworkRoute.destination.is_not(None)
+        )
+    )
+    links = [{"source": origin, "target": destination} for origin, destination in routes if origin and destination]
 
     return {"nodes": nodes, "links": links}
 
 
+def _group_series(rows: Iterable[Tuple[str, datetime, Optional[float]]]) -> Dict[str, LevelSeries]:
+    grouped: Dict[str, Tuple[List[datetime], List[float]]] = {}
+    for cauldron_id, observed_at, volume in rows:
+        timestamps, volumes = grouped.setdefault(cauldron_id, ([], []))
+        timestamps.append(observed_at)
+        volumes.append(volume or 0.0)
+    return {
+        cauldron_id: LevelSeries.from_datetimes(timestamps, volumes)
+        for cauldron_id, (timestamps, volumes) in grouped.items()
+    }
+
+
 def _safe_float(value: Any) -> Optional[float]:
     try:
         if value is None:
@@ -373,6 +881,34 @@ def _safe_datetime(value: Any) -> Optional[datetime]:
     return None
 
 
+def _utc_time(value: Any) -> Optional[datetime]:
+    """``_naive_utc(_safe_datetime(value))``, parsing "...Z" strings (what feeds send) directly."""
+
+    if isinstance(value, str) and value.endswith("Z") and "+" not in value:
+        try:
+            return datetime.fromisoformat(value[:-1])
+        except ValueError:
+            return None
+    return _naive_utc(_safe_datetime(value))
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _insert_ignore(session: Session, model: Any, conflict_columns: List[str]) -> Any:
+    """INSERT that skips rows colliding on ``conflict_columns`` where the dialect supports it."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect == "postgresql":
+        return postgresql_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+    return insert(model)
+
+
 def _serialize_payload(value: Any) -> Any:
     if isinstance(value, dict):
         return {key: _serialize_payload(val) for key, val in value.items()}
@@ -0,0 +1,242 @@
+"""Tiered rollups of cauldron level history, and raw-level retention.
+
+    python -m backend.core.rollup
+
+``compact`` folds the raw levels ingested since its last run (a watermark
+on the levels ``id``) into 1-minute, 15-minute and hourly buckets of
+count/min/max/sum/last. Buckets merge associatively, so a late sample just
+updates the buckets it falls in. Raw rows older than LEVEL_RETENTION_DAYS
+are then deleted, but only once they have been rolled up.
+``load_level_series`` reads history from the coarsest tier that still
+meets a requested resolution.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.logic.series import LevelSeries, from_epoch_us, to_epoch_us
+
+from . import queries
+from .db import init_db, session_scope
+from .models import CauldronLevel, LevelRollup15m, LevelRollup1h, LevelRollup1m, LevelRollupMixin
+
+LEVEL_RETENTION_DAYS = float(os.getenv("LEVEL_RETENTION_DAYS", "0"))  # 0 keeps raw levels forever
+ROLLUP_WATERMARK = "level_rollup"
+COMPACT_CHUNK = 50_000  # raw levels folded per pass
+TIERS: Tuple[Tuple[int, Type[LevelRollupMixin]], ...] = (
+    (60, LevelRollup1m),
+    (900, LevelRollup15m),
+    (3600, LevelRollup1h),
+)
+
+Key = Tuple[str, datetime]
+Agg = List[Any]  # [n, vmin, vmax, vsum, last, last_at]
+_COLUMNS = ("n", "vmin", "vmax", "vsum", "last", "last_at")
+_PICK = {
+    "last": lambda agg: agg[4],
+    "mean": lambda agg: agg[3] / agg[0],
+    "min": lambda agg: agg[1],
+    "max": lambda agg: agg[2],
+}
+
+
+def _bucket(ts: datetime, step: int) -> datetime:
+    us = to_epoch_us(ts)
+    return from_epoch_us(us - us % (step * 1_000_000))
+
+
+def _fold(rows: Iterable[Tuple[str, datetime, Optional[float]]], step: int) -> Dict[Key, Agg]:
+    """Aggregate ``(cauldron_id, observed_at, volume)`` rows into ``step``-second buckets."""
+
+    out: Dict[Key, Agg] = {}
+    for cauldron_id, observed_at, volume in rows:
+        value = float(volume or 0.0)
+        key = (cauldron_id, _bucket(observed_at, step))
+        agg = out.get(key)
+        if agg is None:
+            out[key] = [1, value, value, value, value, observed_at]
+            continue
+        agg[0] += 1
+        agg[1] = min(agg[1], value)
+        agg[2] = max(agg[2], value)
+        agg[3] += value
+        if observed_at >= agg[5]:
+            agg[4], agg[5] = value, observed_at
+    return out
+
+
+def _merge(old: Agg, new: Agg) -> Agg:
+    last, last_at = (new[4], new[5]) if new[5] >= old[5] else (old[4], old[5])
+    return [old[0] + new[0], min(old[1], new[1]), max(old[2], new[2]), old[3] + new[3], last, last_at]
+
+
+def _agg_columns(model: Type[LevelRollupMixin]) -> List[Any]:
+    return [getattr(model, name) for name in _COLUMNS]
+
+
+def _write(session: Session, model: Type[LevelRollupMixin], aggs: Dict[Key, Agg]) -> int:
+    """Merge ``aggs`` into the stored buckets of ``model``: one read, one bulk insert, one bulk update."""
+
+    if not aggs:
+        return 0
+    buckets = [bucket for _, bucket in aggs]
+    stored = {
+        (row[0], row[1]): list(row[2:])
+        for row in session.execute(
+            select(model.cauldron_id, model.bucket, *_agg_columns(model)).where(
+                model.cauldron_id.in_({cauldron_id for cauldron_id, _ in aggs}),
+                model.bucket.between(min(buckets), max(buckets)),
+            )
+        )
+    }
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    for (cauldron_id, bucket), agg in aggs.items():
+        old = stored.get((cauldron_id, bucket))
+        row = {"cauldron_id": cauldron_id, "bucket": bucket, **dict(zip(_COLUMNS, agg if old is None else _merge(old, agg)))}
+        (inserts if old is None else updates).append(row)
+    if inserts:
+        session.execute(insert(model), inserts)
+    if updates:
+        session.execute(update(model), updates)
+    return len(aggs)
+
+
+def compact(
+    session: Session,
+    *,
+    now: Optional[datetime] = None,
+    retention_days: float = LEVEL_RETENTION_DAYS,
+    chunk: int = COMPACT_CHUNK,
+) -> Dict[str, int]:
+    """Roll newly ingested levels into every tier, then apply raw retention.
+
+    Progress is the highest level id folded so far. Ids are handed out
+    under SQLite's single-writer lock, so every id below a committed one is
+    committed too and nothing can land behind the mark (a ``created_at``
+    stamped before a long transaction commits could). Works through the
+    backlog ``chunk`` levels at a time to bound memory, all in the caller's
+    transaction. Returns how many levels were folded, how many
+    buckets each tier table touched and how many raw rows were purged.
+    """
+
+    counts = {"levels": 0, **{model.__tablename__: 0 for _, model in TIERS}, "purged": 0}
+    start = mark = queries.get_watermark(session, ROLLUP_WATERMARK)
+    while True:
+        pending = select(CauldronLevel.id).where(CauldronLevel.id > (mark or 0))
+        upper = session.execute(pending.order_by(CauldronLevel.id).offset(chunk - 1).limit(1)).scalar()
+        if upper is None:
+            upper = session.execute(select(func.max(CauldronLevel.id))).scalar()
+        if upper is None or upper <= (mark or 0):
+            break
+
+        stmt = select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume).where(
+            CauldronLevel.observed_at.is_not(None), CauldronLevel.id > (mark or 0), CauldronLevel.id <= upper
+        )
+        rows = session.execute(stmt).all()
+        for step, model in TIERS:
+            counts[model.__tablename__] += _write(session, model, _fold(rows, step))
+        counts["levels"] += len(rows)
+        mark = upper
+    if mark != start:
+        queries.set_watermark(session, ROLLUP_WATERMARK, mark)
+        session.flush()  # purge_raw reads it back
+
+    counts["purged"] = purge_raw(session, now=now, retention_days=retention_days)
+    return counts
+
+
+def purge_raw(
+    session: Session, *, now: Optional[datetime] = None, retention_days: float = LEVEL_RETENTION_DAYS
+) -> int:
+    """Delete raw levels older than the retention window that compaction has already rolled up.
+
+    The level at the watermark itself is kept: SQLite hands out ``max(id) + 1``,
+    so emptying the table would let new levels reuse ids at or below the mark,
+    and those would be purged without ever being rolled up.
+    """
+
+    mark = queries.get_watermark(session, ROLLUP_WATERMARK)
+    if retention_days <= 0 or mark is None:
+        return 0
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    result = session.execute(
+        delete(CauldronLevel)
+        .where(CauldronLevel.observed_at < cutoff, CauldronLevel.id < mark)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def tier_for(resolution_s: int) -> Optional[Tuple[int, Type[LevelRollupMixin]]]:
+    """Coarsest tier whose bucket is no wider than ``resolution_s``; None means raw levels."""
+
+    fitting = [tier for tier in TIERS if tier[0] <= resolution_s]
+    return fitting[-1] if fitting else None
+
+
+def load_level_series(
+    session: Session,
+    cauldron_ids: Optional[Iterable[str]] = None,
+    *,
+    since: Optional[datetime] = None,
+    resolution_s: int = 0,
+    how: str = "last",
+) -> Dict[str, LevelSeries]:
+    """Level history with at most ``resolution_s`` seconds per point.
+
+    Reads the coarsest tier that qualifies, or raw levels below a minute.
+    Each rolled-up point is a bucket stamped at its start and valued by
+    ``how`` ("last", "mean", "min" or "max"). ``since`` is rounded down to a
+    bucket boundary. Levels not compacted yet are folded in on the fly, so
+    the result is as current as the raw table.
+    """
+
+    if how not in _PICK:
+        raise ValueError(f"unknown rollup value: {how}")
+    tier = tier_for(resolution_s)
+    if tier is None:
+        return queries.load_level_arrays(session, cauldron_ids, since=since)
+    step, model = tier
+    ids = list(cauldron_ids) if cauldron_ids is not None else None
+
+    stmt = select(model.cauldron_id, model.bucket, *_agg_columns(model))
+    raw = select(CauldronLevel.cauldron_id, CauldronLevel.observed_at, CauldronLevel.volume).where(
+        CauldronLevel.observed_at.is_not(None)
+    )
+    mark = queries.get_watermark(session, ROLLUP_WATERMARK)
+    if mark is not None:
+        raw = raw.where(CauldronLevel.id > mark)
+    if ids is not None:
+        stmt = stmt.where(model.cauldron_id.in_(ids))
+        raw = raw.where(CauldronLevel.cauldron_id.in_(ids))
+    if since is not None:
+        start = _bucket(since, step)
+        stmt = stmt.where(model.bucket >= start)
+        raw = raw.where(CauldronLevel.observed_at >= start)
+
+    aggs: Dict[Key, Agg] = {(row[0], row[1]): list(row[2:]) for row in session.execute(stmt)}
+    for key, agg in _fold(session.execute(raw), step).items():
+        aggs[key] = _merge(aggs[key], agg) if key in aggs else agg
+
+    pick = _PICK[how]
+    grouped: Dict[str, Tuple[List[int], List[float]]] = {}
+    for (cauldron_id, bucket), agg in sorted(aggs.items()):
+        stamps, values = grouped.setdefault(cauldron_id, ([], []))
+        stamps.append(to_epoch_us(bucket))
+        values.append(pick(agg))
+    return {cauldron_id: LevelSeries(stamps, values) for cauldron_id, (stamps, values) in grouped.items()}
+
+
+if __name__ == "__main__":
+    init_db()
+    with session_scope() as session:
+        stats = compact(session)
+    print(json.dumps(stats, indent=2))
@@ -13,7 +13,7 @@ from .db import init_db, session_scope
 from .models import NetworkRoute
 from .queries import (
     build_state_overview,
-    record_levels,
+    ingest_levels,
     upsert_cauldron,
     upsert_ticket,
 )
@@ -44,7 +44,7 @@ class EOGSeeder:
     # Public
     # ----------------------------
     def seed(self, *, include_network: bool = True) -> Dict[str, Any]:
-        counts = {"cauldrons": 0, "levels": 0, "tickets": 0, "network": 0}
+        counts = {"cauldrons": 0, "levels": 0, "duplicate_levels": 0, "tickets": 0, "network": 0}
 
         with session_scope() as session:
             # --- Cauldrons ---
@@ -66,6 +66,7 @@ class EOGSeeder:
             else:
                 items = []
 
+            rows_by_cauldron: Dict[str, List[Dict[str, Any]]] = {}
             for item in items:
                 cid = str(item.get("cauldronId") or item.get("cauldron_id") or item.get("id"))
                 # accept a few common field aliases
@@ -75,7 +76,11 @@ class EOGSeeder:
                     or item.get("measurements")
                     or [item]
                 )
-                counts["levels"] += record_levels(session, cid, rows)
+                rows_by_cauldron.setdefault(cid, []).extend(rows)
+            # Bulk insert, committed in chunks; re-seeding skips readings already stored.
+            ingested = ingest_levels(session, rows_by_cauldron, commit=True)
+            counts["levels"] = ingested["inserted"]
+            counts["duplicate_levels"] = ingested["duplicates"]
 
             # --- Tickets (handle wrapped shapes + normalize for unique ticket_code) ---
             raw_tickets = self._tickets_as_list(self._fetch_json("/Tickets") or {})
@@ -0,0 +1,79 @@
+"""Database-wide write version for cheap change detection."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Result, event, insert, select, update
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from .models import StateVersion
+
+_WROTE = "wrote"
+_listeners: List[Callable[[], None]] = []
+
+
+def read_version(session: Session) -> Tuple[str, int]:
+    """``(epoch, value)`` of the ``state_version`` row; ``("", 0)`` before anything was written.
+
+    The row is bumped inside every transaction that changed something, by
+    whichever process ran it (API workers, the seeder, ``rollup``), so a
+    reader that sees a version also sees the rows written up to it. The
+    epoch is drawn when the row is created, so a recreated database never
+    reuses an old version.
+    """
+
+    row = session.execute(select(StateVersion.epoch, StateVersion.value).where(StateVersion.id == 1)).first()
+    return (row.epoch, row.value) if row else ("", 0)
+
+
+def add_write_listener(listener: Callable[[], None]) -> None:
+    """Call ``listener()`` after every commit in this process that changed something.
+
+    Only a wake-up hint for waiters in this process; writes from other
+    processes show up through ``read_version``.
+    """
+
+    _listeners.append(listener)
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session: Session, flush_context: object) -> None:
+    # Re-assigning an unchanged value still lands an object in session.dirty.
+    if session.new or session.deleted or any(session.is_modified(obj) for obj in session.dirty):
+        session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(state: ORMExecuteState) -> Optional[Result]:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    result = state.invoke_statement()
+    if getattr(result, "rowcount", -1) != 0:  # unknown counts as a write
+        state.session.info[_WROTE] = True
+    return result
+
+
+@event.listens_for(Session, "before_commit")
+def _bump(session: Session) -> None:
+    session.flush()  # pending changes only mark the session once flushed
+    if not session.info.get(_WROTE):
+        return
+    bumped = session.execute(
+        update(StateVersion).where(StateVersion.id == 1).values(value=StateVersion.value + 1)
+    ).rowcount
+    if not bumped:
+        session.execute(insert(StateVersion).values(id=1, epoch=uuid.uuid4().hex[:12], value=1))
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session: Session) -> None:
+    if session.info.pop(_WROTE, False):
+        for listener in list(_listeners):
+            listener()
+
+
+@event.listens_for(Session, "after_rollback")
+def _rolled_back(session: Session) -> None:
+    session.info.pop(_WROTE, None)
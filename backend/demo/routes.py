@@ -31,9 +31,11 @@ def trigger_anomaly(payload: DemoAnomalyRequest, session: Session = Depends(get_
     if not cauldron:
         raise HTTPException(status_code=404, detail="Unknown cauldron")
 
+    now = datetime.utcnow()
     event = DrainEvent(
         cauldron_id=cauldron.id,
-        detected_at=datetime.utcnow(),
+        started_at=now,
+        detected_at=now,
         estimated_loss=payload.loss_percent,
         reason=payload.reason,
         confidence=0.5,
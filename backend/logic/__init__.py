@@ -1,5 +1,5 @@
 """Logic helpers that power the tools endpoints."""
 
-from . import audit, demo, detect, forecast, match  # noqa: F401
+from . import assign, audit, demo, detect, forecast, match, series, trend  # noqa: F401
 
-__all__ = ["audit", "demo", "detect", "forecast", "match"]
+__all__ = ["assign", "audit", "demo", "detect", "forecast", "match", "series", "trend"]
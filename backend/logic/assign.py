@@ -0,0 +1,63 @@
+from heapq import heappop, heappush
+from typing import List, Sequence, Tuple
+
+def min_cost_assignment(
+    n_right: int,
+    edges: Sequence[Sequence[Tuple[int, float]]],
+    unmatched_cost: float,
+) -> List[int]:
+    """
+    Sparse min-cost bipartite assignment.
+
+    edges[l] lists (right, cost) candidates for left node l. Every left node
+    may also stay unassigned at `unmatched_cost`, so the result minimizes
+      sum(cost of chosen edges) + unmatched_cost * (#unassigned left nodes)
+    with each right node used at most once. Returns assign[l] = right or -1.
+
+    Successive shortest augmenting paths (Dijkstra with column potentials,
+    as in Jonker-Volgenant). Each search only touches the part of the graph
+    reachable from the new left node, so a sparse, time-windowed graph
+    splits into small independent pieces without an explicit component pass.
+    """
+    n_left = len(edges)
+    # Right nodes n_right + l are private "stay unassigned" slots for left l.
+    adj = [list(cands) + [(n_right + l, unmatched_cost)] for l, cands in enumerate(edges)]
+    price = [0.0] * (n_right + n_left)
+    match_r = [-1] * (n_right + n_left)
+    match_l = [-1] * n_left
+    match_cost = [0.0] * n_left
+
+    for s in range(n_left):
+        dist = {}; pred = {}; heap = []
+        for r, c in adj[s]:
+            d = c - price[r]
+            if d < dist.get(r, float("inf")):
+                dist[r] = d; pred[r] = (s, c); heappush(heap, (d, r))
+        done: List[int] = []; final = set(); sink = -1
+        while heap:
+            d, r = heappop(heap)
+            if r in final or d > dist[r]: continue
+            final.add(r); done.append(r)
+            l = match_r[r]
+            if l < 0:
+                sink = r; break
+            slack = match_cost[l] - price[r]      # tight for the edge l currently holds
+            for r2, c2 in adj[l]:
+                if r2 in final: continue
+                nd = d + c2 - price[r2] - slack
+                if nd < dist.get(r2, float("inf")):
+                    dist[r2] = nd; pred[r2] = (l, c2); heappush(heap, (nd, r2))
+
+        mu = dist[sink]
+        for r in done:
+            price[r] += dist[r] - mu
+
+        r = sink
+        while True:
+            l, c = pred[r]
+            prev = match_l[l]
+            match_r[r] = l; match_l[l] = r; match_cost[l] = c
+            if l == s: break
+            r = prev
+
+    return [r if r < n_right else -1 for r in match_l]
@@ -1,8 +1,23 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 ABS_TOL=5.0
 REL_TOL=0.06
 
+def check_match(m: Dict, d: Dict) -> Optional[Dict]:
+    """Finding for one match against its drain event (empty dict when unknown), or None when within tolerance."""
+    v_true=float(d.get("true_volume",0.0))
+    diff=float(m.get("diff_volume",0.0))
+    thresh=ABS_TOL + REL_TOL*max(1.0,v_true)
+    if not abs(diff)>thresh: return None
+    return {
+        "type":"under_report" if diff<0 else "over_report",
+        "cauldron_id": d.get("cauldron_id","UNKNOWN"),
+        "ticket_id": m.get("ticket_id"),
+        "drain_event_id": m["drain_event_id"],
+        "diff_volume": round(abs(diff),2),
+        "reason": f"|Δ|={abs(diff):.1f} > {ABS_TOL}+{REL_TOL}·{v_true:.1f}"
+    }
+
 def run(input_json: Dict) -> Dict:
     """
     input: { "date":"YYYY-MM-DD",
@@ -13,19 +28,8 @@ def run(input_json: Dict) -> Dict:
     findings: List[Dict]=[]
 
     for m in input_json.get("matches",[]):
-        did=m["drain_event_id"]; d=drains.get(did,{})
-        v_true=float(d.get("true_volume",0.0))
-        diff=float(m.get("diff_volume",0.0))
-        thresh=ABS_TOL + REL_TOL*max(1.0,v_true)
-        if abs(diff)>thresh:
-            findings.append({
-                "type":"under_report" if diff<0 else "over_report",
-                "cauldron_id": d.get("cauldron_id","UNKNOWN"),
-                "ticket_id": m.get("ticket_id"),
-                "drain_event_id": did,
-                "diff_volume": round(abs(diff),2),
-                "reason": f"|Δ|={abs(diff):.1f} > {ABS_TOL}+{REL_TOL}·{v_true:.1f}"
-            })
+        f=check_match(m, drains.get(m["drain_event_id"],{}))
+        if f: findings.append(f)
 
     for tid in input_json.get("unmatched_tickets",[]):
         findings.append({
@@ -1,63 +1,165 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .series import LevelSeries, from_epoch_us
+
 # Tunables (adjust after you see real cadence)
 ROLL_W = 3
 SLOPE_NEG = -2.0     # L/min start
 HYSTERESIS = -0.3    # end
 MIN_EVENT_MIN = 5
 
-def _parse(points):
-    ts = [datetime.fromisoformat(p[0].replace("Z","+00:00")) for p in points]
-    vs = [float(p[1]) for p in points]
-    return ts, vs
-
-def _roll_med(vs, w):
-    if w <= 1 or len(vs) < 2: return vs[:]
-    out=[]; k=w//2
-    for i in range(len(vs)):
-        lo=max(0,i-k); hi=min(len(vs),i+k+1); seg=vs[lo:hi]
-        out.append(sorted(seg)[len(seg)//2])
+def _parse_ts(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace("Z","+00:00"))
+
+def _volumes(points) -> np.ndarray:
+    return np.fromiter((float(p[1]) for p in points), dtype=np.float64, count=len(points))
+
+def _roll_med(vs: np.ndarray, w: int) -> np.ndarray:
+    """
+    Centered rolling median; edge windows are truncated and take the upper
+    median, exactly like sorting each slice and picking seg[len(seg)//2].
+    """
+    n = len(vs)
+    if w <= 1 or n < 2: return vs.copy()
+    k = w // 2; full = 2*k + 1
+    out = np.empty_like(vs)
+    if n >= full:
+        out[k:n-k] = np.partition(sliding_window_view(vs, full), k, axis=1)[:, k]
+        edges = [*range(k), *range(n-k, n)]
+    else:
+        edges = range(n)
+    for i in edges:
+        seg = np.sort(vs[max(0,i-k):min(n,i+k+1)])
+        out[i] = seg[len(seg)//2]
     return out
 
-def _slope(vs):  # Δ per minute (assumes ~1-min spacing)
-    if len(vs)<=1: return [0.0]*len(vs)
-    return [0.0] + [vs[i]-vs[i-1] for i in range(1,len(vs))]
+def _slope(vs: np.ndarray) -> np.ndarray:  # Δ per minute (assumes ~1-min spacing)
+    out = np.zeros_like(vs)
+    if len(vs) > 1: out[1:] = np.diff(vs)
+    return out
+
+def _segments(sl: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Threshold/hysteresis segmentation without walking the samples.
+    An event opens on the first sample <= SLOPE_NEG while idle and closes on
+    the next sample >= HYSTERESIS; start candidates that share a closing
+    sample with the previous candidate fall inside an already-open event.
+    Events still open at the end of the series are dropped.
+    """
+    starts = np.flatnonzero(sl <= SLOPE_NEG)
+    ends = np.flatnonzero(sl >= HYSTERESIS)
+    if not len(starts) or not len(ends):
+        return starts[:0], starts[:0]
+    nxt = np.searchsorted(ends, starts, side="right")
+    opens = np.ones(len(starts), dtype=bool)
+    opens[1:] = nxt[1:] != nxt[:-1]
+    keep = opens & (nxt < len(ends))
+    s = starts[keep]; e = ends[nxt[keep]]
+    long_enough = (e - s) >= MIN_EVENT_MIN
+    return s[long_enough], e[long_enough]
+
+def _event(cid: str, r_fill: float, t_s: datetime, t_e: datetime, drop: float, dur: int) -> Dict:
+    true=drop + r_fill*dur
+    return {
+        "id": f"{cid}-{t_s.isoformat()}-{t_e.isoformat()}",
+        "cauldron_id": cid,
+        "t_start": t_s.isoformat().replace("+00:00","Z"),
+        "t_end":   t_e.isoformat().replace("+00:00","Z"),
+        "level_drop": round(drop,2),
+        "true_volume": round(true,2),
+        "flags":"ok"
+    }
 
 def run(input_json: Dict) -> Dict:
     """
     input: { "date": "YYYY-MM-DD",
              "series":[{"cauldron_id":"C3","r_fill":0.9,"points":[["...Z",480.0], ...]}, ...] }
+    A series may carry "levels" (a LevelSeries), or "timestamps" (datetimes)
+    and "volumes" (array), instead of "points".
     """
     events: List[Dict] = []
     for item in input_json.get("series", []):
         cid=item["cauldron_id"]; r_fill=float(item.get("r_fill",0.0))
-        pts=item.get("points",[])
-        if len(pts)<3: continue
+        levels: Optional[LevelSeries]=item.get("levels"); ts=None
+        if levels is not None:
+            vs=levels.v
+        elif "volumes" in item:
+            ts=item["timestamps"]; vs=np.asarray(item["volumes"], dtype=np.float64)
+        else:
+            pts=item.get("points",[]); vs=_volumes(pts)
+        if len(vs)<3: continue
 
-        ts,vs=_parse(pts)
         vm=_roll_med(vs,ROLL_W)
         sl=_slope(vm)
 
-        in_evt=False; s=None; i=0
-        while i<len(sl):
-            if not in_evt and sl[i]<=SLOPE_NEG:
-                in_evt=True; s=i
-            elif in_evt and sl[i]>=HYSTERESIS:
-                dur=i-s
-                if dur>=MIN_EVENT_MIN:
-                    t_s=ts[s]; t_e=ts[i]
-                    drop=max(0.0, vm[s]-vm[i])
-                    true=drop + r_fill*dur
-                    events.append({
-                        "id": f"{cid}-{t_s.isoformat()}-{t_e.isoformat()}",
-                        "cauldron_id": cid,
-                        "t_start": t_s.isoformat().replace("+00:00","Z"),
-                        "t_end":   t_e.isoformat().replace("+00:00","Z"),
-                        "level_drop": round(drop,2),
-                        "true_volume": round(true,2),
-                        "flags":"ok"
-                    })
-                in_evt=False; s=None
-            i+=1
+        for s, e in zip(*_segments(sl)):
+            s=int(s); e=int(e)
+            if levels is not None: t_s=levels.datetime_at(s); t_e=levels.datetime_at(e)
+            elif ts is not None: t_s=ts[s]; t_e=ts[e]
+            else: t_s=_parse_ts(pts[s][0]); t_e=_parse_ts(pts[e][0])
+            drop=max(0.0, float(vm[s]-vm[e]))
+            events.append(_event(cid, r_fill, t_s, t_e, drop, e-s))
     return {"drain_events": events}
+
+class StreamingDetector:
+    """
+    Incremental counterpart of `run` for a single cauldron.
+
+    Points are fed in time order and only the last 2*(ROLL_W//2) raw samples,
+    the previous smoothed value and any open event are kept between calls, so
+    each feed costs O(new points). A sample's median is final once the k
+    samples after it have arrived, which means the newest k samples stay
+    pending until the next feed. Fed from the start of a series, it emits the
+    same events as `run` apart from ones closing in those last k samples.
+    `state()` is JSON-serializable and restores the detector via `state=`.
+    Points are (iso, volume) pairs or a LevelSeries; the latter are buffered
+    as epoch microseconds and only turned into datetimes for emitted events.
+    """
+
+    def __init__(self, cauldron_id: str, r_fill: float = 0.0, state: Optional[Dict] = None) -> None:
+        state = state or {}
+        self.cauldron_id = cauldron_id
+        self.r_fill = float(r_fill)
+        self.n = int(state.get("n", 0))                         # raw samples seen
+        self.buf = [list(p) for p in state.get("buf", [])]      # [[ts, volume], ...] still needed
+        self.prev = state.get("prev")                           # last smoothed value
+        self.open = state.get("open")                           # [index, ts, smoothed] of open event
+        self.aware = bool(state.get("aware", False))            # epoch timestamps were tz-aware
+
+    def state(self) -> Dict:
+        return {"n": self.n, "buf": self.buf, "prev": self.prev, "open": self.open, "aware": self.aware}
+
+    def _when(self, ts) -> datetime:
+        return _parse_ts(ts) if isinstance(ts, str) else from_epoch_us(ts, self.aware)
+
+    def feed(self, points) -> List[Dict]:
+        k = ROLL_W // 2 if ROLL_W > 1 else 0
+        events: List[Dict] = []
+        if isinstance(points, LevelSeries):
+            self.aware = points.aware
+            points = zip(points.t.tolist(), points.v.tolist())
+        for ts, v in points:
+            self.buf.append([ts, float(v)]); self.n += 1
+            i = self.n - 1 - k
+            if i < 0: continue
+
+            seg = sorted(p[1] for p in self.buf[-(min(i, k) + k + 1):])
+            med = seg[len(seg)//2]
+            ts_i = self.buf[-(k+1)][0]
+            del self.buf[:max(0, len(self.buf) - 2*k)]
+
+            sl = 0.0 if i == 0 else med - self.prev
+            self.prev = med
+            if self.open is None and sl <= SLOPE_NEG:
+                self.open = [i, ts_i, med]
+            elif self.open is not None and sl >= HYSTERESIS:
+                s, ts_s, med_s = self.open
+                if i - s >= MIN_EVENT_MIN:
+                    drop = max(0.0, med_s - med)
+                    events.append(_event(self.cauldron_id, self.r_fill, self._when(ts_s), self._when(ts_i), drop, i - s))
+                self.open = None
+        return events
@@ -3,23 +3,35 @@ from __future__ import annotations
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta, timezone
 import math
-import random
+
+import numpy as np
+
+from .series import LevelSeries
 
 def _iso(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).replace(tzinfo=timezone.utc).isoformat().replace("+00:00","Z")
 
-def _learn_slope(history: List[Tuple[str, float]], fallback_per_min: float) -> float:
+def _as_dt(ts) -> datetime:
+    return ts if isinstance(ts, datetime) else datetime.fromisoformat(ts.replace("Z","+00:00"))
+
+def _learn_slope(history, fallback_per_min: float) -> float:
     """
     Simple linear regression slope (units of volume per minute).
-    If not enough history, fall back to r_fill.
+    If not enough history, fall back to r_fill. History is a LevelSeries or
+    (ts, volume) pairs with ISO strings or datetimes.
     """
-    if not history or len(history) < 3:
+    if history is None or len(history) < 3:
         return fallback_per_min
+    if isinstance(history, LevelSeries):
+        xs = history.minutes(); ys = history.v.astype(np.float64)
+        dx = xs - xs.mean()
+        slope = float(dx @ (ys - ys.mean())) / (float(dx @ dx) or 1.0)
+        return max(-8.0, min(8.0, slope)) if math.isfinite(slope) else fallback_per_min
     # normalize x to minutes from start to reduce floating error
-    t0 = datetime.fromisoformat(history[0][0].replace("Z","+00:00"))
+    t0 = _as_dt(history[0][0])
     xs, ys = [], []
     for ts, v in history:
-        t = datetime.fromisoformat(ts.replace("Z","+00:00"))
+        t = _as_dt(ts)
         xs.append((t - t0).total_seconds() / 60.0)
         ys.append(float(v))
     n = float(len(xs))
@@ -31,6 +43,199 @@ def _learn_slope(history: List[Tuple[str, float]], fallback_per_min: float) -> f
     # clamp to something sane so noise can't explode
     return max(-8.0, min(8.0, slope)) if math.isfinite(slope) else fallback_per_min
 
+QUANTILES = (0.1, 0.5, 0.9)
+ENSEMBLE_CHUNK = 1 << 22   # simulated values per ensemble chunk (~32 MB of float64)
+
+def _parse(ts) -> datetime:
+    return _as_dt(ts).astimezone(timezone.utc)
+
+def _net_rates(now: datetime, H: int, slope_per_min: float, drains: List[Dict]) -> np.ndarray:
+    """
+    Net change for each simulated minute 1..H: the slope plus every drain
+    whose window [ts, ts+minutes) covers that minute, via a difference array.
+    """
+    diff = np.zeros(H + 2)
+    for d in drains:
+        off = (_parse(d["ts"]) - now).total_seconds() / 60.0
+        dur = int(d.get("minutes", 0))
+        lo = min(max(math.ceil(off), 1), H + 1); hi = min(max(math.ceil(off + dur), 1), H + 1)
+        if lo < hi:
+            diff[lo] += float(d.get("rate", 0.0)); diff[hi] -= float(d.get("rate", 0.0))
+    return slope_per_min + np.cumsum(diff)[1:H+1]
+
+def _clip_paths(v0: np.ndarray, inc: np.ndarray, vmax: np.ndarray) -> np.ndarray:
+    """
+    v[:, m] = clip(v[:, m-1] + inc[:, m], 0, vmax) for every row at once.
+
+    Between barrier switches the clipped path is a one-sided Skorokhod map
+    of the free cumulative sum (s minus its running minimum below 0, or the
+    mirror image under vmax), so each phase is a couple of cumulative ops.
+    A row starts a new phase only when it crosses all the way to the other
+    barrier, so the loop runs a handful of times, not once per minute.
+    """
+    rows, n = inc.shape
+    if not n: return np.empty((rows, n))
+    vmax = np.asarray(vmax, dtype=np.float64)
+    csum = np.cumsum(inc, axis=1)
+    # First phase, every row from column 0, reflecting at 0 (in place: it is most of the work).
+    out = csum + np.asarray(v0, dtype=np.float64)[:, None]
+    low = np.minimum.accumulate(out, axis=1)
+    np.minimum(low, 0.0, out=low)
+    out -= low
+    breach = out > vmax[:, None]
+    active = np.flatnonzero(breach.any(axis=1))
+    b = breach[active].argmax(axis=1)
+    out[active, b] = vmax[active]
+
+    # Later phases, only for rows that reached the other barrier.
+    cols = np.arange(n)
+    keep = b + 1 < n
+    active = active[keep]; st = b[keep] + 1
+    base = vmax[active]; up = np.ones(active.size, dtype=bool)   # level before `st`; reflect at vmax
+    while active.size:
+        c0 = int(st.min()); cs = cols[c0:]       # nothing left of the earliest phase start changes
+        vm = vmax[active, None]
+        s = base[:, None] + csum[active, c0:] - csum[active, st - 1][:, None]
+        z = np.where(up[:, None], vm - s, s)     # distance from the reflecting barrier
+        before = cs < st[:, None]
+        low = np.minimum.accumulate(np.where(before, np.inf, z), axis=1)
+        z -= np.minimum(low, 0.0)
+        breach = (z > vm) & ~before
+        hit = breach.any(axis=1)
+        b = np.where(hit, c0 + breach.argmax(axis=1), n)
+        y = np.where(up[:, None], vm - z, z)
+        y = np.where(cs == b[:, None], np.where(up, 0.0, vmax[active])[:, None], y)
+        span = ~before & (cs <= b[:, None])
+        out[active, c0:] = np.where(span, y, out[active, c0:])
+        keep = hit & (b + 1 < n)
+        active = active[keep]; st = b[keep] + 1
+        base = np.where(up[keep], 0.0, vmax[active]); up = ~up[keep]
+    return out
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Column of the first True in each row, -1 where there is none."""
+    if not mask.shape[-1]: return np.full(mask.shape[:-1], -1)
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), -1)
+
+def _iso_minutes(now: datetime, H: int) -> List[str]:
+    """_iso(now + m minutes) for m = 0..H."""
+    t = np.datetime64(now.replace(tzinfo=None), "us") + np.arange(H + 1) * np.timedelta64(60, "s")
+    unit = "us" if now.microsecond else "s"
+    return [ts + "Z" for ts in np.datetime_as_string(t, unit=unit).tolist()]
+
+def _ensemble(group: List[Dict], H: int) -> Dict[int, Tuple[List[List[float]], float, List[Optional[int]]]]:
+    """
+    Monte Carlo paths for the items of one horizon group that ask for an
+    ensemble, simulated together in chunks of at most ENSEMBLE_CHUNK values.
+    Per item: QUANTILES bands per minute, P(overflow within H) and the
+    QUANTILES of the first overflow minute (None past the horizon).
+    """
+    out: Dict[int, Tuple[List[List[float]], float, List[Optional[int]]]] = {}
+    todo = [(j, p) for j, p in enumerate(group) if p["ensemble"] > 0]
+    k = 0
+    while k < len(todo):
+        chunk = [todo[k]]; size = todo[k][1]["ensemble"] * H; k += 1
+        while k < len(todo) and size + todo[k][1]["ensemble"] * H <= ENSEMBLE_CHUNK:
+            chunk.append(todo[k]); size += todo[k][1]["ensemble"] * H; k += 1
+        inc = np.concatenate([
+            p["rates"] + p["rng"].normal(0.0, p["sigma"], (p["ensemble"], H)) for _, p in chunk
+        ]).reshape(-1, H)
+        vmax = np.repeat([p["vmax"] for _, p in chunk], [p["ensemble"] for _, p in chunk])
+        v0 = np.repeat([p["v0"] for _, p in chunk], [p["ensemble"] for _, p in chunk])
+        paths = _clip_paths(v0, inc, vmax)
+        first = _first_true(np.abs(paths - vmax[:, None]) < 1e-6)
+        at = 0
+        for j, p in chunk:
+            rows = slice(at, at + p["ensemble"]); at += p["ensemble"]
+            bands = np.round(np.quantile(paths[rows], QUANTILES, axis=0), 2).tolist() if H else [[] for _ in QUANTILES]
+            minutes = np.where(first[rows] >= 0, first[rows] + 1.0, np.inf)
+            eta = np.quantile(minutes, QUANTILES, method="inverted_cdf")
+            out[j] = (
+                bands,
+                round(float(np.mean(first[rows] >= 0)), 4),
+                [int(m) if np.isfinite(m) else None for m in eta],
+            )
+    return out
+
+def _blended_slope(history, r: float, learned: Optional[float] = None) -> float:
+    # If history exists, learn a better slope (unless the caller already has
+    # one, e.g. from logic.trend); blend with r for stability.
+    if learned is None: learned = _learn_slope(history, r)
+    return 0.6 * learned + 0.4 * r
+
+def _prepare(input_json: Dict) -> Dict:
+    H = int(input_json.get("horizon_min", 240))
+    cur = input_json["current"]
+    r = float(cur.get("r_fill", 0.0))  # baseline per-minute change
+    now = _parse(cur["ts"])
+    history = input_json.get("history", [])
+
+    slope_per_min = _blended_slope(history, r, input_json.get("learned_slope"))
+    if isinstance(history, LevelSeries):
+        history = history.tail(180).points()   # already ordered
+    else:
+        # Ensure history is ordered and trimmed to last 180 min to keep payload small.
+        history = sorted(history, key=lambda p: p[0])[-180:] if history else []
+    return {
+        "H": H, "now": now, "v0": float(cur["volume"]), "vmax": float(cur["vmax"]),
+        "rates": _net_rates(now, H, slope_per_min, input_json.get("scheduled_drains", [])),
+        "sigma": float(input_json.get("noise_sigma", 0.25)),
+        "rng": np.random.default_rng(input_json.get("seed")),
+        "ensemble": int(input_json.get("ensemble", 0)),
+        "history": history,
+    }
+
+def run_batch(items: List[Dict]) -> List[Dict]:
+    """
+    Forecast many cauldrons together; each item and result is as in `run`.
+    Items sharing a horizon are simulated as rows of one 2-D array.
+    """
+    preps = [_prepare(item) for item in items]
+    stamp_cache: Dict[Tuple[datetime, int], List[str]] = {}   # fleets mostly share one "now"
+    results: List[Optional[Dict]] = [None] * len(items)
+    by_h: Dict[int, List[int]] = {}
+    for i, p in enumerate(preps):
+        by_h.setdefault(p["H"], []).append(i)
+
+    for H, idx in by_h.items():
+        group = [preps[i] for i in idx]
+        # add small random noise to feel organic; a "seed" makes it reproducible
+        inc = np.stack([
+            p["rates"] + p["rng"].normal(0.0, p["sigma"], H) if p["sigma"] > 0 else p["rates"]
+            for p in group
+        ]).reshape(len(group), H)
+        vmax = np.array([p["vmax"] for p in group])
+        paths = _clip_paths(np.array([p["v0"] for p in group]), inc, vmax)
+        at_max = np.abs(paths - vmax[:, None]) < 1e-6
+        first = _first_true(at_max)
+        values = np.round(paths, 2).tolist()
+        ensembles = _ensemble(group, H)
+
+        for j, (i, p, vals, f) in enumerate(zip(idx, group, values, first.tolist())):
+            stamps = stamp_cache.get((p["now"], H))
+            if stamps is None:
+                stamps = stamp_cache[(p["now"], H)] = _iso_minutes(p["now"], H)
+            # Stitch: recent history (as-is), the current value, then the simulation.
+            series: List[Tuple[str, float]] = [(ts, float(v)) for ts, v in p["history"]]
+            series.append((stamps[0], round(p["v0"], 2)))
+            series.extend(zip(stamps[1:], vals))
+            results[i] = {
+                "now_ts": stamps[0],
+                "overflow_eta": stamps[f + 1] if f >= 0 else None,
+                "series": series,
+            }
+            if j in ensembles:
+                bands, p_over, eta_q = ensembles[j]
+                results[i]["bands"] = {
+                    f"p{round(q * 100)}": [(stamps[0], round(p["v0"], 2)), *zip(stamps[1:], band)]
+                    for q, band in zip(QUANTILES, bands)
+                }
+                results[i]["overflow_probability"] = p_over
+                results[i]["overflow_eta_quantiles"] = {
+                    f"p{round(q * 100)}": stamps[m] if m is not None else None for q, m in zip(QUANTILES, eta_q)
+                }
+    return results  # type: ignore[return-value]
+
 def run(input_json: Dict) -> Dict:
     """
     Input:
@@ -39,67 +244,83 @@ def run(input_json: Dict) -> Dict:
         "horizon_min": 240,
         "current": { "ts":"...Z", "volume": 480.0, "vmax": 600.0, "r_fill": 0.9 },
         "scheduled_drains": [ { "ts":"...Z", "minutes": 20, "rate": -3.0 } ],
-        "history": [ ["...Z", 470.0], ... ],     # optional, improves accuracy
-        "noise_sigma": 0.25                       # optional, default ~0.25
+        "history": [ ["...Z", 470.0], ... ],     # optional, improves accuracy; or a LevelSeries
+        "learned_slope": 0.82,                    # optional, replaces the slope fitted on history
+        "noise_sigma": 0.25,                      # optional, default ~0.25
+        "seed": 42,                               # optional, fixes the noise
+        "ensemble": 200                           # optional, Monte Carlo paths
       }
     Returns:
       {
         "now_ts": "...Z",
         "overflow_eta": "...Z" | null,
-        "series": [ ["...Z", 463.0], ... ]        # minute resolution, includes history+future
+        "series": [ ["...Z", 463.0], ... ],       # minute resolution, includes history+future
+        # with "ensemble" > 0 only:
+        "bands": { "p10": [ ["...Z", 455.0], ... ], "p50": [...], "p90": [...] },   # from now on
+        "overflow_probability": 0.35,             # share of paths that overflow within the horizon
+        "overflow_eta_quantiles": { "p10": "...Z", "p50": "...Z" | null, "p90": null }
       }
     """
-    H = int(input_json.get("horizon_min", 240))
-    cur = input_json["current"]
-    vmax = float(cur["vmax"])
-    v0   = float(cur["volume"])
-    r    = float(cur.get("r_fill", 0.0))  # baseline per-minute change
-    now  = datetime.fromisoformat(cur["ts"].replace("Z","+00:00")).astimezone(timezone.utc)
-    drains = input_json.get("scheduled_drains", [])
-    history = input_json.get("history", [])
-    sigma = float(input_json.get("noise_sigma", 0.25))
+    return run_batch([input_json])[0]
 
-    # If history exists, learn a better slope; blend with r for stability.
-    learned = _learn_slope(history, r)
-    slope_per_min = 0.6 * learned + 0.4 * r
-
-    series: List[Tuple[str, float]] = []
-
-    # Stitch: include recent history (as-is), then simulate from "now" forward.
-    if history:
-        # Ensure history is ordered and trimmed to last 180 min to keep payload small.
-        hist_sorted = sorted(history, key=lambda p: p[0])[-180:]
-        series.extend((ts, float(v)) for ts, v in hist_sorted)
-
-    # Ensure the last value equals current (align UI & server)
-    last_val = v0
-    series.append((_iso(now), round(last_val, 2)))
-
-    overflow: Optional[str] = None
-
-    for m in range(1, H + 1):
-        t = now + timedelta(minutes=m)
-        net = slope_per_min
-
-        # Apply any scheduled drains (negative rate during window)
-        for d in drains:
-            dt = datetime.fromisoformat(d["ts"].replace("Z","+00:00")).astimezone(timezone.utc)
-            dur = int(d.get("minutes", 0))
-            if 0 <= (t - dt).total_seconds() / 60.0 < dur:
-                net += float(d.get("rate", 0.0))
-
-        # add small random noise to feel organic
-        last_val = last_val + net + random.gauss(0.0, sigma)
-        last_val = max(0.0, min(vmax, last_val))
-
-        ts = _iso(t)
-        series.append((ts, round(last_val, 2)))
-
-        if overflow is None and abs(last_val - vmax) < 1e-6:
-            overflow = ts
+def _eta_minutes(v0: float, vmax: float, slope: float, windows: List[Tuple[float, float, float]]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    First times (minutes from now) the level reaches vmax and 0, exactly,
+    for the noise-free trajectory: it moves at `slope` plus the rate of every
+    (start, end, rate) drain window covering t, clipped to [0, vmax]. The
+    rate is piecewise constant, so each piece is solved in closed form and
+    the last one runs to infinity; None means the barrier is never reached.
+    """
+    events = sorted(
+        [(max(a, 0.0), rate) for a, b, rate in windows if b > max(a, 0.0)]
+        + [(b, -rate) for a, b, rate in windows if b > max(a, 0.0)]
+    )
+    v = min(max(v0, 0.0), vmax)
+    full = 0.0 if v >= vmax else None
+    empty = 0.0 if v <= 0.0 else None
+    t = 0.0; rate = slope; i = 0
+    while full is None or empty is None:
+        while i < len(events) and events[i][0] <= t:
+            rate += events[i][1]; i += 1
+        end = events[i][0] if i < len(events) else math.inf
+        if rate > 0:
+            hit = t + (vmax - v) / rate
+            if hit <= end:
+                full = hit if full is None else full; v = vmax
+            else:
+                v += rate * (end - t)
+        elif rate < 0:
+            hit = t + v / -rate
+            if hit <= end:
+                empty = hit if empty is None else empty; v = 0.0
+            else:
+                v += rate * (end - t)
+        if end == math.inf: break
+        t = end
+    return full, empty
 
+def eta(input_json: Dict) -> Dict:
+    """
+    Closed-form time to full and to empty, with no horizon limit.
+    Input as for `run` (horizon and noise are ignored). Returns
+      { "now_ts":"...Z", "slope_per_min": 0.84,
+        "time_to_full_min": 93.5 | null, "full_eta": "...Z" | null,
+        "time_to_empty_min": null, "empty_eta": null }
+    """
+    cur = input_json["current"]
+    r = float(cur.get("r_fill", 0.0))
+    now = _parse(cur["ts"])
+    slope = _blended_slope(input_json.get("history", []), r, input_json.get("learned_slope"))
+    windows = []
+    for d in input_json.get("scheduled_drains", []):
+        a = (_parse(d["ts"]) - now).total_seconds() / 60.0
+        windows.append((a, a + int(d.get("minutes", 0)), float(d.get("rate", 0.0))))
+    full, empty = _eta_minutes(float(cur["volume"]), float(cur["vmax"]), slope, windows)
     return {
         "now_ts": _iso(now),
-        "overflow_eta": overflow,
-        "series": series
+        "slope_per_min": round(slope, 4),
+        "time_to_full_min": round(full, 2) if full is not None else None,
+        "full_eta": _iso(now + timedelta(minutes=full)) if full is not None else None,
+        "time_to_empty_min": round(empty, 2) if empty is not None else None,
+        "empty_eta": _iso(now + timedelta(minutes=empty)) if empty is not None else None,
     }
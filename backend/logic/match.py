@@ -1,36 +1,221 @@
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
 
-def _closest(target: float, candidates: Dict[str,float]) -> Optional[Tuple[str,float]]:
-    best=None; best_c=1e18
-    for k,v in candidates.items():
-        c=abs(target-v)
-        if c<best_c: best=(k,v); best_c=c
-    return best
+import numpy as np
+
+from .assign import min_cost_assignment
+
+_INF = float("inf")
+_EPOCH = datetime(1970, 1, 1)
+
+# Optimal mode tunables (overridable per request)
+WINDOW_MIN = 1440        # only pair a ticket with drains this close to its scheduled time
+TIME_WEIGHT = 1.0        # cost per hour of |ticket time - drain time|, in volume units
+MAX_CANDIDATES = 32      # cheapest edges kept per ticket, bounds the degree of the graph
+UNMATCHED_COST = 1e9     # leaving a ticket unmatched costs more than any real pairing
+
+class _Pool:
+    """
+    One cauldron's drains as parallel lists sorted by (volume, insertion
+    order). Pools are small, so taken drains are deleted outright and a
+    lookup is two bisects. Drains consumed through the fleet-wide fallback
+    stay behind as tombstones until a lookup lands on them.
+    """
+
+    def __init__(self, pool: Dict[str,float]) -> None:
+        items = sorted(pool.items(), key=lambda kv: kv[1])   # stable: equal volumes keep insertion order
+        self.ids = [k for k,_ in items]
+        self.vals = [v for _,v in items]
+        self.order = dict(zip(pool, range(len(pool))))
+
+    def take(self, target: float, used: Set[str]) -> Optional[Tuple[str,float]]:
+        """Remove and return the drain a linear scan would pick: least |target-v|, ties to the earliest-inserted."""
+        ids = self.ids; vals = self.vals
+        while vals:
+            n = len(vals)
+            p = bisect_left(vals, target)              # vals[:p] < target <= vals[p:]
+            best = min(target-vals[p-1] if p > 0 else _INF, vals[p]-target if p < n else _INF)
+            # First index of every run whose cost ties `best`; distinct volumes
+            # can round to the same cost, so keep walking while the next run ties.
+            tied: List[int] = []
+            i = p
+            while i > 0 and target-vals[i-1] == best:
+                i = bisect_left(vals, vals[i-1], 0, i); tied.append(i)
+            i = p
+            while i < n and vals[i]-target == best:
+                tied.append(i); i = bisect_right(vals, vals[i], i)
+            k = tied[0] if len(tied) == 1 else min(tied, key=lambda i: self.order[ids[i]])
+            did = ids[k]; v = vals[k]
+            del ids[k]; del vals[k]
+            if did not in used:
+                return did, v
+        return None
+
+
+class _VolumeIndex:
+    """
+    Fleet-wide fallback index: drains grouped into buckets of equal volume,
+    sorted by volume. Each bucket lists its drain ids in insertion order and
+    consumed ids are skipped lazily (tombstones), since deleting from a list
+    this large would be O(n). Exhausted buckets are jumped over with
+    path-compressed skip pointers, so a lookup is a bisect plus amortized
+    near-constant work however many drains were already used.
+    """
+
+    def __init__(self, pool: Dict[str,float]) -> None:
+        by_v: Dict[float,List[str]] = {}
+        for did,v in pool.items():
+            by_v.setdefault(v,[]).append(did)
+        self.order = dict(zip(pool, range(len(pool))))
+        self.vals = sorted(by_v)
+        self.buckets = [by_v[v] for v in self.vals]
+        self.heads = [0]*len(self.vals)
+        self.skip_l = list(range(len(self.vals)))
+        self.skip_r = list(range(len(self.vals)))
+
+    def _seek(self, j: int, step: int, used: Set[str]) -> int:
+        """Nearest bucket at or beyond j (in direction step) that still has a drain; -1/len when none."""
+        skip = self.skip_l if step < 0 else self.skip_r
+        buckets = self.buckets; heads = self.heads
+        n = len(buckets); root = j
+        while 0 <= root < n:
+            if skip[root] != root: root = skip[root]; continue
+            b = buckets[root]; h = heads[root]
+            while h < len(b) and b[h] in used: h += 1
+            heads[root] = h
+            if h < len(b): break
+            skip[root] = root + step; root += step
+        while 0 <= j < n and j != root:
+            nxt = skip[j]; skip[j] = root; j = nxt
+        return root
+
+    def closest(self, target: float, used: Set[str]) -> Optional[Tuple[str,float]]:
+        """Same pick as a linear scan: least |target-v|, ties to the earliest-inserted drain."""
+        vals = self.vals; n = len(vals)
+        p = bisect_left(vals, target)                  # vals[:p] < target <= vals[p:]
+        buckets = self.buckets; heads = self.heads
+        # Inline fast path: the neighbouring bucket is usually still live.
+        lo = p-1
+        if lo >= 0 and not (self.skip_l[lo] == lo and heads[lo] < len(buckets[lo]) and buckets[lo][heads[lo]] not in used):
+            lo = self._seek(lo, -1, used)
+        hi = p
+        if hi < n and not (self.skip_r[hi] == hi and heads[hi] < len(buckets[hi]) and buckets[hi][heads[hi]] not in used):
+            hi = self._seek(hi, 1, used)
+        c_lo = target-vals[lo] if lo >= 0 else _INF
+        c_hi = vals[hi]-target if hi < n else _INF
+        if c_lo == c_hi == _INF: return None
+        best = min(c_lo, c_hi)
+        tied = [j for j, c in ((lo, c_lo), (hi, c_hi)) if c == best]
+        # Distinct volumes can round to the same cost. Costs only grow moving
+        # outwards, so keep walking while the next raw bucket still ties.
+        j = lo
+        while j > 0 and target-vals[j-1] == best:
+            j = self._seek(j-1, -1, used)
+            if j >= 0 and target-vals[j] == best: tied.append(j)
+        j = hi
+        while j < n-1 and vals[j+1]-target == best:
+            j = self._seek(j+1, 1, used)
+            if j < n and vals[j]-target == best: tied.append(j)
+        j = tied[0] if len(tied) == 1 else min(tied, key=lambda b: self.order[buckets[b][heads[b]]])
+        return buckets[j][heads[j]], vals[j]
+
+def _minutes(ts: Optional[str]) -> Optional[float]:
+    if not ts: return None
+    dt = datetime.fromisoformat(ts.replace("Z","+00:00"))
+    if dt.tzinfo: dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH).total_seconds() / 60.0
+
+def _run_optimal(input_json: Dict) -> Dict:
+    """
+    Min-cost assignment over cost = |Δvolume| + time_weight·|Δt| (hours).
+    A ticket only gets candidate drains from its own cauldron (any cauldron
+    when it has none) within ±window_minutes of its scheduled time, capped
+    to its max_candidates cheapest; either side missing a timestamp skips
+    the window and adds no time cost.
+    """
+    tickets=input_json.get("tickets",[])
+    window=float(input_json.get("window_minutes",WINDOW_MIN))
+    weight=float(input_json.get("time_weight",TIME_WEIGHT))
+    limit=int(input_json.get("max_candidates",MAX_CANDIDATES))
+    drains=list({d["id"]:d for d in input_json.get("drain_events",[])}.values())
+    dvol=np.array([float(d["true_volume"]) for d in drains], dtype=np.float64)
+    dmin=[_minutes(d.get("ts")) for d in drains]
+
+    # group -> (sorted times, drain indexes in that order, untimed drain indexes)
+    members: Dict[Optional[str],List[int]] = {None: list(range(len(drains)))}
+    for j,d in enumerate(drains):
+        members.setdefault(d["cauldron_id"],[]).append(j)
+    groups: Dict[Optional[str],Tuple[np.ndarray,np.ndarray,np.ndarray]] = {}
+    for key,js in members.items():
+        timed=sorted((j for j in js if dmin[j] is not None), key=lambda j: dmin[j])
+        untimed=[j for j in js if dmin[j] is None]
+        groups[key]=(np.array([dmin[j] for j in timed], dtype=np.float64),
+                     np.array(timed, dtype=np.int64), np.array(untimed, dtype=np.int64))
+    no_group=(np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    edges: List[List[Tuple[int,float]]] = []
+    for t in tickets:
+        vol=float(t["volume"]); tm=_minutes(t.get("ts"))
+        times, timed, untimed = groups.get(t.get("cauldron_id") or None, no_group)
+        if tm is None:
+            cands=np.concatenate([timed, untimed]); cost=np.abs(vol-dvol[cands])
+        else:
+            lo=np.searchsorted(times, tm-window, "left"); hi=np.searchsorted(times, tm+window, "right")
+            cands=np.concatenate([timed[lo:hi], untimed])
+            cost=np.abs(vol-dvol[cands])
+            cost[:hi-lo]+=weight*np.abs(tm-times[lo:hi])/60.0
+        if len(cands)>limit:
+            keep=np.argpartition(cost, limit-1)[:limit]
+            cands=cands[keep]; cost=cost[keep]
+        edges.append(list(zip(cands.tolist(), cost.tolist())))
+
+    assign=min_cost_assignment(len(drains), edges, float(input_json.get("unmatched_cost",UNMATCHED_COST)))
+    matches=[]; unmatched_t=[]
+    for t,j in zip(tickets, assign):
+        if j < 0:
+            unmatched_t.append(t["id"]); continue
+        did=drains[j]["id"]
+        matches.append({
+            "id": f"m-{t['id']}-{did}",
+            "ticket_id": t["id"],
+            "drain_event_id": did,
+            "status":"matched",
+            "diff_volume": round(float(t["volume"])-float(dvol[j]),2)
+        })
+    used={m["drain_event_id"] for m in matches}
+    unmatched_d=[d["id"] for d in drains if d["id"] not in used]
+    return {"matches":matches,"unmatched_tickets":unmatched_t,"unmatched_drains":unmatched_d}
 
 def run(input_json: Dict) -> Dict:
     """
     input: { "date":"YYYY-MM-DD",
              "tickets":[{"id":"T95","volume":95.0,"cauldron_id":null},...],
              "drain_events":[{"id":"d1","cauldron_id":"C3","true_volume":120.1},...] }
+    optional: "mode":"optimal" with "window_minutes"/"time_weight", and a
+    "ts" on tickets and drains; the default "greedy" mode ignores time.
     """
+    if input_json.get("mode","greedy") == "optimal":
+        return _run_optimal(input_json)
     tickets=input_json.get("tickets",[])
     drains=input_json.get("drain_events",[])
     by_c={}; global_map={}
     for d in drains:
         by_c.setdefault(d["cauldron_id"],{})[d["id"]]=float(d["true_volume"])
         global_map[d["id"]]=float(d["true_volume"])
+    pools={cid:_Pool(pool) for cid,pool in by_c.items()}
+    everything=None   # built on first fallback
 
-    matches=[]; used=set()
+    matches=[]; used=set(); matched_t=set()
     for t in tickets:
         tid=t["id"]; vol=float(t["volume"]); cid=t.get("cauldron_id")
-        pool = by_c.get(cid) if cid else None
-        choice=None
-        if pool:
-            choice=_closest(vol, {k:v for k,v in pool.items() if k not in used})
+        pool = pools.get(cid) if cid else None
+        choice=pool.take(vol, used) if pool else None
         if choice is None:
-            choice=_closest(vol, {k:v for k,v in global_map.items() if k not in used})
+            everything=everything or _VolumeIndex(global_map)
+            choice=everything.closest(vol, used)
         if choice is None: continue
-        did,dvol=choice; used.add(did)
+        did,dvol=choice; used.add(did); matched_t.add(tid)
         matches.append({
             "id": f"m-{tid}-{did}",
             "ticket_id": tid,
@@ -39,6 +224,6 @@ def run(input_json: Dict) -> Dict:
             "diff_volume": round(vol-dvol,2)
         })
 
-    unmatched_t=[t["id"] for t in tickets if all(not m["id"].startswith(f"m-{t['id']}-") for m in matches)]
+    unmatched_t=[t["id"] for t in tickets if t["id"] not in matched_t]
     unmatched_d=[d["id"] for d in drains if d["id"] not in used]
     return {"matches":matches,"unmatched_tickets":unmatched_t,"unmatched_drains":unmatched_d}
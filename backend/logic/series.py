@@ -0,0 +1,103 @@
+# backend/logic/series.py
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+_US = 1_000_000
+_EPOCH = datetime(1970, 1, 1)
+
+def to_epoch_us(ts: datetime) -> int:
+    if ts.tzinfo is not None: ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+def from_epoch_us(us: int, aware: bool = False) -> datetime:
+    dt = _EPOCH + timedelta(microseconds=int(us))
+    return dt.replace(tzinfo=timezone.utc) if aware else dt
+
+class LevelSeries:
+    """
+    One cauldron's readings as parallel arrays: `t` is int64 microseconds
+    since the Unix epoch (UTC, ascending) and `v` the volumes in their source
+    float dtype (float64 from SQL or the column store), so nothing is
+    rounded on the way in. `aware` remembers whether the timestamps came
+    from tz-aware datetimes, so `iso()` reproduces the strings `isoformat()`
+    would have given. Slicing, `tail` and `between` return views.
+    """
+    __slots__ = ("t", "v", "aware")
+
+    def __init__(self, t, v, aware: bool = False) -> None:
+        self.t = np.asarray(t, dtype=np.int64)
+        v = np.asarray(v)
+        self.v = v if v.dtype.kind == "f" else v.astype(np.float64)
+        self.aware = aware
+
+    @classmethod
+    def from_datetimes(cls, timestamps: Sequence[datetime], volumes, aware: Optional[bool] = None) -> "LevelSeries":
+        if aware is None: aware = bool(len(timestamps)) and timestamps[0].tzinfo is not None
+        if aware: timestamps = [ts.astimezone(timezone.utc).replace(tzinfo=None) for ts in timestamps]
+        t = np.array(timestamps, dtype="datetime64[us]").view(np.int64)
+        return cls(t, np.asarray(volumes, dtype=np.float64), aware)
+
+    @classmethod
+    def from_points(cls, points: Sequence[Tuple[str, float]]) -> "LevelSeries":
+        """From [[iso, volume], ...] as sent over HTTP."""
+        ts = [datetime.fromisoformat(p[0].replace("Z","+00:00")) for p in points]
+        return cls.from_datetimes(ts, [float(p[1]) for p in points])
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def __getitem__(self, idx: slice) -> "LevelSeries":
+        return LevelSeries(self.t[idx], self.v[idx], self.aware)
+
+    def tail(self, n: int) -> "LevelSeries":
+        return self[max(0, len(self) - n):]
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> "LevelSeries":
+        """Readings with start <= ts < end."""
+        lo = np.searchsorted(self.t, to_epoch_us(start), "left") if start else 0
+        hi = np.searchsorted(self.t, to_epoch_us(end), "left") if end else len(self)
+        return self[lo:hi]
+
+    def datetime_at(self, i: int) -> datetime:
+        return from_epoch_us(self.t[i], self.aware)
+
+    def datetimes(self) -> List[datetime]:
+        return [from_epoch_us(us, self.aware) for us in self.t.tolist()]
+
+    def minutes(self) -> np.ndarray:
+        """Minutes since the first reading, as float64."""
+        return (self.t - self.t[0]) / 60e6 if len(self) else np.zeros(0)
+
+    def iso(self) -> List[str]:
+        """ts.isoformat() for every reading ("Z" instead of "+00:00" when aware)."""
+        dt = self.t.view("datetime64[us]")
+        out = np.datetime_as_string(dt, unit="s").astype(object)
+        frac = self.t % _US != 0                      # isoformat only prints non-zero microseconds
+        if frac.any(): out[frac] = np.datetime_as_string(dt[frac], unit="us")
+        suffix = "Z" if self.aware else ""
+        return [s + suffix for s in out.tolist()]
+
+    def points(self) -> List[Tuple[str, float]]:
+        return list(zip(self.iso(), self.v.tolist()))
+
+    def resample(self, step_s: int, how: str = "last") -> "LevelSeries":
+        """
+        One reading per step_s bucket that has data, stamped at the bucket
+        start; how is "last", "mean", "min" or "max".
+        """
+        if not len(self): return self
+        step = int(step_s) * _US
+        bucket = self.t // step
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        if how == "last":
+            v = self.v[np.r_[starts[1:], len(self)] - 1]
+        elif how == "mean":
+            v = (np.add.reduceat(self.v.astype(np.float64), starts) / np.diff(np.r_[starts, len(self)])).astype(self.v.dtype)
+        elif how in ("min", "max"):
+            v = getattr(np, "minimum" if how == "min" else "maximum").reduceat(self.v, starts)
+        else:
+            raise ValueError(f"unknown resample method: {how}")
+        return LevelSeries(bucket[starts] * step, v, self.aware)
@@ -0,0 +1,86 @@
+# backend/logic/trend.py
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime
+import math
+
+import numpy as np
+
+# Exponentially weighted least squares: a sample's weight halves every
+# HALF_LIFE_MIN minutes, so the fit tracks recent behaviour with no window.
+HALF_LIFE_MIN = 120.0
+MIN_SAMPLES = 3          # below this the slope falls back like _learn_slope does
+SLOPE_CLAMP = 8.0
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _minutes(ts: datetime) -> float:
+    return (ts.replace(tzinfo=None) - _EPOCH).total_seconds() / 60.0
+
+def _shift(s: Dict, t: float) -> None:
+    """Move the reference time forward to t: decay every sum and shift x."""
+    dt = t - s["t"]
+    d = 2.0 ** (-dt / HALF_LIFE_MIN)
+    w, x, sy, xx, xy = s["w"], s["x"], s["y"], s["xx"], s["xy"]
+    s["xx"] = d * (xx - 2*dt*x + dt*dt*w)
+    s["xy"] = d * (xy - dt*sy)
+    s["x"] = d * (x - dt*w)
+    s["y"] = d * sy
+    s["w"] = d * w
+    s["t"] = t
+
+def _fold(s: Dict, ts: datetime, volume: float) -> None:
+    t = _minutes(ts); y = float(volume)
+    if s["t"] is None: s["t"] = t
+    if t > s["t"]: _shift(s, t)
+    dt = t - s["t"]
+    wt = 2.0 ** (dt / HALF_LIFE_MIN)   # dt <= 0 here: x = dt for a late sample
+    s["w"] += wt; s["x"] += wt*dt; s["y"] += wt*y; s["xx"] += wt*dt*dt; s["xy"] += wt*dt*y
+    s["n"] += 1
+
+def _copy(state: Optional[Dict]) -> Dict:
+    return dict(state) if state else {"t": None, "n": 0, "w": 0.0, "x": 0.0, "y": 0.0, "xx": 0.0, "xy": 0.0}
+
+def update(state: Optional[Dict], ts: datetime, volume: float) -> Dict:
+    """
+    Fold one observation into the running weighted sums in O(1).
+    x is measured in minutes relative to the newest sample `t`, so moving t
+    forward by dt decays every sum by 2^(-dt/H) and shifts x by -dt; a late
+    sample is simply added with its own smaller weight.
+    """
+    s = _copy(state)
+    _fold(s, ts, volume)
+    return s
+
+def update_many(state: Optional[Dict], samples: Iterable[Tuple[datetime, float]]) -> Dict:
+    """
+    Same as calling `update` for each (ts, volume) in turn, in one pass of
+    array arithmetic. The result does not depend on the order of the
+    samples: every sum ends up relative to the newest time T, with each
+    sample weighted 2^((t - T)/H) and the old sums decayed by the shift.
+    """
+    pts = list(samples)
+    if not pts: return _copy(state)
+    t = np.fromiter((_minutes(ts) for ts, _ in pts), dtype=np.float64, count=len(pts))
+    y = np.fromiter((float(v) for _, v in pts), dtype=np.float64, count=len(pts))
+    s = _copy(state)
+    T = float(t.max())
+    if s["t"] is None: s["t"] = T
+    elif T > s["t"]: _shift(s, T)
+    T = s["t"]
+    dt = t - T
+    wt = np.exp2(dt / HALF_LIFE_MIN)
+    s["w"] += float(wt.sum()); s["x"] += float(wt @ dt); s["y"] += float(wt @ y)
+    s["xx"] += float(wt @ (dt*dt)); s["xy"] += float(wt @ (dt*y))
+    s["n"] += len(pts)
+    return s
+
+def slope(state: Optional[Dict], fallback_per_min: float) -> float:
+    """Weighted regression slope (volume per minute), clamped like _learn_slope."""
+    if not state or state.get("n", 0) < MIN_SAMPLES:
+        return fallback_per_min
+    w, x, y, xx, xy = state["w"], state["x"], state["y"], state["xx"], state["xy"]
+    den = w*xx - x*x
+    if not den > 1e-12 * max(1.0, w*xx): return fallback_per_min
+    b = (w*xy - x*y) / den
+    return max(-SLOPE_CLAMP, min(SLOPE_CLAMP, b)) if math.isfinite(b) else fallback_per_min
@@ -0,0 +1,41 @@
+"""Differences between two dashboard overviews."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# Row key of every list section of ``build_state_overview``.
+SECTION_KEYS = {
+    "cauldrons": "cauldron_id",
+    "tickets": "ticket_code",
+    "matches": "match_id",
+    "drain_events": "event_id",
+    "agent_trace": "trace_id",
+}
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed from ``old`` to ``new``; unchanged sections are left out.
+
+    A list section becomes ``{"ids": [...], "rows": [...]}``: ``ids`` is the
+    section's full key order and ``rows`` only the rows that are new or
+    differ; a client that holds ``old`` rebuilds the list from the two.
+    Any other section is sent whole when it changed.
+    """
+
+    changes: Dict[str, Any] = {}
+    for section, value in new.items():
+        before = old.get(section)
+        if value == before:
+            continue
+        key = SECTION_KEYS.get(section)
+        if key is None or not isinstance(before, list):
+            changes[section] = value
+            continue
+        seen = {row.get(key): row for row in before}
+        changes[section] = {
+            "ids": [row.get(key) for row in value],
+            "rows": [row for row in value if seen.get(row.get(key)) != row],
+        }
+    return changes
+
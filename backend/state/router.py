@@ -2,15 +2,237 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import base64
+import binascii
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from backend.core.db import get_session
+from backend.core import queries
 from backend.core.queries import build_state_overview
+from backend.core.version import read_version
+from backend.tools.forecast import ForecastBatchRequest, forecast_batch
+
+from . import delta
+from .stream import Broadcaster
 
 router = APIRouter(prefix="/state", tags=["state"])
 
+SNAPSHOT_HISTORY = 32  # overviews kept for ?since= deltas; older cursors get a full snapshot
+
+# (cursor, ETag, JSON body) of the last overview built
+_snapshot: Optional[Tuple[str, str, bytes]] = None
+# cursor -> encoded overview, oldest first
+_history: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_history_lock = threading.Lock()
+# (ETag, event body) of the last stream snapshot built
+_stream: Optional[Tuple[str, bytes]] = None
+
+STREAM_FORECASTS = 3  # cauldrons forecast for the dashboard, besides the planner's target
+STREAM_HORIZON = 240
+
+
+def _overview_snapshot(session: Session) -> Tuple[str, str, bytes]:
+    """``(cursor, ETag, body)`` for the current write version, published once per version.
+
+    Costs one single-row query when nothing changed. The cursor (and ETag)
+    is ``<epoch>-<version>`` from ``state_version``, which every process's
+    writes bump, so no worker serves an overview older than the database.
+    """
+
+    global _snapshot
+    epoch, version = read_version(session)  # read first: a write landing mid-build only causes one extra rebuild
+    cursor = f"{epoch}-{version}"
+    snapshot = _snapshot
+    if snapshot is None or snapshot[0] != cursor:
+        overview = jsonable_encoder(build_state_overview(session))
+        body = json.dumps(overview).encode()
+        snapshot = (cursor, f'"{cursor}"', body)
+        with _history_lock:
+            # a concurrent build of this version may have published first; deltas keep using its copy
+            if cursor not in _history:
+                _history[cursor] = overview
+                while len(_history) > SNAPSHOT_HISTORY:
+                    _history.popitem(last=False)
+                _snapshot = snapshot
+    return snapshot
+
+
+@lru_cache(maxsize=SNAPSHOT_HISTORY)
+def _delta_body(since: str, cursor: str) -> Optional[bytes]:
+    """Encoded changes between two stored versions; None once either left the history."""
+
+    with _history_lock:
+        old, new = _history.get(since), _history.get(cursor)
+    if old is None or new is None:
+        return None
+    changes = delta.diff(old, new)
+    return json.dumps({"cursor": cursor, "full": False, "changes": changes}).encode()
+
+
+def _since_body(since: str, cursor: str, body: bytes) -> bytes:
+    """Body for ``?since=``: the changes after that cursor, or the full overview when it is unknown."""
+
+    changes = _delta_body(since, cursor)
+    if changes is not None:
+        return changes
+    return b'{"cursor": "' + cursor.encode() + b'", "full": true, "overview": ' + body + b"}"
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
 
 @router.get("/overview")
-def overview(session: Session = Depends(get_session)) -> dict:
-    return build_state_overview(session)
+def overview(request: Request, since: Optional[str] = None, session: Session = Depends(get_session)) -> Response:
+    """Dashboard snapshot with a strong ETag; a matching If-None-Match gets 304 after one version read.
+
+    With ``since`` (a cursor from an earlier response) the body is
+    ``{"cursor", "full": false, "changes"}`` holding only what changed
+    after it (see ``delta.diff``), or ``{"cursor", "full": true,
+    "overview"}`` when this process no longer holds (or never built) the
+    overview for that cursor.
+    """
+
+    cursor, etag, body = _overview_snapshot(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if since is not None:
+        body = _since_body(since, cursor, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _encode_key(key: Optional[queries.Keyset]) -> Optional[str]:
+    if key is None:
+        return None
+    sort, row_id = key
+    raw = json.dumps([sort.isoformat() if sort else None, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_key(cursor: Optional[str]) -> Optional[queries.Keyset]:
+    if not cursor:
+        return None
+    try:
+        sort, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (datetime.fromisoformat(sort) if sort else None, int(row_id))
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+Pager = Callable[..., Tuple[List[Dict[str, Any]], Optional[queries.Keyset]]]
+
+
+def _page(pager: Pager, session: Session, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    items, next_key = pager(session, limit, _decode_key(cursor))
+    return {"items": items, "next_cursor": _encode_key(next_key)}
+
+
+PAGE_LIMIT = Query(50, ge=1, le=500)
+
+
+@router.get("/tickets")
+def list_tickets(
+    limit: int = PAGE_LIMIT, cursor: Optional[str] = None, session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    """Tickets newest first; pass ``next_cursor`` back as ``cursor`` for the next page."""
+
+    return _page(queries.page_tickets, session, limit, cursor)
+
+
+@router.get("/matches")
+def list_matches(
+    limit: int = PAGE_LIMIT, cursor: Optional[str] = None, session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    return _page(queries.page_matches, session, limit, cursor)
+
+
+@router.get("/drain_events")
+def list_drain_events(
+    limit: int = PAGE_LIMIT, cursor: Optional[str] = None, session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    return _page(queries.page_drain_events, session, limit, cursor)
+
+
+@router.get("/agent_trace")
+def list_agent_trace(
+    limit: int = PAGE_LIMIT, cursor: Optional[str] = None, session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    return _page(queries.page_agent_trace, session, limit, cursor)
+
+
+def _forecast_targets(overview: Dict[str, Any]) -> List[str]:
+    """The planner's latest target, then the first STREAM_FORECASTS cauldrons: what the dashboard charts."""
+
+    planner = next(
+        (row["context"]["cauldron_id"] for row in overview.get("agent_trace", []) if (row.get("context") or {}).get("cauldron_id")),
+        None,
+    )
+    cauldrons = [row["cauldron_id"] for row in overview.get("cauldrons", [])[:STREAM_FORECASTS]]
+    return list(dict.fromkeys(cid for cid in [planner, *cauldrons] if cid))
+
+
+def _stream_snapshot(session: Session) -> Tuple[str, bytes]:
+    """The overview plus audit ``findings`` and dashboard ``forecasts``, built once per version.
+
+    Clients on the stream take both from the event instead of each asking
+    ``/tools/audit`` and ``/tools/forecast/batch`` on every change. Nothing
+    here logs a trace, so pushing an event never bumps the version itself.
+    """
+
+    global _stream
+    cursor, etag, body = _overview_snapshot(session)
+    stream = _stream
+    if stream is None or stream[0] != etag:
+        with _history_lock:
+            overview = _history.get(cursor)
+        if overview is None:
+            overview = json.loads(body)
+        request = ForecastBatchRequest(cauldron_ids=_forecast_targets(overview), horizon_minutes=STREAM_HORIZON)
+        ids, by_id, _ = forecast_batch(session, request)
+        forecasts = [by_id[cid][1] for cid in ids]
+        extras = {"findings": queries.audit_findings(session), "forecasts": jsonable_encoder(forecasts)}
+        stream = _stream = (etag, json.dumps({**overview, **extras}).encode())
+    return stream
+
+
+broadcaster = Broadcaster(_stream_snapshot)
+
+
+@router.get("/stream")
+async def stream(request: Request) -> StreamingResponse:
+    """Server-Sent Events: an ``overview`` event per change, a comment line as heartbeat.
+
+    Event data is the overview with ``findings`` and ``forecasts`` added
+    (see ``_stream_snapshot``).
+
+    Each event's id is the overview ETag; a reconnecting EventSource sends it
+    back as Last-Event-ID and only gets an event once something changed.
+    """
+
+    last = request.headers.get("last-event-id")
+
+    async def events() -> AsyncIterator[bytes]:
+        yield b"retry: 3000\n\n"
+        async for snapshot in broadcaster.subscribe(f'"{last}"' if last else None):
+            if snapshot is None:
+                yield b": keepalive\n\n"
+                continue
+            etag, body = snapshot
+            yield b"id: " + etag.strip('"').encode() + b"\nevent: overview\ndata: " + body + b"\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
@@ -0,0 +1,110 @@
+"""Push overview snapshots to every connected dashboard over Server-Sent Events."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Callable, Optional, Set, Tuple
+
+from backend.core.db import session_scope
+from backend.core.version import add_write_listener
+
+HEARTBEAT_S = 15.0  # idle proxies close silent connections
+POLL_S = 1.0  # how often to check for writes made by other processes
+
+Snapshot = Tuple[str, bytes]  # (ETag, JSON body)
+
+
+class _Subscriber:
+    """One client's mailbox: holds only the newest undelivered snapshot."""
+
+    def __init__(self) -> None:
+        self.pending: Optional[Snapshot] = None
+        self.ready = asyncio.Event()
+
+    def offer(self, snapshot: Snapshot) -> None:
+        self.pending = snapshot  # a slow client skips versions instead of queueing them
+        self.ready.set()
+
+    async def next(self, timeout: float) -> Optional[Snapshot]:
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        snapshot, self.pending = self.pending, None
+        return snapshot
+
+
+class Broadcaster:
+    """Builds the overview once per write version and fans it out to subscribers.
+
+    A single task per event loop wakes on every local commit, and every
+    POLL_S seconds for writes from other processes, checks the database
+    write version and, when it moved, builds the snapshot in a worker
+    thread and hands it to every subscriber. The database therefore sees
+    one version read per POLL_S and one overview build per change, however
+    many clients are connected. The task starts with the first subscriber.
+    """
+
+    def __init__(self, build: Callable[..., Snapshot]) -> None:
+        self._build = build
+        self._subscribers: Set[_Subscriber] = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latest: Optional[Snapshot] = None
+        add_write_listener(self._on_write)
+
+    def _on_write(self) -> None:
+        changed, task = self._changed, self._task
+        if changed is not None and task is not None and not task.done():
+            task.get_loop().call_soon_threadsafe(changed.set)
+
+    async def _snapshot(self) -> Snapshot:
+        def build() -> Snapshot:
+            with session_scope() as session:
+                return self._build(session)
+
+        return await asyncio.to_thread(build)
+
+    async def _run(self) -> None:
+        assert self._changed is not None
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._changed.wait(), POLL_S)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            if not self._subscribers:
+                break
+            snapshot = await self._snapshot()
+            if self._latest is not None and snapshot[0] == self._latest[0]:
+                continue
+            self._latest = snapshot
+            for subscriber in list(self._subscribers):
+                subscriber.offer(snapshot)
+
+    async def subscribe(self, last_etag: Optional[str] = None) -> AsyncIterator[Optional[Snapshot]]:
+        """Yield the current snapshot, then one per change; None when HEARTBEAT_S passes quietly."""
+
+        subscriber = _Subscriber()
+        self._subscribers.add(subscriber)
+        try:
+            if self._task is None or self._task.done():
+                self._changed = asyncio.Event()
+                self._task = asyncio.create_task(self._run())
+            snapshot: Optional[Snapshot] = await self._snapshot()
+            while True:
+                if snapshot is None:
+                    yield None
+                elif snapshot[0] != last_etag:
+                    last_etag = snapshot[0]
+                    yield snapshot
+                snapshot = await subscriber.next(HEARTBEAT_S)
+        finally:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers and self._changed is not None:
+                self._changed.set()  # let the task see it has no one left and exit
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
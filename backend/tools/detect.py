@@ -5,17 +5,21 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from backend.core import queries
+from backend.core import queries, rollup
 from backend.core.db import get_session
-from backend.core.models import Cauldron, CauldronLevel, DrainEvent
+from backend.core.levelstore import level_store
+from backend.core.models import Cauldron, CauldronLevel, DetectorState
 from backend.logic import detect as detect_logic
 
 router = APIRouter()
 
+PERSIST_RESOLUTION_S = 60  # detect_logic's thresholds assume about one level per minute
+
 
 def _pick_target_cauldron(payload_ids: Optional[List[str]], cauldrons: List[Cauldron], session: Session) -> Optional[str]:
     if payload_ids:
@@ -26,10 +30,82 @@ def _pick_target_cauldron(payload_ids: Optional[List[str]], cauldrons: List[Caul
     return fallback[0] if fallback else None
 
 
+def _detect_incremental(session: Session, cauldrons: List[Cauldron], cutoff: datetime, save: bool) -> List[dict]:
+    """Feed each cauldron's streaming detector the levels past its saved watermark.
+
+    Only with ``save`` is the advanced detector state stored, so a preview
+    leaves those levels for the next persisting run.
+    """
+
+    ids = [cauldron.id for cauldron in cauldrons]
+    states = {
+        state.cauldron_id: state
+        for state in session.query(DetectorState).filter(DetectorState.cauldron_id.in_(ids))
+    }
+    if level_store is not None:
+        arrays = {}
+        for cid in ids:
+            state = states.get(cid)
+            if state is not None and state.watermark is not None:
+                levels = level_store.read(cid, state.watermark, after=True)
+            else:
+                levels = level_store.read(cid, cutoff)
+            if len(levels):
+                arrays[cid] = levels
+    else:
+        watermark = (
+            select(DetectorState.watermark)
+            .where(DetectorState.cauldron_id == CauldronLevel.cauldron_id)
+            .scalar_subquery()
+        )
+        arrays = queries.load_level_arrays(
+            session,
+            ids,
+            where=or_(
+                CauldronLevel.observed_at > watermark,
+                watermark.is_(None) & (CauldronLevel.observed_at >= cutoff),
+            ),
+        )
+
+    events: List[dict] = []
+    for cauldron in cauldrons:
+        if cauldron.id not in arrays:
+            continue
+        levels = arrays[cauldron.id]
+        state = states.get(cauldron.id)
+        detector = detect_logic.StreamingDetector(
+            cauldron.id,
+            cauldron.fill_rate or 0.0,
+            state=state.state if state else None,
+        )
+        events.extend(detector.feed(levels))
+
+        if not save:
+            continue
+        if state is None:
+            state = DetectorState(cauldron_id=cauldron.id)
+            session.add(state)
+        state.watermark = levels.datetime_at(-1)
+        state.state = detector.state()
+    return events
+
+
 class DetectRequest(BaseModel):
     cauldron_ids: Optional[List[str]] = Field(default=None)
     minutes: int = Field(180, ge=30, le=1440)
     persist: bool = True
+    incremental: bool = Field(
+        False,
+        description="Only scan levels newer than each cauldron's saved detector state; `minutes` bounds the first run.",
+    )
+    resolution_s: int = Field(
+        0,
+        ge=0,
+        description=(
+            "Read the coarsest level rollup no wider than this many seconds (60 = 1-minute buckets); 0 reads raw levels. "
+            "Wider than 60 is a preview only and needs persist=false."
+        ),
+    )
 
 
 class DetectResponse(BaseModel):
@@ -38,52 +114,40 @@ class DetectResponse(BaseModel):
 
 @router.post("/detect", response_model=DetectResponse)
 def run_detect(payload: DetectRequest, session: Session = Depends(get_session)) -> DetectResponse:
+    if payload.persist and payload.resolution_s > PERSIST_RESOLUTION_S:
+        # The thresholds are per-minute slopes and durations; coarser buckets would store skewed events.
+        raise HTTPException(status_code=400, detail=f"persist needs resolution_s <= {PERSIST_RESOLUTION_S}")
     cutoff = datetime.utcnow() - timedelta(minutes=payload.minutes)
     cauldron_query = session.query(Cauldron)
     if payload.cauldron_ids:
         cauldron_query = cauldron_query.filter(Cauldron.id.in_(payload.cauldron_ids))
     cauldrons = cauldron_query.order_by(Cauldron.id).all()
 
-    series: List[dict] = []
-    for cauldron in cauldrons:
-        levels = (
-            session.query(CauldronLevel)
-            .filter(
-                CauldronLevel.cauldron_id == cauldron.id,
-                CauldronLevel.observed_at >= cutoff,
+    if payload.incremental:
+        result = {"drain_events": _detect_incremental(session, cauldrons, cutoff, payload.persist)}
+    else:
+        if level_store is not None and not payload.resolution_s:
+            arrays = {cauldron.id: level_store.read(cauldron.id, cutoff) for cauldron in cauldrons}
+            arrays = {cid: levels for cid, levels in arrays.items() if len(levels)}
+        else:
+            arrays = rollup.load_level_series(
+                session, payload.cauldron_ids, since=cutoff, resolution_s=payload.resolution_s
             )
-            .order_by(CauldronLevel.observed_at)
-            .all()
-        )
-        if not levels:
-            continue
-        points = [
-            [lvl.observed_at.isoformat().replace("+00:00", "Z"), lvl.volume or 0.0]
-            for lvl in levels
-        ]
-        series.append(
+        series = [
             {
                 "cauldron_id": cauldron.id,
                 "r_fill": cauldron.fill_rate or 0.0,
-                "points": points,
+                "levels": arrays[cauldron.id],
             }
-        )
+            for cauldron in cauldrons
+            if cauldron.id in arrays
+        ]
 
-    logic_payload = {"date": datetime.utcnow().date().isoformat(), "series": series}
-    result = detect_logic.run(logic_payload)
+        logic_payload = {"date": datetime.utcnow().date().isoformat(), "series": series}
+        result = detect_logic.run(logic_payload)
 
     if payload.persist:
-        for event in result.get("drain_events", []):
-            detected_at = datetime.fromisoformat(event["t_end"].replace("Z", "+00:00"))
-            drain = DrainEvent(
-                cauldron_id=event["cauldron_id"],
-                detected_at=detected_at,
-                estimated_loss=event.get("true_volume"),
-                reason="logic_detect",
-                confidence=0.8,
-                extra=event,
-            )
-            session.add(drain)
+        queries.record_drain_events(session, result.get("drain_events", []), reason="logic_detect", confidence=0.8)
 
     target_id = _pick_target_cauldron(payload.cauldron_ids, cauldrons, session)
     input_payload = payload.model_dump()
@@ -1,26 +1,42 @@
-"""Forecast endpoint."""
+"""Forecast endpoints."""
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
-from typing import List, Optional
+import struct
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
+import numpy as np
 from sqlalchemy.orm import Session
 
 from backend.core import queries
+from backend.core.cache import forecast_cache
 from backend.core.db import get_session
-from backend.core.models import Cauldron, CauldronLevel
+from backend.core.levelstore import level_store
+from backend.core.models import Cauldron
 from backend.logic import forecast as forecast_logic
+from backend.logic import trend as trend_logic
+from backend.logic.series import LevelSeries
 
 router = APIRouter()
 
 
+SeriesFormat = Literal["points", "compact", "binary"]
+FORMAT_DESCRIPTION = (
+    "points: one {ts, volume} object per minute; compact: t0/step_ms (epoch ms) plus flat value arrays; "
+    "binary: little-endian float32 frames (see _frame)."
+)
+
+
 class ForecastRequest(BaseModel):
     cauldron_id: str
     horizon_minutes: int = Field(240, ge=30, le=1440)
+    ensemble: int = Field(0, ge=0, le=1000, description="Monte Carlo paths for quantile bands; 0 for a single path.")
+    format: SeriesFormat = Field("points", description=FORMAT_DESCRIPTION)
 
 
 class ForecastPoint(BaseModel):
@@ -32,6 +48,39 @@ class ForecastResponse(BaseModel):
     cauldron_id: str
     overflow_eta: Optional[str]
     series: List[ForecastPoint]
+    bands: Optional[Dict[str, List[ForecastPoint]]] = None
+    overflow_probability: Optional[float] = None
+    overflow_eta_quantiles: Optional[Dict[str, Optional[str]]] = None
+
+
+class ForecastBatchRequest(BaseModel):
+    cauldron_ids: Optional[List[str]] = Field(None, description="Defaults to every cauldron.")
+    horizon_minutes: int = Field(240, ge=30, le=1440)
+    ensemble: int = Field(0, ge=0, le=1000)
+    format: SeriesFormat = Field("points", description=FORMAT_DESCRIPTION)
+
+
+class ForecastBatchResponse(BaseModel):
+    forecasts: List[ForecastResponse]
+
+
+class ForecastEtaRequest(BaseModel):
+    cauldron_ids: Optional[List[str]] = Field(None, description="Defaults to every cauldron.")
+
+
+class CauldronEta(BaseModel):
+    cauldron_id: str
+    volume: float
+    max_volume: float
+    slope_per_min: float
+    time_to_full_min: Optional[float]
+    full_eta: Optional[str]
+    time_to_empty_min: Optional[float]
+    empty_eta: Optional[str]
+
+
+class ForecastEtaResponse(BaseModel):
+    etas: List[CauldronEta]
 
 
 def _fallback_forecast(cauldron_id: str) -> ForecastResponse:
@@ -50,79 +99,373 @@ def _fallback_forecast(cauldron_id: str) -> ForecastResponse:
     )
 
 
-@router.post("/forecast", response_model=ForecastResponse)
-def run_forecast(payload: ForecastRequest, session: Session = Depends(get_session)) -> ForecastResponse:
-    cauldron = session.get(Cauldron, payload.cauldron_id)
-    if not cauldron:
-        fallback = _fallback_forecast(payload.cauldron_id)
-        queries.log_agent_trace(
-            session,
-            agent="nemotron",
-            action="forecast",
-            input_payload=payload.model_dump(),
-            output_payload=fallback.model_dump(),
-            tags=["forecast", "fallback"],
-        )
-        return fallback
+HISTORY_POINTS = 360  # regression window for cauldrons without a stored trend state
+SERIES_POINTS = 180   # history the forecast series echoes back
 
-    level = (
-        session.query(CauldronLevel)
-        .filter(CauldronLevel.cauldron_id == cauldron.id)
-        .order_by(CauldronLevel.observed_at.desc())
-        .first()
-    )
-    if not level or not level.observed_at:
-        fallback = _fallback_forecast(payload.cauldron_id)
-        queries.log_agent_trace(
-            session,
-            agent="nemotron",
-            action="forecast",
-            input_payload=payload.model_dump(),
-            output_payload=fallback.model_dump(),
-            tags=["forecast", "fallback"],
-        )
-        return fallback
-
-    history_rows = (
-        session.query(CauldronLevel)
-        .filter(CauldronLevel.cauldron_id == cauldron.id)
-        .order_by(CauldronLevel.observed_at.desc())
-        .limit(360)
-        .all()
-    )
-    history = [
-        (
-            row.observed_at.isoformat().replace("+00:00", "Z"),
-            float(row.volume or 0.0),
-        )
-        for row in reversed(history_rows)
-        if row.observed_at
-    ]
 
-    logic_payload = {
+def _load_inputs(
+    session: Session, cauldrons: Dict[str, Cauldron], keep: int
+) -> Tuple[Dict[str, LevelSeries], Dict[str, Optional[float]]]:
+    """Recent levels plus the trend-state slope (None when there is no usable state yet) per cauldron.
+
+    With a stored slope only ``keep`` levels are needed; otherwise, or while
+    the state has folded fewer than ``trend.MIN_SAMPLES`` readings, the full
+    regression window is loaded and the logic fits the slope itself. Levels
+    come from the memory-mapped level store when one is configured.
+    """
+    states = {
+        cid: state
+        for cid, state in queries.slope_states(session, list(cauldrons)).items()
+        if state.get("n", 0) >= trend_logic.MIN_SAMPLES
+    }
+    limit = keep if all(cid in states for cid in cauldrons) else max(keep, HISTORY_POINTS)
+    if level_store is not None:
+        histories = {cid: level_store.tail(cid, limit) for cid in cauldrons}
+        histories = {cid: history for cid, history in histories.items() if len(history)}
+    else:
+        histories = queries.load_recent_levels(session, list(cauldrons), limit=limit)
+    learned = {
+        cid: trend_logic.slope(states[cid], cauldron.fill_rate or 0.0) if cid in states else None
+        for cid, cauldron in cauldrons.items()
+    }
+    return histories, learned
+
+
+def _cache_key(cauldron: Cauldron, latest: datetime, horizon: int, ensemble: int) -> tuple:
+    return (cauldron.id, latest, horizon, ensemble, cauldron.max_volume, cauldron.fill_rate)
+
+
+def _logic_payload(
+    cauldron: Cauldron,
+    history: LevelSeries,
+    horizon: int,
+    ensemble: int,
+    learned: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    return {
         "cauldron_id": cauldron.id,
-        "horizon_min": payload.horizon_minutes,
+        "horizon_min": horizon,
         "current": {
-            "ts": level.observed_at.isoformat().replace("+00:00", "Z"),
-            "volume": level.volume or 0.0,
+            "ts": history.datetime_at(-1),
+            "volume": float(history.v[-1]),
             "vmax": (cauldron.max_volume or 0.0),
             "r_fill": cauldron.fill_rate or 0.0,
         },
         "scheduled_drains": [],
         "history": history,
+        "learned_slope": learned,
+        "ensemble": ensemble,
+        "seed": seed,
     }
-    result = forecast_logic.run(logic_payload)
+
+
+def _forecast_response(cauldron_id: str, result: dict) -> ForecastResponse:
     response = ForecastResponse(
-        cauldron_id=cauldron.id,
+        cauldron_id=cauldron_id,
         overflow_eta=result.get("overflow_eta"),
         series=[ForecastPoint(ts=ts, volume=vol) for ts, vol in result.get("series", [])],
     )
+    if "bands" in result:
+        response.bands = {
+            name: [ForecastPoint(ts=ts, volume=vol) for ts, vol in band] for name, band in result["bands"].items()
+        }
+        response.overflow_probability = result["overflow_probability"]
+        response.overflow_eta_quantiles = result["overflow_eta_quantiles"]
+    return response
+
+
+_EPOCH = datetime(1970, 1, 1)
+STEP_S = 60
+# Binary frame header, little-endian: magic, version, flags (1 = overflow_eta set,
+# 2 = bands follow), cauldron id length, history points, future points, t0 and
+# overflow_eta in epoch ms, step in ms. Then the UTF-8 id, history epoch ms
+# (int64), history volumes (float32), future volumes (float32) and, with
+# flag 2, the p10/p50/p90 bands (float32 each). Batch bodies concatenate frames.
+_FRAME = struct.Struct("<4sBBHIIqqI")
+FRAME_MAGIC = b"FCS1"
+
+
+def _epoch_ms(ts: str) -> int:
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def _split(result: dict, n_future: int) -> Tuple[list, list]:
+    series = result.get("series", [])
+    cut = max(0, len(series) - n_future)
+    return series[:cut], series[cut:]
+
+
+def _compact(cauldron_id: str, result: dict, n_future: int) -> Dict[str, Any]:
+    history, future = _split(result, n_future)
+    body: Dict[str, Any] = {
+        "cauldron_id": cauldron_id,
+        "overflow_eta": result.get("overflow_eta"),
+        "t0": _epoch_ms(future[0][0]) if future else None,
+        "step_ms": STEP_S * 1000,
+        "values": [value for _, value in future],
+        "history": {
+            "t": [_epoch_ms(ts) for ts, _ in history],
+            "values": [value for _, value in history],
+        },
+    }
+    if "bands" in result:
+        body["bands"] = {name: [value for _, value in band] for name, band in result["bands"].items()}
+        body["overflow_probability"] = result["overflow_probability"]
+        body["overflow_eta_quantiles"] = result["overflow_eta_quantiles"]
+    return body
+
+
+def _frame(cauldron_id: str, result: dict, n_future: int) -> bytes:
+    history, future = _split(result, n_future)
+    bands = result.get("bands")
+    eta = result.get("overflow_eta")
+    name = cauldron_id.encode()
+    flags = (1 if eta else 0) | (2 if bands else 0)
+    parts = [
+        _FRAME.pack(
+            FRAME_MAGIC, 1, flags, len(name), len(history), len(future),
+            _epoch_ms(future[0][0]) if future else 0, _epoch_ms(eta) if eta else 0, STEP_S * 1000,
+        ),
+        name,
+        np.array([_epoch_ms(ts) for ts, _ in history], dtype="<i8").tobytes(),
+        np.array([value for _, value in history], dtype="<f4").tobytes(),
+        np.array([value for _, value in future], dtype="<f4").tobytes(),
+    ]
+    if bands:
+        parts.extend(np.array([value for _, value in bands[name_]], dtype="<f4").tobytes() for name_ in ("p10", "p50", "p90"))
+    return b"".join(parts)
+
+
+Encoded = Union[ForecastResponse, Dict[str, Any], bytes]
+
+
+def _encode(cauldron_id: str, result: dict, n_future: int, fmt: str) -> Encoded:
+    if fmt == "compact":
+        return _compact(cauldron_id, result, n_future)
+    if fmt == "binary":
+        return _frame(cauldron_id, result, n_future)
+    return _forecast_response(cauldron_id, result)
+
+
+def _fallback_result(cauldron_id: str) -> dict:
+    fallback = _fallback_forecast(cauldron_id)
+    return {"overflow_eta": None, "series": [(point.ts, point.volume) for point in fallback.series]}
+
+
+def _trace_output(cauldron_id: str, overflow_eta: Optional[str], body: Encoded) -> Dict[str, Any]:
+    if isinstance(body, ForecastResponse):
+        return body.model_dump()
+    if isinstance(body, bytes):
+        return {"cauldron_id": cauldron_id, "overflow_eta": overflow_eta, "format": "binary", "bytes": len(body)}
+    return body
+
+
+@router.post("/forecast", response_model=ForecastResponse)
+def run_forecast(payload: ForecastRequest, session: Session = Depends(get_session)) -> Any:
+    cauldron = session.get(Cauldron, payload.cauldron_id)
+    latest = queries.latest_observations(session, [cauldron.id]).get(cauldron.id) if cauldron else None
+    if not cauldron or latest is None:
+        return _respond_fallback(session, payload)
+
+    key = _cache_key(cauldron, latest, payload.horizon_minutes, payload.ensemble)
+    cached = forecast_cache.get(key + (payload.format,))
+    if cached is None:
+        histories, learned = _load_inputs(session, {cauldron.id: cauldron}, SERIES_POINTS)
+        history = histories.get(cauldron.id)
+        if not history:
+            # cauldron_latest outlives raw levels that retention purged.
+            return _respond_fallback(session, payload)
+        logic_payload = _logic_payload(
+            cauldron,
+            history,
+            payload.horizon_minutes,
+            payload.ensemble,
+            learned=learned[cauldron.id],
+            seed=forecast_cache.seed(key),
+        )
+        result = forecast_logic.run(logic_payload)
+        cached = (result.get("overflow_eta"), _encode(cauldron.id, result, payload.horizon_minutes + 1, payload.format))
+        forecast_cache.put(key + (payload.format,), cached)
+    overflow_eta, body = cached
     queries.log_agent_trace(
         session,
         agent="nemotron",
         action="forecast",
         input_payload=payload.model_dump(),
-        output_payload=response.model_dump(),
+        output_payload=_trace_output(cauldron.id, overflow_eta, body),
         tags=["forecast"],
     )
+    return _respond(body)
+
+
+def _respond_fallback(session: Session, payload: ForecastRequest) -> Any:
+    fallback = _fallback_result(payload.cauldron_id)
+    body = _encode(payload.cauldron_id, fallback, 0, payload.format)
+    queries.log_agent_trace(
+        session,
+        agent="nemotron",
+        action="forecast",
+        input_payload=payload.model_dump(),
+        output_payload=_trace_output(payload.cauldron_id, None, body),
+        tags=["forecast", "fallback"],
+    )
+    return _respond(body)
+
+
+def _respond(body: Encoded) -> Any:
+    """Compact and binary bodies skip response-model validation entirely."""
+    if isinstance(body, bytes):
+        return Response(content=body, media_type="application/octet-stream")
+    if isinstance(body, dict):
+        return JSONResponse(content=body)
+    return body
+
+
+def forecast_batch(
+    session: Session, payload: ForecastBatchRequest
+) -> Tuple[List[str], Dict[str, Tuple[Optional[str], Encoded]], List[str]]:
+    """Requested ids in order, ``(overflow_eta, encoded body)`` per id, and the ids given the fallback.
+
+    Loads history in one query for cache misses only; unknown or empty
+    cauldrons get the fallback series. Logs nothing, so the dashboard
+    stream can reuse it.
+    """
+    query = session.query(Cauldron)
+    if payload.cauldron_ids is not None:
+        query = query.filter(Cauldron.id.in_(payload.cauldron_ids))
+    cauldrons = {cauldron.id: cauldron for cauldron in query.all()}
+    latest = queries.latest_observations(session, list(cauldrons))
+    order = payload.cauldron_ids if payload.cauldron_ids is not None else sorted(cauldrons)
+
+    by_id: Dict[str, Tuple[Optional[str], Encoded]] = {}
+    keys = {
+        cid: _cache_key(cauldrons[cid], latest[cid], payload.horizon_minutes, payload.ensemble)
+        for cid in dict.fromkeys(order)
+        if cid in cauldrons and cid in latest
+    }
+    for cid, key in keys.items():
+        cached = forecast_cache.get(key + (payload.format,))
+        if cached is not None:
+            by_id[cid] = cached
+    missing = [cid for cid in keys if cid not in by_id]
+    if missing:
+        histories, learned = _load_inputs(session, {cid: cauldrons[cid] for cid in missing}, SERIES_POINTS)
+        missing = [cid for cid in missing if histories.get(cid)]
+        results = forecast_logic.run_batch(
+            [
+                _logic_payload(
+                    cauldrons[cid],
+                    histories[cid],
+                    payload.horizon_minutes,
+                    payload.ensemble,
+                    learned=learned[cid],
+                    seed=forecast_cache.seed(keys[cid]),
+                )
+                for cid in missing
+            ]
+        )
+        for cid, result in zip(missing, results):
+            by_id[cid] = (
+                result.get("overflow_eta"),
+                _encode(cid, result, payload.horizon_minutes + 1, payload.format),
+            )
+            forecast_cache.put(keys[cid] + (payload.format,), by_id[cid])
+    ids = list(dict.fromkeys(order))
+    fallbacks = [cid for cid in ids if cid not in by_id]
+    for cid in fallbacks:
+        by_id[cid] = (None, _encode(cid, _fallback_result(cid), 0, payload.format))
+    return ids, by_id, fallbacks
+
+
+@router.post("/forecast/batch", response_model=ForecastBatchResponse)
+def run_forecast_batch(
+    payload: ForecastBatchRequest,
+    log: bool = Query(True, description="When false, skip logging to agent trace (used for read-only polling)."),
+    session: Session = Depends(get_session),
+) -> Any:
+    """Forecast many cauldrons (see ``forecast_batch``) and log one trace for the batch."""
+    ids, by_id, fallbacks = forecast_batch(session, payload)
+
+    if log:
+        queries.log_agent_trace(
+            session,
+            agent="nemotron",
+            action="forecast_batch",
+            input_payload=payload.model_dump(),
+            output_payload={
+                "count": len(ids),
+                "fallback": fallbacks,
+                "overflow_eta": {cid: by_id[cid][0] for cid in ids},
+            },
+            tags=["forecast", "batch"],
+        )
+    bodies = [by_id[cid][1] for cid in ids]
+    if payload.format == "binary":
+        return Response(content=b"".join(bodies), media_type="application/octet-stream")
+    if payload.format == "compact":
+        return JSONResponse(content={"forecasts": bodies})
+    return ForecastBatchResponse(forecasts=bodies)
+
+
+@router.post("/forecast/eta", response_model=ForecastEtaResponse)
+def run_forecast_eta(payload: ForecastEtaRequest, session: Session = Depends(get_session)) -> ForecastEtaResponse:
+    """Time to full/empty for many cauldrons, soonest overflow first."""
+    query = session.query(Cauldron)
+    if payload.cauldron_ids is not None:
+        query = query.filter(Cauldron.id.in_(payload.cauldron_ids))
+    cauldrons = query.all()
+    histories, learned = _load_inputs(session, {cauldron.id: cauldron for cauldron in cauldrons}, 1)
+
+    etas: List[CauldronEta] = []
+    for cauldron in cauldrons:
+        history = histories.get(cauldron.id)
+        if not history:
+            continue
+        volume = float(history.v[-1])
+        result = forecast_logic.eta(
+            {
+                "current": {
+                    "ts": history.datetime_at(-1),
+                    "volume": volume,
+                    "vmax": cauldron.max_volume or 0.0,
+                    "r_fill": cauldron.fill_rate or 0.0,
+                },
+                "scheduled_drains": [],
+                "history": history,
+                "learned_slope": learned[cauldron.id],
+            }
+        )
+        etas.append(
+            CauldronEta(
+                cauldron_id=cauldron.id,
+                volume=volume,
+                max_volume=cauldron.max_volume or 0.0,
+                slope_per_min=result["slope_per_min"],
+                time_to_full_min=result["time_to_full_min"],
+                full_eta=result["full_eta"],
+                time_to_empty_min=result["time_to_empty_min"],
+                empty_eta=result["empty_eta"],
+            )
+        )
+    etas.sort(key=lambda eta: (eta.time_to_full_min is None, eta.time_to_full_min or 0.0, eta.cauldron_id))
+    response = ForecastEtaResponse(etas=etas)
+
+    queries.log_agent_trace(
+        session,
+        agent="nemotron",
+        action="forecast_eta",
+        input_payload=payload.model_dump(),
+        output_payload={"etas": [eta.model_dump() for eta in etas[:10]], "count": len(etas)},
+        tags=["forecast", "eta"],
+    )
     return response
+
+
+@router.get("/forecast/cache")
+def forecast_cache_stats() -> dict:
+    """Hit/miss counters and occupancy of the in-process forecast cache."""
+    return forecast_cache.stats()
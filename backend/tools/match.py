@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 
 from backend.core import queries
@@ -31,6 +32,29 @@ def _pick_primary_cauldron(drains: List[DrainEvent], tickets: List[Ticket], sess
 class MatchRequest(BaseModel):
     days: int = Field(3, ge=1, le=14)
     persist: bool = True
+    mode: Literal["greedy", "optimal"] = Field(
+        "greedy",
+        description="greedy: closest volume per ticket; optimal: min-cost assignment over volume and time distance.",
+    )
+    window_minutes: int = Field(match_logic.WINDOW_MIN, ge=1, le=20160)
+    time_weight: float = Field(match_logic.TIME_WEIGHT, ge=0.0)
+    rebuild: bool = Field(
+        False,
+        description="With persist, replace every stored match instead of only matching unsettled tickets and drains.",
+    )
+
+
+def _match_row(record: dict, ticket: Optional[Ticket], drain: Optional[DrainEvent]) -> dict:
+    return {
+        "cauldron_id": drain.cauldron_id if drain else (ticket.cauldron_id if ticket else "unknown"),
+        "ticket_id": ticket.id if ticket else None,
+        "drain_event_id": drain.id if drain else None,
+        "status": record.get("status", "matched"),
+        "discrepancy": record.get("diff_volume"),
+        "confidence": None,
+        "notes": None,
+        "extra": record,
+    }
 
 
 class MatchResponse(BaseModel):
@@ -55,47 +79,95 @@ def run_match(payload: MatchRequest, session: Session = Depends(get_session)) ->
         .all()
     )
 
+    # Matches already stored for tickets/drains in the window. Settled ones
+    # (both sides still present) are kept as-is. A row that lost one side
+    # (its ticket or drain was deleted) is re-matched and updated in place,
+    # or deleted when its remaining side stays unmatched.
+    settled: List[dict] = []
+    open_rows: Dict[int, int] = {}
+    drain_rows: Dict[int, int] = {}
+    if payload.persist and not payload.rebuild:
+        window_tickets = select(Ticket.id).where(Ticket.scheduled_for.is_(None) | (Ticket.scheduled_for >= since))
+        window_drains = select(DrainEvent.id).where(DrainEvent.detected_at >= since)
+        stored = session.execute(
+            select(MatchRecord.id, MatchRecord.ticket_id, MatchRecord.drain_event_id, MatchRecord.extra).where(
+                MatchRecord.ticket_id.in_(window_tickets) | MatchRecord.drain_event_id.in_(window_drains)
+            )
+        ).all()
+        settled_tickets = {row.ticket_id for row in stored if row.ticket_id and row.drain_event_id}
+        settled_drains = {row.drain_event_id for row in stored if row.ticket_id and row.drain_event_id}
+        settled = [row.extra or {} for row in stored if row.ticket_id and row.drain_event_id]
+        open_rows = {row.ticket_id: row.id for row in stored if row.ticket_id and not row.drain_event_id}
+        drain_rows = {row.drain_event_id: row.id for row in stored if row.drain_event_id and not row.ticket_id}
+        pending_drains = [drain for drain in drains if drain.id not in settled_drains]
+        pending_tickets = [ticket for ticket in tickets if ticket.id not in settled_tickets]
+    else:
+        pending_drains, pending_tickets = drains, tickets
+
     drain_payload = [
         {
             "id": str(drain.id),
             "cauldron_id": drain.cauldron_id,
             "true_volume": float(drain.estimated_loss or 0.0),
+            "ts": drain.detected_at.isoformat() if drain.detected_at else None,
         }
-        for drain in drains
+        for drain in pending_drains
     ]
     ticket_payload = [
         {
             "id": ticket.ticket_code,
             "volume": float(ticket.volume or 0.0),
             "cauldron_id": ticket.cauldron_id,
+            "ts": ticket.scheduled_for.isoformat() if ticket.scheduled_for else None,
         }
-        for ticket in tickets
+        for ticket in pending_tickets
     ]
     logic_input = {
         "date": datetime.utcnow().date().isoformat(),
         "tickets": ticket_payload,
         "drain_events": drain_payload,
+        "mode": payload.mode,
+        "window_minutes": payload.window_minutes,
+        "time_weight": payload.time_weight,
     }
     result = match_logic.run(logic_input)
 
     if payload.persist:
-        session.query(MatchRecord).delete(synchronize_session=False)
-        session.flush()
+        if payload.rebuild:
+            session.query(MatchRecord).delete(synchronize_session=False)
+        tickets_by_code = {ticket.ticket_code: ticket for ticket in pending_tickets}
+        drains_by_id = {str(drain.id): drain for drain in pending_drains}
+        inserts: List[dict] = []
+        updates: List[dict] = []
+        redundant: List[int] = []
         for record in result.get("matches", []):
-            ticket = next((t for t in tickets if t.ticket_code == record["ticket_id"]), None)
-            drain = next((d for d in drains if str(d.id) == record["drain_event_id"]), None)
-            queries.create_match(
-                session,
-                cauldron_id=drain.cauldron_id if drain else (ticket.cauldron_id if ticket else "unknown"),
-                ticket_id=ticket.id if ticket else None,
-                drain_event_id=drain.id if drain else None,
-                status=record.get("status", "matched"),
-                discrepancy=record.get("diff_volume"),
-                extra=record,
-            )
+            ticket = tickets_by_code.get(record["ticket_id"])
+            drain = drains_by_id.get(record["drain_event_id"])
+            row = _match_row(record, ticket, drain)
+            ticket_row = open_rows.pop(ticket.id, None) if ticket else None
+            drain_row = drain_rows.pop(drain.id, None) if drain else None
+            if ticket_row is not None and drain_row is not None:
+                redundant.append(drain_row)  # both halves had a row: keep the ticket's
+            row_id = ticket_row if ticket_row is not None else drain_row
+            if row_id is None:
+                inserts.append(row)
+            else:
+                updates.append({"id": row_id, **row})
+        stale = redundant + list(open_rows.values()) + list(drain_rows.values())
+        if stale:
+            session.execute(delete(MatchRecord).where(MatchRecord.id.in_(stale)))
+        inserted: List[int] = []
+        if inserts:
+            inserted = list(session.scalars(insert(MatchRecord).returning(MatchRecord.id), inserts))
+        if updates:
+            session.execute(update(MatchRecord), updates)
+        if payload.rebuild:
+            queries.refresh_audit_findings(session)
+        else:
+            queries.refresh_audit_findings(session, stale + inserted + [row["id"] for row in updates])
 
     response = MatchResponse(
-        matches=result.get("matches", []),
+        matches=settled + result.get("matches", []),
         unmatched_tickets=result.get("unmatched_tickets", []),
         unmatched_drains=result.get("unmatched_drains", []),
     )
@@ -151,56 +151,134 @@ async function fetchFindings(): Promise<Finding[]> {
   }
 }
 
-async function fetchForecast(cauldronId?: string): Promise<Forecast | null> {
-  if (!cauldronId) return null;
+function adaptForecast(body: any): Forecast {
+  return {
+    overflow_eta: body.overflow_eta ?? null,
+    series: (body.series ?? body.forecast ?? body?.result ?? []).map((entry: any) => [entry.ts || entry[0], entry.fill_percent ?? entry.volume ?? entry[1]]),
+  } as Forecast;
+}
+
+async function fetchForecasts(cauldronIds: string[]): Promise<Record<string, Forecast>> {
+  if (!cauldronIds.length) return {};
   try {
-    const res = await fetch(`${API_BASE}/tools/forecast`, {
+    const res = await fetch(`${API_BASE}/tools/forecast/batch?log=false`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ cauldron_id: cauldronId, horizon_minutes: 240 }),
+      body: JSON.stringify({ cauldron_ids: cauldronIds, horizon_minutes: 240 }),
     });
-    if (!res.ok) return null;
+    if (!res.ok) return {};
     const body = await res.json();
-    return {
-      overflow_eta: body.overflow_eta ?? null,
-      series: (body.series ?? body.forecast ?? body?.result ?? []).map((entry: any) => [entry.ts || entry[0], entry.fill_percent ?? entry.volume ?? entry[1]]),
-    } as Forecast;
+    return forecastsById(body.forecasts ?? []);
   } catch {
-    return null;
+    return {};
   }
 }
 
+function forecastsById(entries: any[]): Record<string, Forecast> {
+  return entries.reduce((acc: Record<string, Forecast>, entry: any) => {
+    if (entry?.cauldron_id) acc[entry.cauldron_id] = adaptForecast(entry);
+    return acc;
+  }, {});
+}
+
+// Last overview, the raw state it was built from and that state's ETag; an
+// unchanged backend answers 304, a changed one sends only what changed since.
+let overviewCache: { etag: string; state: any; overview: Overview } | null = null;
+
+// Row key of each list section in a /state/overview delta.
+const SECTION_KEYS: Record<string, string> = {
+  cauldrons: "cauldron_id",
+  tickets: "ticket_code",
+  matches: "match_id",
+  drain_events: "event_id",
+  agent_trace: "trace_id",
+};
+
+function applyDelta(state: any, changes: Record<string, any>): any {
+  const next = { ...state };
+  Object.entries(changes).forEach(([section, value]) => {
+    const key = SECTION_KEYS[section];
+    if (!key) {
+      next[section] = value;
+      return;
+    }
+    const rows = new Map<any, any>((state[section] ?? []).map((row: any) => [row[key], row]));
+    value.rows.forEach((row: any) => rows.set(row[key], row));
+    next[section] = value.ids.map((id: any) => rows.get(id));
+  });
+  return next;
+}
+
+// Sections that findings and forecasts are derived from; a delta touching
+// none of them keeps the previous overview's findings, and its forecasts
+// too unless the forecast targets (planner target plus first cauldrons) moved.
+const FINDING_SECTIONS = ["tickets", "matches", "drain_events"];
+const FORECAST_SECTIONS = ["cauldrons"];
+
+async function buildOverview(state: any, previous?: { overview: Overview; changed: string[] }): Promise<Overview> {
+  const cauldronIds = Array.isArray(state.cauldrons)
+    ? state.cauldrons.map((c: any) => c?.cauldron_id).filter(Boolean)
+    : [];
+  const traceRows = Array.isArray(state.agent_trace) ? state.agent_trace : [];
+  const plannerTarget = traceRows.find((row: any) => row?.context?.cauldron_id)?.context?.cauldron_id;
+  const fetchTargets = Array.from(new Set([plannerTarget, ...cauldronIds.slice(0, 3)].filter(Boolean)));
+  const stale = (sections: string[]) => !previous || sections.some((section) => previous.changed.includes(section));
+  const previousTargets = Object.keys(previous?.overview.forecast ?? {});
+  const retarget = fetchTargets.join("\n") !== previousTargets.join("\n");
+  const [findings, forecastMap] = await Promise.all([
+    stale(FINDING_SECTIONS) ? fetchFindings() : previous!.overview.findings,
+    stale(FORECAST_SECTIONS) || retarget ? fetchForecasts(fetchTargets as string[]) : previous!.overview.forecast ?? {},
+  ]);
+  return adaptState(state, findings, forecastMap);
+}
+
 export async function getOverview(): Promise<Overview> {
   try {
-    const stateRes = await fetch(`${API_BASE}/state/overview`, { cache: "no-store" });
+    const cursor = overviewCache?.etag.replace(/"/g, "");
+    const stateRes = await fetch(`${API_BASE}/state/overview${cursor ? `?since=${encodeURIComponent(cursor)}` : ""}`, {
+      cache: "no-store",
+      headers: overviewCache ? { "If-None-Match": overviewCache.etag } : {},
+    });
+    if (stateRes.status === 304 && overviewCache) return overviewCache.overview;
     if (!stateRes.ok) throw new Error("state");
-    const state = await stateRes.json();
-    const cauldronIds = Array.isArray(state.cauldrons)
-      ? state.cauldrons.map((c: any) => c?.cauldron_id).filter(Boolean)
-      : [];
-    const traceRows = Array.isArray(state.agent_trace) ? state.agent_trace : [];
-    const plannerTarget = traceRows.find((row: any) => row?.context?.cauldron_id)?.context?.cauldron_id;
-    const fetchTargets = Array.from(new Set([plannerTarget, ...cauldronIds.slice(0, 3)].filter(Boolean)));
-    const [findings, forecastEntries] = await Promise.all([
-      fetchFindings(),
-      Promise.all(
-        fetchTargets.map(async (id: string) => {
-          const fc = await fetchForecast(id);
-          return [id, fc] as const;
-        }),
-      ),
-    ]);
-    const forecastMap = forecastEntries.reduce<Record<string, Forecast>>((acc, [id, fc]) => {
-      if (fc) acc[id] = fc;
-      return acc;
-    }, {});
-    return adaptState(state, findings, forecastMap);
+    const body = await stateRes.json();
+    let state = body;
+    let previous: { overview: Overview; changed: string[] } | undefined;
+    if (cursor) state = body.full ? body.overview : applyDelta(overviewCache?.state ?? {}, body.changes ?? {});
+    if (cursor && !body.full && overviewCache) previous = { overview: overviewCache.overview, changed: Object.keys(body.changes ?? {}) };
+    const overview = await buildOverview(state, previous);
+    const etag = stateRes.headers.get("ETag");
+    overviewCache = etag ? { etag, state, overview } : null;
+    return overview;
   } catch (error) {
     const fallback = await fetch("/overview.json", { cache: "no-store" });
     return fallback.json();
   }
 }
 
+// Pushes a fresh overview whenever the backend state changes; returns an unsubscribe function.
+// Each event carries the findings and forecasts too, so nothing is fetched per event.
+// Browsers without EventSource fall back to polling every pollMs.
+export function subscribeOverview(onOverview: (overview: Overview) => void, pollMs = 5000): () => void {
+  if (typeof EventSource === "undefined") {
+    const id = setInterval(() => getOverview().then(onOverview).catch(() => undefined), pollMs);
+    return () => clearInterval(id);
+  }
+  const source = new EventSource(`${API_BASE}/state/stream`);
+  source.addEventListener("overview", (event) => {
+    const message = event as MessageEvent;
+    try {
+      const { findings, forecasts, ...state } = JSON.parse(message.data);
+      const overview = adaptState(state, findings ?? [], forecastsById(forecasts ?? []));
+      overviewCache = { etag: `"${message.lastEventId}"`, state, overview };
+      onOverview(overview);
+    } catch (err) {
+      console.error("Failed to apply overview event:", err);
+    }
+  });
+  return () => source.close();
+}
+
 async function postJson<T>(path: string, body: any): Promise<T> {
   const res = await fetch(`${API_BASE}${path}`, {
     method: "POST",
@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import dynamic from "next/dynamic";
-import { getOverview, runAudit, runDetect, runForecast, runMatch, runPlanner } from "../lib/api";
+import { getOverview, runAudit, runDetect, runForecast, runMatch, runPlanner, subscribeOverview } from "../lib/api";
 import { Cauldron, DrainEvent, Finding, Forecast, MatchRow, NetworkLink, Overview, TraceStep } from "../types";
 
 import Header from "../components/Header";
@@ -61,8 +61,7 @@ export default function Home() {
 
   useEffect(() => {
     fetchOverview();
-    const id = setInterval(fetchOverview, 5000);
-    return () => clearInterval(id);
+    return subscribeOverview(setData);
   }, [fetchOverview]);
 
   const runAction = useCallback(
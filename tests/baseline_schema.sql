@@ -0,0 +1,95 @@
+-- Schema of a database created by the first release (before any migration), for tests/test_schema.py.
+CREATE TABLE cauldrons (
+	id VARCHAR NOT NULL, 
+	name VARCHAR NOT NULL, 
+	location VARCHAR, 
+	max_volume FLOAT, 
+	fill_rate FLOAT, 
+	extra JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+CREATE TABLE agent_trace (
+	id INTEGER NOT NULL, 
+	agent VARCHAR NOT NULL, 
+	action VARCHAR NOT NULL, 
+	input_payload JSON NOT NULL, 
+	output_payload JSON NOT NULL, 
+	tags JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+CREATE TABLE network_routes (
+	id INTEGER NOT NULL, 
+	edge_id VARCHAR NOT NULL, 
+	origin VARCHAR, 
+	destination VARCHAR, 
+	distance_km FLOAT, 
+	extra JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_network_routes_edge_id ON network_routes (edge_id);
+CREATE TABLE levels (
+	id INTEGER NOT NULL, 
+	cauldron_id VARCHAR NOT NULL, 
+	observed_at DATETIME NOT NULL, 
+	volume FLOAT, 
+	fill_percent FLOAT, 
+	payload JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(cauldron_id) REFERENCES cauldrons (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_levels_cauldron_id ON levels (cauldron_id);
+CREATE INDEX ix_levels_observed_at ON levels (observed_at);
+CREATE TABLE tickets (
+	id INTEGER NOT NULL, 
+	ticket_code VARCHAR NOT NULL, 
+	cauldron_id VARCHAR, 
+	scheduled_for DATETIME, 
+	volume FLOAT, 
+	route_id VARCHAR, 
+	status VARCHAR NOT NULL, 
+	extra JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(cauldron_id) REFERENCES cauldrons (id) ON DELETE SET NULL
+);
+CREATE UNIQUE INDEX ix_tickets_ticket_code ON tickets (ticket_code);
+CREATE TABLE drain_events (
+	id INTEGER NOT NULL, 
+	cauldron_id VARCHAR NOT NULL, 
+	detected_at DATETIME NOT NULL, 
+	estimated_loss FLOAT, 
+	reason VARCHAR, 
+	confidence FLOAT, 
+	extra JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(cauldron_id) REFERENCES cauldrons (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_drain_events_cauldron_id ON drain_events (cauldron_id);
+CREATE TABLE matches (
+	id INTEGER NOT NULL, 
+	cauldron_id VARCHAR NOT NULL, 
+	ticket_id INTEGER, 
+	drain_event_id INTEGER, 
+	status VARCHAR NOT NULL, 
+	discrepancy FLOAT, 
+	confidence FLOAT, 
+	notes TEXT, 
+	extra JSON NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(cauldron_id) REFERENCES cauldrons (id) ON DELETE CASCADE, 
+	FOREIGN KEY(ticket_id) REFERENCES tickets (id) ON DELETE SET NULL, 
+	FOREIGN KEY(drain_event_id) REFERENCES drain_events (id) ON DELETE SET NULL
+);
+CREATE INDEX ix_matches_cauldron_id ON matches (cauldron_id);
@@ -0,0 +1,28 @@
+"""Shared fixtures: a throwaway SQLite database for tests that need one."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The engine is created when backend.core.db is imported, so point it at a temp file first.
+_DB_DIR = tempfile.mkdtemp(prefix="jia-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(_DB_DIR) / 'test.db'}")
+
+from backend.core.cache import forecast_cache  # noqa: E402
+from backend.core.db import Base, engine, init_db, session_scope  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Fresh tables for one test; yields ``session_scope``."""
+
+    init_db()
+    forecast_cache.clear()
+    try:
+        yield session_scope
+    finally:
+        Base.metadata.drop_all(bind=engine)
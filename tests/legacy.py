@@ -0,0 +1,124 @@
+"""Frozen copies of logic functions as they were before they were optimized.
+
+The tests check the current implementations against these, and
+``backend.bench`` times them as the baseline. Do not change them.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from backend.logic import detect
+
+
+def detect_run(input_json: Dict) -> Dict:
+    """``detect.run`` before vectorization: list-based smoothing and a per-sample loop."""
+
+    def _parse(points):
+        ts = [datetime.fromisoformat(p[0].replace("Z", "+00:00")) for p in points]
+        vs = [float(p[1]) for p in points]
+        return ts, vs
+
+    def _roll_med(vs, w):
+        if w <= 1 or len(vs) < 2:
+            return vs[:]
+        out = []
+        k = w // 2
+        for i in range(len(vs)):
+            lo = max(0, i - k)
+            hi = min(len(vs), i + k + 1)
+            seg = vs[lo:hi]
+            out.append(sorted(seg)[len(seg) // 2])
+        return out
+
+    def _slope(vs):
+        if len(vs) <= 1:
+            return [0.0] * len(vs)
+        return [0.0] + [vs[i] - vs[i - 1] for i in range(1, len(vs))]
+
+    events: List[Dict] = []
+    for item in input_json.get("series", []):
+        cid = item["cauldron_id"]
+        r_fill = float(item.get("r_fill", 0.0))
+        pts = item.get("points", [])
+        if len(pts) < 3:
+            continue
+        ts, vs = _parse(pts)
+        vm = _roll_med(vs, detect.ROLL_W)
+        sl = _slope(vm)
+        in_evt = False
+        s = None
+        for i in range(len(sl)):
+            if not in_evt and sl[i] <= detect.SLOPE_NEG:
+                in_evt = True
+                s = i
+            elif in_evt and sl[i] >= detect.HYSTERESIS:
+                dur = i - s
+                if dur >= detect.MIN_EVENT_MIN:
+                    t_s = ts[s]
+                    t_e = ts[i]
+                    drop = max(0.0, vm[s] - vm[i])
+                    true = drop + r_fill * dur
+                    events.append({
+                        "id": f"{cid}-{t_s.isoformat()}-{t_e.isoformat()}",
+                        "cauldron_id": cid,
+                        "t_start": t_s.isoformat().replace("+00:00", "Z"),
+                        "t_end": t_e.isoformat().replace("+00:00", "Z"),
+                        "level_drop": round(drop, 2),
+                        "true_volume": round(true, 2),
+                        "flags": "ok",
+                    })
+                in_evt = False
+                s = None
+    return {"drain_events": events}
+
+
+def match_run(input_json: Dict) -> Dict:
+    """``match.run`` before the volume indexes: a linear scan per ticket."""
+
+    def _closest(target: float, candidates: Dict[str, float]) -> Optional[Tuple[str, float]]:
+        best = None
+        best_c = 1e18
+        for k, v in candidates.items():
+            c = abs(target - v)
+            if c < best_c:
+                best = (k, v)
+                best_c = c
+        return best
+
+    tickets = input_json.get("tickets", [])
+    drains = input_json.get("drain_events", [])
+    by_c: Dict[str, Dict[str, float]] = {}
+    global_map: Dict[str, float] = {}
+    for d in drains:
+        by_c.setdefault(d["cauldron_id"], {})[d["id"]] = float(d["true_volume"])
+        global_map[d["id"]] = float(d["true_volume"])
+
+    matches = []
+    used = set()
+    for t in tickets:
+        tid = t["id"]
+        vol = float(t["volume"])
+        cid = t.get("cauldron_id")
+        pool = by_c.get(cid) if cid else None
+        choice = None
+        if pool:
+            choice = _closest(vol, {k: v for k, v in pool.items() if k not in used})
+        if choice is None:
+            choice = _closest(vol, {k: v for k, v in global_map.items() if k not in used})
+        if choice is None:
+            continue
+        did, dvol = choice
+        used.add(did)
+        matches.append({
+            "id": f"m-{tid}-{did}",
+            "ticket_id": tid,
+            "drain_event_id": did,
+            "status": "matched",
+            "diff_volume": round(vol - dvol, 2),
+        })
+
+    unmatched_t = [t["id"] for t in tickets if all(not m["id"].startswith(f"m-{t['id']}-") for m in matches)]
+    unmatched_d = [d["id"] for d in drains if d["id"] not in used]
+    return {"matches": matches, "unmatched_tickets": unmatched_t, "unmatched_drains": unmatched_d}
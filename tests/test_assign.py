@@ -0,0 +1,57 @@
+"""min_cost_assignment against exhaustive search on small graphs."""
+
+from __future__ import annotations
+
+import random
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from backend.logic.assign import min_cost_assignment
+
+
+def _total(assign: Sequence[int], edges, unmatched_cost: float) -> float:
+    costs = [dict(cands) for cands in edges]
+    return sum(unmatched_cost if r < 0 else costs[l][r] for l, r in enumerate(assign))
+
+
+def _brute_force(edges, unmatched_cost: float) -> float:
+    """Cheapest total over every assignment, each right node used at most once."""
+
+    best = float("inf")
+
+    def walk(l: int, used: frozenset, cost: float) -> None:
+        nonlocal best
+        if cost >= best:
+            return
+        if l == len(edges):
+            best = cost
+            return
+        walk(l + 1, used, cost + unmatched_cost)
+        for r, c in edges[l]:
+            if r not in used:
+                walk(l + 1, used | {r}, cost + c)
+
+    walk(0, frozenset(), 0.0)
+    return best
+
+
+def _random_graph(rng: random.Random) -> Tuple[int, List[List[Tuple[int, float]]], float]:
+    n_left, n_right = rng.randint(0, 7), rng.randint(0, 7)
+    edges = [
+        [(r, round(rng.uniform(0, 10), 3)) for r in range(n_right) if rng.random() < 0.5]
+        for _ in range(n_left)
+    ]
+    return n_right, edges, rng.choice([0.0, 2.5, 5.0, 20.0])
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_min_cost_assignment_is_optimal(seed: int) -> None:
+    n_right, edges, unmatched_cost = _random_graph(random.Random(seed))
+    assign = min_cost_assignment(n_right, edges, unmatched_cost)
+
+    assert len(assign) == len(edges)
+    taken = [r for r in assign if r >= 0]
+    assert len(taken) == len(set(taken))
+    assert all(r < 0 or r in dict(edges[l]) for l, r in enumerate(assign))
+    assert _total(assign, edges, unmatched_cost) == pytest.approx(_brute_force(edges, unmatched_cost))
@@ -0,0 +1,51 @@
+"""The forecast cache: LRU bookkeeping and eviction on level ingest."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import queries
+from backend.core.cache import ForecastCache, forecast_cache
+
+
+def test_lru_evicts_oldest_and_keeps_the_cauldron_index() -> None:
+    cache = ForecastCache(2)
+    cache.put(("c0", 1, "a"), {"v": 1})
+    cache.put(("c1", 1, "a"), {"v": 2})
+    assert cache.get(("c0", 1, "a")) == {"v": 1}
+    cache.put(("c2", 1, "a"), {"v": 3})  # c1 is least recently used
+    assert cache.get(("c1", 1, "a")) is None
+    assert cache.invalidate("c1") == 0
+    assert cache.invalidate("c0") == 1
+    assert cache.stats() == {"capacity": 2, "size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    cache.get(("c2", 1, "a"))["v"] = 99  # callers get copies
+    assert cache.get(("c2", 1, "a")) == {"v": 3}
+
+
+def _levels(minute: int):
+    return [{"timestamp": f"2025-01-01T00:{m:02d}:00Z", "volume": 100.0 + 2 * m} for m in range(minute)]
+
+
+def test_ingest_evicts_only_that_cauldrons_forecasts(db) -> None:
+    with db() as session:
+        for cid in ("c0", "c1"):
+            queries.upsert_cauldron(session, {"id": cid, "name": cid, "maxVolume": 1000, "fillRate": 0.9})
+            queries.record_levels(session, cid, _levels(30))
+    client = TestClient(app)
+    request = {"cauldron_ids": ["c0", "c1"], "ensemble": 10}
+    first = client.post("/tools/forecast/batch", json=request).json()
+    assert client.post("/tools/forecast/batch", json=request).json() == first
+    assert (forecast_cache.stats()["misses"], forecast_cache.stats()["hits"]) == (2, 2)
+
+    with db() as session:
+        queries.record_levels(session, "c0", _levels(31))
+    assert forecast_cache.stats()["size"] == 1
+    second = client.post("/tools/forecast/batch", json=request).json()
+    assert second["forecasts"][1] == first["forecasts"][1]
+    assert second["forecasts"][0]["series"][-1] != first["forecasts"][0]["series"][-1]
+    assert (forecast_cache.stats()["misses"], forecast_cache.stats()["hits"]) == (3, 3)
+
+    # Seeded by key, a recomputed forecast reproduces the one that was cached.
+    forecast_cache.clear()
+    assert client.post("/tools/forecast/batch", json=request).json() == second
@@ -0,0 +1,157 @@
+"""Forecast kernels and the closed-form ETA against the per-minute simulation; forecast inputs and encodings."""
+
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import queries
+from backend.core.models import Cauldron
+from backend.logic import forecast as forecast_logic
+from backend.logic.forecast import _clip_paths
+from backend.tools.forecast import _FRAME, FRAME_MAGIC, _epoch_ms, _load_inputs
+
+
+def _legacy_clip_paths(v0: np.ndarray, inc: np.ndarray, vmax: np.ndarray) -> np.ndarray:
+    out = np.empty_like(inc)
+    v = v0.astype(np.float64)
+    for m in range(inc.shape[1]):
+        v = np.clip(v + inc[:, m], 0.0, vmax)
+        out[:, m] = v
+    return out
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_clip_paths_matches_loop(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    rows, minutes = int(rng.integers(1, 40)), int(rng.integers(0, 300))
+    vmax = rng.uniform(10, 200, rows)
+    v0 = rng.uniform(0, 1, rows) * vmax
+    # Wide steps so paths bounce between both barriers many times.
+    inc = rng.normal(rng.uniform(-3, 3), rng.uniform(0.5, 40), (rows, minutes))
+    np.testing.assert_allclose(_clip_paths(v0, inc, vmax), _legacy_clip_paths(v0, inc, vmax), atol=1e-9)
+
+
+def test_clip_paths_pinned_at_barriers() -> None:
+    vmax = np.array([100.0, 100.0, 100.0])
+    v0 = np.array([0.0, 100.0, 50.0])
+    inc = np.array([[-5.0] * 10, [5.0] * 10, [60.0, -120.0] * 5])
+    np.testing.assert_allclose(_clip_paths(v0, inc, vmax), _legacy_clip_paths(v0, inc, vmax))
+
+
+def test_young_trend_state_defers_to_history(db) -> None:
+    with db() as session:
+        queries.upsert_cauldron(session, {"id": "c0", "name": "C0", "maxVolume": 1000, "fillRate": 0.9})
+        queries.record_levels(session, "c0", [{"timestamp": "2025-01-01T00:00:00Z", "volume": 10.0}])
+    with db() as session:
+        cauldrons = {"c0": session.get(Cauldron, "c0")}
+        _, learned = _load_inputs(session, cauldrons, 1)
+        # One folded reading: fit the slope from the history window, not fill_rate.
+        assert learned == {"c0": None}
+        rows = [{"timestamp": f"2025-01-01T00:0{m}:00Z", "volume": 10.0 + 3 * m} for m in (1, 2)]
+        queries.record_levels(session, "c0", rows)
+    with db() as session:
+        _, learned = _load_inputs(session, {"c0": session.get(Cauldron, "c0")}, 1)
+        assert learned["c0"] == pytest.approx(3.0)
+
+
+def _decode_compact(body: dict):
+    future = [(body["t0"] + i * body["step_ms"], value) for i, value in enumerate(body["values"])]
+    return list(zip(body["history"]["t"], body["history"]["values"])) + future
+
+
+def _decode_frames(data: bytes):
+    out, offset = {}, 0
+    while offset < len(data):
+        magic, _, flags, name_len, n_hist, n_future, t0, _, step = _FRAME.unpack_from(data, offset)
+        assert magic == FRAME_MAGIC
+        offset += _FRAME.size
+        name = data[offset : offset + name_len].decode()
+        offset += name_len
+        t = np.frombuffer(data, "<i8", n_hist, offset).tolist()
+        offset += 8 * n_hist
+        v = np.frombuffer(data, "<f4", n_hist, offset).tolist()
+        offset += 4 * n_hist
+        future = np.frombuffer(data, "<f4", n_future, offset).tolist()
+        offset += 4 * n_future
+        offset += 3 * 4 * n_future if flags & 2 else 0
+        out[name] = list(zip(t, v)) + [(t0 + i * step, value) for i, value in enumerate(future)]
+    return out
+
+
+@pytest.mark.parametrize("ensemble", [0, 20])
+def test_compact_and_binary_frames_decode_to_the_points(db, ensemble: int) -> None:
+    with db() as session:
+        for cid in ("c0", "c1"):
+            queries.upsert_cauldron(session, {"id": cid, "name": cid, "maxVolume": 1000, "fillRate": 0.9})
+            # Sub-second stamps, so a frame that rounds to seconds shows up.
+            rows = [{"timestamp": f"2025-01-01T00:{m:02d}:00.250Z", "volume": 100.0 + 2 * m} for m in range(40)]
+            queries.record_levels(session, cid, rows)
+    client = TestClient(app)
+    request = {"cauldron_ids": ["c0", "c1"], "horizon_minutes": 30, "ensemble": ensemble}
+    points = client.post("/tools/forecast/batch", json=request).json()["forecasts"]
+    compact = client.post("/tools/forecast/batch", json={**request, "format": "compact"}).json()["forecasts"]
+    frames = _decode_frames(client.post("/tools/forecast/batch", json={**request, "format": "binary"}).content)
+
+    for forecast, body in zip(points, compact):
+        stamps = [_epoch_ms(point["ts"]) for point in forecast["series"]]
+        volumes = [point["volume"] for point in forecast["series"]]
+        assert stamps[0] % 1000 == 250
+        for decoded, rel in ((_decode_compact(body), 1e-12), (frames[forecast["cauldron_id"]], 1e-6)):
+            assert [t for t, _ in decoded] == stamps
+            assert [v for _, v in decoded] == pytest.approx(volumes, rel=rel)
+
+
+NOW = datetime(2025, 1, 1)
+
+
+def _stamp(minutes: float) -> str:
+    return (NOW + timedelta(minutes=minutes)).isoformat() + "Z"
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_eta_lands_in_the_minute_the_simulation_overflows(seed: int) -> None:
+    rng = random.Random(seed)
+    vmax = rng.uniform(100, 1000)
+    slope = rng.uniform(-3, 3)
+    drains = [
+        {"start": rng.randint(1, 600), "minutes": rng.randint(1, 120), "rate": rng.uniform(-8, 8)}
+        for _ in range(rng.randint(0, 4))
+    ]
+    item = {
+        "horizon_min": rng.choice([60, 240, 1440]),
+        "current": {"ts": _stamp(0), "volume": rng.uniform(0, 1) * vmax, "vmax": vmax, "r_fill": slope},
+        "learned_slope": slope,
+        "noise_sigma": 0.0,
+    }
+    # The simulator applies a drain to the minute ending at each covered time,
+    # so it is the continuous schedule shifted one minute earlier.
+    simulated = forecast_logic.run(
+        {**item, "scheduled_drains": [{**d, "ts": _stamp(d["start"])} for d in drains]}
+    )["overflow_eta"]
+    full = forecast_logic.eta(
+        {**item, "scheduled_drains": [{**d, "ts": _stamp(d["start"] - 1)} for d in drains]}
+    )["time_to_full_min"]
+    if full is None or full > item["horizon_min"] + 0.01:
+        assert simulated is None
+    else:
+        assert simulated in {_stamp(math.ceil(full - 0.01)), _stamp(math.ceil(full + 0.01))}
+
+
+def test_eta_reports_overflow_past_the_simulated_day() -> None:
+    item = {
+        "horizon_min": 1440,
+        "current": {"ts": _stamp(0), "volume": 0.0, "vmax": 3000.0, "r_fill": 1.0},
+        "learned_slope": 1.0,
+        "noise_sigma": 0.0,
+    }
+    assert forecast_logic.run(item)["overflow_eta"] is None
+    result = forecast_logic.eta(item)
+    assert (result["time_to_full_min"], result["full_eta"]) == (3000.0, _stamp(3000))
+    assert result["time_to_empty_min"] == 0.0
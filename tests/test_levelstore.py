@@ -0,0 +1,85 @@
+"""The memory-mapped level store against the SQL levels it mirrors."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.core import levelstore, queries
+from backend.core.levelstore import LevelStore
+from backend.logic.series import to_epoch_us
+
+START = datetime(2025, 1, 1)
+
+
+def _readings(minutes):
+    return [(START + timedelta(minutes=m), float(m), float(m) / 10) for m in minutes]
+
+
+def _stamps(store: LevelStore, cauldron_id: str = "c0"):
+    return store.read(cauldron_id).t.tolist()
+
+
+def _us(minutes):
+    return [to_epoch_us(START + timedelta(minutes=m)) for m in minutes]
+
+
+def test_torn_append_is_invisible_and_overwritten(tmp_path) -> None:
+    store = LevelStore(str(tmp_path))
+    store.append("c0", _readings(range(5)))
+    # An append that died after writing volume and fill but before time.
+    folder = tmp_path / "c0"
+    for name in ("v.f64", "f.f64"):
+        with open(folder / name, "ab") as fh:
+            fh.write(np.array([99.0, 99.0], dtype="<f8").tobytes())
+    assert _stamps(store) == _us(range(5))
+
+    assert store.append("c0", _readings(range(5, 8))) == 3
+    levels = store.read("c0")
+    assert levels.t.tolist() == _us(range(8))
+    assert levels.v.tolist() == [float(m) for m in range(8)]
+    assert all((folder / name).stat().st_size == 8 * 8 for name in ("t.i64", "v.f64", "f.f64"))
+
+
+def test_late_readings_are_merged_in_order(tmp_path, caplog) -> None:
+    store = LevelStore(str(tmp_path))
+    store.append("c0", _readings([0, 1, 3, 6]))
+    view = store.read("c0")
+    with caplog.at_level(logging.WARNING, logger=levelstore.__name__):
+        assert store.append("c0", _readings([2, 5, 6, 7])) == 3
+    assert "2 late readings" in caplog.text
+    levels = store.read("c0")
+    assert levels.t.tolist() == _us([0, 1, 2, 3, 5, 6, 7])
+    assert levels.v.tolist() == [0.0, 1.0, 2.0, 3.0, 5.0, 6.0, 7.0]
+    assert store.columns("c0")[2].tolist() == [0.0, 0.1, 0.2, 0.3, 0.5, 0.6, 0.7]
+    # Views handed out before the rewrite still read the old columns.
+    assert view.t.tolist() == _us([0, 1, 3, 6])
+    assert store.append("c0", _readings([1, 5])) == 0
+
+
+def _rows(minutes):
+    return [{"timestamp": (START + timedelta(minutes=m)).isoformat() + "Z", "volume": float(m)} for m in minutes]
+
+
+def test_sync_rebuilds_behind_cauldrons_and_ingest_keeps_up(db, tmp_path, monkeypatch) -> None:
+    store = LevelStore(str(tmp_path))
+    with db() as session:
+        for cid in ("c0", "c1"):
+            queries.upsert_cauldron(session, {"id": cid, "name": cid, "maxVolume": 1000, "fillRate": 0.9})
+        queries.record_levels(session, "c0", _rows(range(0, 20, 2)))
+        queries.record_levels(session, "c1", _rows(range(5)))
+    store.append("c1", _readings(range(5)))
+    with db() as session:
+        # c0 was never built; c1 is current.
+        assert levelstore.sync(session, store) == {"c0": 10}
+        assert levelstore.sync(session, store) == {}
+
+    monkeypatch.setattr(queries, "level_store", store)
+    with db() as session:
+        queries.record_levels(session, "c0", _rows([1, 7, 20]))
+    with db() as session:
+        sql = queries.load_level_arrays(session, ["c0"])["c0"]
+    assert _stamps(store) == sql.t.tolist()
+    assert store.read("c0").v.tolist() == sql.v.tolist()
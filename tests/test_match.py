@@ -0,0 +1,157 @@
+"""The indexed matcher against the original linear scan, and incremental match persistence."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.app import app
+from backend.core import queries
+from backend.core.models import DrainEvent, MatchRecord
+from backend.logic import audit as audit_logic
+from backend.logic import match
+from tests.legacy import match_run
+
+
+def _payload(rng: random.Random) -> Dict:
+    cauldrons = [f"C{i}" for i in range(rng.randint(1, 6))]
+    # Whole-litre volumes from a narrow range, so equal distances and tie-breaks are common.
+    drains = [
+        {"id": f"d{i}", "cauldron_id": rng.choice(cauldrons), "true_volume": float(rng.randint(20, 60))}
+        for i in range(rng.randint(0, 40))
+    ]
+    tickets = [
+        {
+            "id": f"T{i}",
+            "volume": float(rng.randint(20, 60)) + rng.choice([0.0, 0.5]),
+            # No cauldron, a cauldron with no drains, or one whose pool may run dry first.
+            "cauldron_id": rng.choice([None, "C99", *cauldrons]),
+        }
+        for i in range(rng.randint(0, 50))
+    ]
+    return {"tickets": tickets, "drain_events": drains}
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_greedy_run_matches_legacy(seed: int) -> None:
+    payload = _payload(random.Random(seed))
+    assert match.run(payload) == match_run(payload)
+
+
+def test_tickets_fall_back_to_global_drains() -> None:
+    payload = {
+        "tickets": [
+            {"id": "T1", "volume": 50.0, "cauldron_id": "C1"},
+            {"id": "T2", "volume": 50.0, "cauldron_id": "C1"},
+            {"id": "T3", "volume": 40.0, "cauldron_id": None},
+            {"id": "T4", "volume": 40.0, "cauldron_id": "C1"},
+        ],
+        "drain_events": [
+            {"id": "a", "cauldron_id": "C1", "true_volume": 10.0},
+            {"id": "b", "cauldron_id": "C2", "true_volume": 50.0},
+            {"id": "c", "cauldron_id": "C2", "true_volume": 41.0},
+        ],
+    }
+    result = match.run(payload)
+    assert result == match_run(payload)
+    # T1 takes its own cauldron's drain however far off; T2 then falls back to the closest anywhere.
+    assert [(m["ticket_id"], m["drain_event_id"]) for m in result["matches"]] == [("T1", "a"), ("T2", "b"), ("T3", "c")]
+    assert result["unmatched_tickets"] == ["T4"]
+
+
+def _add_world(session, rng: random.Random, tickets: range, drains: range) -> None:
+    now = datetime.utcnow().replace(microsecond=0)
+    for i in range(3):
+        queries.upsert_cauldron(session, {"id": f"c{i}", "name": f"C{i}", "maxVolume": 1000, "fillRate": 0.9})
+    for i in tickets:
+        scheduled = (now - timedelta(hours=i % 48)).isoformat()
+        ticket = {"ticketId": f"T{i:03d}", "volume": float(rng.randint(20, 120)), "date": scheduled}
+        if rng.random() < 0.8:
+            ticket["cauldronId"] = f"c{rng.randrange(3)}"
+        queries.upsert_ticket(session, ticket)
+    events = [
+        {
+            "cauldron_id": f"c{rng.randrange(3)}",
+            "t_end": (now - timedelta(minutes=7 * i)).isoformat() + "Z",
+            "true_volume": float(rng.randint(20, 120)),
+        }
+        for i in drains
+    ]
+    session.flush()
+    queries.record_drain_events(session, events, reason="test")
+
+
+def _stored(session):
+    return set(session.execute(select(MatchRecord.id, MatchRecord.ticket_id, MatchRecord.drain_event_id)).all())
+
+
+def _audited(session):
+    """What /tools/audit computed from scratch before findings were materialized."""
+
+    matches = session.execute(select(MatchRecord).order_by(MatchRecord.created_at, MatchRecord.id)).scalars()
+    drains = session.execute(select(DrainEvent)).scalars()
+    payload = {
+        "drain_events": [
+            {"id": str(d.id), "cauldron_id": d.cauldron_id, "true_volume": float(d.estimated_loss or 0.0)} for d in drains
+        ],
+        "matches": [
+            {
+                "ticket_id": m.ticket.ticket_code if m.ticket else "unknown",
+                "drain_event_id": str(m.drain_event_id) if m.drain_event_id else "unknown",
+                "diff_volume": m.discrepancy or 0.0,
+            }
+            for m in matches
+        ],
+    }
+    return audit_logic.run(payload)["findings"]
+
+
+def test_incremental_match_reruns_keep_settled_rows(db) -> None:
+    rng = random.Random(7)
+    client = TestClient(app)
+    with db() as session:
+        _add_world(session, rng, range(0, 20), range(0, 15))
+    client.post("/tools/match", json={})
+    with db() as session:
+        first = _stored(session)
+    assert len(first) == 15
+    client.post("/tools/match", json={})
+    with db() as session:
+        assert _stored(session) == first
+
+    with db() as session:
+        _add_world(session, rng, range(20, 30), range(15, 40))
+    client.post("/tools/match", json={})
+    with db() as session:
+        second = _stored(session)
+    assert first < second
+    assert len(second) == 30
+    assert len({row.ticket_id for row in second}) == len({row.drain_event_id for row in second}) == 30
+    client.post("/tools/match", json={})
+    with db() as session:
+        assert _stored(session) == second
+
+
+def test_audit_findings_follow_match_writes(db) -> None:
+    rng = random.Random(8)
+    client = TestClient(app)
+    with db() as session:
+        _add_world(session, rng, range(0, 25), range(0, 20))
+    client.post("/tools/match", json={})
+    with db() as session:
+        _add_world(session, rng, range(25, 40), range(20, 40))
+    client.post("/tools/match", json={"mode": "optimal"})
+    with db() as session:
+        expected = _audited(session)
+    assert expected
+    assert client.post("/tools/audit", params={"log": False}).json()["findings"] == expected
+
+    client.post("/tools/match", json={"rebuild": True})
+    with db() as session:
+        expected = _audited(session)
+    assert client.post("/tools/audit", params={"log": False}).json()["findings"] == expected
@@ -0,0 +1,131 @@
+"""Write and read paths of backend.core.queries against a real database."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from backend.core import queries
+from backend.core.db import init_db
+from backend.core.models import CauldronLatest, DrainEvent, SlopeState
+from backend.logic import trend as trend_logic
+
+
+def _cauldrons(session, count: int = 2) -> None:
+    for i in range(count):
+        queries.upsert_cauldron(session, {"id": f"c{i}", "name": f"C{i}", "maxVolume": 1000, "fillRate": 0.9})
+    session.flush()
+
+
+def _drain_events(rng: random.Random, count: int):
+    start = datetime(2025, 1, 1)
+    events = []
+    for _ in range(count):
+        t_end = start + timedelta(minutes=rng.randint(0, 30))
+        event = {"cauldron_id": rng.choice(["c0", "c1"]), "t_end": t_end.isoformat() + "Z", "true_volume": 5.0}
+        if rng.random() < 0.5:
+            event["t_start"] = (t_end - timedelta(minutes=rng.randint(5, 10))).isoformat() + "Z"
+        events.append(event)
+    return events
+
+
+def _stored_drains(session):
+    return set(session.execute(select(DrainEvent.cauldron_id, DrainEvent.started_at, DrainEvent.detected_at)).all())
+
+
+def test_drain_events_are_stored_once_per_natural_key(db) -> None:
+    rng = random.Random(4)
+    events = _drain_events(rng, 200)
+    expected = {
+        (
+            event["cauldron_id"],
+            datetime.fromisoformat((event.get("t_start") or event["t_end"]).rstrip("Z")),
+            datetime.fromisoformat(event["t_end"].rstrip("Z")),
+        )
+        for event in events
+    }
+    with db() as session:
+        _cauldrons(session)
+        inserted = queries.record_drain_events(session, events, reason="test")
+    with db() as session:
+        assert inserted == len(expected)
+        assert _stored_drains(session) == expected
+        # Re-detecting the same windows, missing starts included, stores nothing new.
+        assert queries.record_drain_events(session, events, reason="test") == 0
+        assert queries.record_drain_events(session, rng.sample(events, 50), reason="test") == 0
+    with db() as session:
+        assert _stored_drains(session) == expected
+
+
+def _levels(rng: random.Random, minutes: int):
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "timestamp": (start + timedelta(minutes=i)).isoformat() + "Z",
+            "volume": round(rng.uniform(0, 1000), 2),
+            "fill_percent": round(rng.uniform(0, 100), 2),
+        }
+        for i in range(minutes)
+    ]
+
+
+def test_level_ingest_is_idempotent_across_overlapping_batches(db) -> None:
+    rng = random.Random(20)
+    rows = _levels(rng, 500)
+    # Feeds that re-send overlapping windows, with repeats inside a batch too.
+    batches = []
+    for start in range(0, 500, 60):
+        batch = rows[max(0, start - 30) : start + 60]
+        batches.append(batch + rng.sample(batch, 10))
+    with db() as session:
+        _cauldrons(session, 1)
+        inserted = sum(
+            queries.ingest_levels(session, {"c0": batch}, chunk=rng.randint(1, 40))["inserted"] for batch in batches
+        )
+    with db() as session:
+        assert inserted == len(rows)
+        assert queries.ingest_levels(session, {"c0": rows}, chunk=7) == {
+            "inserted": 0,
+            "duplicates": len(rows),
+            "invalid": 0,
+        }
+        series = queries.load_level_arrays(session, ["c0"])["c0"]
+        assert series.v.tolist() == [row["volume"] for row in rows]
+        latest = session.get(CauldronLatest, "c0")
+        assert (latest.volume, latest.fill_percent) == (rows[-1]["volume"], rows[-1]["fill_percent"])
+        expected = trend_logic.update_many(
+            None, [(datetime.fromisoformat(row["timestamp"].rstrip("Z")), row["volume"]) for row in rows]
+        )
+        state = queries.slope_states(session, ["c0"])["c0"]
+        assert state.keys() == expected.keys()
+        for key, value in expected.items():
+            assert state[key] == pytest.approx(value)
+
+
+def test_init_db_refolds_slope_state_from_stored_levels(db) -> None:
+    rows = _levels(random.Random(14), 50)
+    with db() as session:
+        _cauldrons(session, 1)
+        queries.record_levels(session, "c0", rows[:-1])
+    with db() as session:
+        # A database from before the trend state: only readings ingested since are folded in.
+        session.execute(delete(SlopeState))
+    with db() as session:
+        queries.record_levels(session, "c0", rows[-1:])
+    with db() as session:
+        assert queries.slope_states(session)["c0"]["n"] == 1
+
+    init_db()
+    expected = None
+    for row in rows:
+        expected = trend_logic.update(expected, datetime.fromisoformat(row["timestamp"].rstrip("Z")), row["volume"])
+    with db() as session:
+        state = queries.slope_states(session)["c0"]
+        assert state.keys() == expected.keys()
+        for key, value in expected.items():
+            assert state[key] == pytest.approx(value)
+        assert session.get(SlopeState, "c0").observed_at == datetime(2025, 1, 1, 0, 49)
+        assert queries.backfill_slope_states(session) == 0
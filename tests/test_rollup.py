@@ -0,0 +1,67 @@
+"""Level rollups, raw retention and reads that outlive purged levels."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from backend.app import app
+from backend.core import queries, rollup
+from backend.core.models import CauldronLevel
+
+START = datetime(2025, 1, 1)
+
+
+def _ingest(session, minutes: range, cauldron_id: str = "c0") -> None:
+    rows = [{"timestamp": (START + timedelta(minutes=m)).isoformat() + "Z", "volume": float(m)} for m in minutes]
+    queries.record_levels(session, cauldron_id, rows)
+    session.flush()
+
+
+def _stamps(session):
+    return session.execute(select(CauldronLevel.observed_at).order_by(CauldronLevel.observed_at)).scalars().all()
+
+
+def test_purge_only_deletes_rolled_up_levels(db) -> None:
+    now = START + timedelta(days=3)
+    with db() as session:
+        queries.upsert_cauldron(session, {"id": "c0", "name": "C0", "maxVolume": 1000, "fillRate": 0.9})
+        _ingest(session, range(0, 120))
+        # The newest rolled-up level stays, so later ids keep counting up past the watermark.
+        assert rollup.compact(session, now=now, retention_days=1)["purged"] == 119
+    with db() as session:
+        # Old enough to purge, but ingested after the last compaction.
+        _ingest(session, range(120, 180))
+        assert rollup.purge_raw(session, now=now, retention_days=1) == 0
+        assert len(_stamps(session)) == 61
+    with db() as session:
+        counts = rollup.compact(session, now=now, retention_days=1)
+        assert (counts["levels"], counts["purged"]) == (60, 60)
+        assert _stamps(session) == [START + timedelta(minutes=179)]
+        hourly = rollup.load_level_series(session, ["c0"], resolution_s=3600, how="max")["c0"]
+        assert hourly.v.tolist() == [59.0, 119.0, 179.0]
+
+
+def test_forecast_after_raw_levels_are_purged(db) -> None:
+    with db() as session:
+        for cid in ("c0", "c1"):
+            queries.upsert_cauldron(session, {"id": cid, "name": cid, "maxVolume": 1000, "fillRate": 0.9})
+        _ingest(session, range(0, 30))
+        _ingest(session, range(30, 31), "c1")
+        rollup.compact(session, now=START + timedelta(days=3), retention_days=1)
+    with db() as session:
+        assert session.execute(select(func.count()).where(CauldronLevel.cauldron_id == "c0")).scalar() == 0
+    client = TestClient(app)
+    single = client.post("/tools/forecast", json={"cauldron_id": "c0"})
+    batch = client.post("/tools/forecast/batch", json={"cauldron_ids": ["c0"]})
+    assert single.status_code == batch.status_code == 200
+    assert single.json()["cauldron_id"] == batch.json()["forecasts"][0]["cauldron_id"] == "c0"
+
+
+def test_detect_only_persists_minute_resolution(db) -> None:
+    client = TestClient(app)
+    assert client.post("/tools/detect", json={"resolution_s": 900}).status_code == 400
+    assert client.post("/tools/detect", json={"resolution_s": 900, "persist": False}).status_code == 200
+    assert client.post("/tools/detect", json={"resolution_s": 60}).status_code == 200
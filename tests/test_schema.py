@@ -0,0 +1,63 @@
+"""init_db on a database that an older release created."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, select, text
+
+from backend.core import queries
+from backend.core.db import Base, engine, init_db, session_scope
+from backend.core.models import CauldronLevel, DrainEvent, MatchRecord
+
+BASELINE = (Path(__file__).parent / "baseline_schema.sql").read_text()
+
+_ROWS = """
+INSERT INTO cauldrons VALUES ('c0', 'C0', NULL, 1000, 0.9, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO levels VALUES (1, 'c0', '2025-01-01 00:00:00.000000', 10, 1, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO levels VALUES (2, 'c0', '2025-01-01 00:00:00.000000', 10, 1, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO levels VALUES (3, 'c0', '2025-01-01 00:01:00.000000', 12, 1.2, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO drain_events VALUES (1, 'c0', '2025-01-01 00:30:00.000000', 5, 'logic_detect', 0.8, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO drain_events VALUES (2, 'c0', '2025-01-01 00:30:00.000000', 5, 'logic_detect', 0.8, '{}', '2025-01-01', '2025-01-01');
+INSERT INTO matches VALUES (1, 'c0', NULL, 2, 'matched', 0, 0.9, NULL, '{}', '2025-01-01', '2025-01-01');
+"""
+
+
+@pytest.fixture
+def baseline_db():
+    """The first release's schema with a few rows, including duplicates its lack of unique keys allowed."""
+
+    Base.metadata.drop_all(bind=engine)
+    raw = engine.raw_connection()
+    try:
+        raw.executescript(BASELINE + _ROWS)
+    finally:
+        raw.close()
+    try:
+        yield
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+def test_init_db_upgrades_a_baseline_database(baseline_db) -> None:
+    init_db()
+    init_db()  # and is a no-op the second time
+
+    indexes = {index["name"] for table in Base.metadata.sorted_tables for index in inspect(engine).get_indexes(table.name)}
+    assert {index.name for table in Base.metadata.sorted_tables for index in table.indexes} <= indexes
+    with session_scope() as session:
+        levels = session.execute(select(CauldronLevel.id, CauldronLevel.observed_at).order_by(CauldronLevel.id)).all()
+        assert [row.id for row in levels] == [1, 3]
+        assert queries.slope_states(session)["c0"]["n"] == 2
+        drains = session.execute(select(DrainEvent.id, DrainEvent.started_at, DrainEvent.detected_at)).all()
+        assert drains == [(1, datetime(2025, 1, 1, 0, 30), datetime(2025, 1, 1, 0, 30))]
+        assert session.execute(select(MatchRecord.drain_event_id)).scalar_one() == 1
+
+    with session_scope() as session:
+        rows = [{"timestamp": "2025-01-01T00:01:00Z", "volume": 12.0}, {"timestamp": "2025-01-01T00:02:00Z", "volume": 14.0}]
+        assert queries.ingest_levels(session, {"c0": rows})["inserted"] == 1
+        event = {"cauldron_id": "c0", "t_end": "2025-01-01T00:30:00Z", "true_volume": 5.0}
+        assert queries.record_drain_events(session, [event], reason="logic_detect") == 0
+        assert session.execute(text("SELECT COUNT(*) FROM drain_events")).scalar() == 1
@@ -0,0 +1,74 @@
+"""LevelSeries against the datetime and ISO-string handling it replaced."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.logic import detect
+from backend.logic.forecast import _learn_slope
+from backend.logic.series import LevelSeries
+
+
+def _readings(rng: random.Random, n: int, aware: bool):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc if aware else None)
+    stamps, t = [], start
+    for _ in range(n):
+        # Whole minutes mostly, some sub-second offsets.
+        t += timedelta(minutes=rng.randint(0, 3), microseconds=rng.choice([0, 0, 0, rng.randint(1, 999_999)]))
+        stamps.append(t)
+    return stamps, [round(rng.uniform(0, 1000), 2) for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_iso_and_points_round_trip(seed: int) -> None:
+    rng = random.Random(seed)
+    aware = bool(seed % 2)
+    stamps, volumes = _readings(rng, rng.randint(0, 50), aware)
+    series = LevelSeries.from_datetimes(stamps, volumes)
+    expected = [ts.isoformat().replace("+00:00", "Z") for ts in stamps]
+    assert series.iso() == expected
+    assert series.datetimes() == stamps
+    again = LevelSeries.from_points(series.points())
+    assert again.t.tolist() == series.t.tolist()
+    assert again.v.tolist() == volumes
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_between_and_resample_match_plain_python(seed: int) -> None:
+    rng = random.Random(seed)
+    stamps, volumes = _readings(rng, rng.randint(1, 80), aware=False)
+    series = LevelSeries.from_datetimes(stamps, volumes)
+    lo, hi = sorted(rng.sample(stamps, 2)) if len(stamps) > 1 else (stamps[0], None)
+    window = series.between(lo, hi)
+    assert window.datetimes() == [ts for ts in stamps if ts >= lo and (hi is None or ts < hi)]
+    assert np.shares_memory(window.t, series.t) or not len(window)
+
+    step = rng.choice([60, 300, 900])
+    buckets = {}
+    for ts, volume in zip(stamps, volumes):
+        start = datetime(1970, 1, 1) + timedelta(seconds=(ts - datetime(1970, 1, 1)).total_seconds() // step * step)
+        buckets.setdefault(start, []).append(volume)
+    for how, pick in (("last", lambda vs: vs[-1]), ("mean", lambda vs: sum(vs) / len(vs)), ("max", max), ("min", min)):
+        resampled = series.resample(step, how)
+        assert resampled.datetimes() == list(buckets)
+        assert resampled.v.tolist() == pytest.approx([pick(vs) for vs in buckets.values()])
+
+
+def test_logic_gives_the_same_answers_for_series_and_points() -> None:
+    rng = random.Random(16)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    volume, points = 300.0, []
+    for i in range(600):
+        volume = max(0.0, volume - rng.uniform(2, 8) if i % 90 < 12 else volume + 0.9)
+        points.append([(start + timedelta(minutes=i)).isoformat().replace("+00:00", "Z"), round(volume, 2)])
+    series = LevelSeries.from_points(points)
+
+    from_points = detect.run({"series": [{"cauldron_id": "c", "r_fill": 0.9, "points": points}]})
+    from_series = detect.run({"series": [{"cauldron_id": "c", "r_fill": 0.9, "levels": series}]})
+    assert from_series == from_points
+    assert from_points["drain_events"]
+    assert _learn_slope(series, 0.0) == pytest.approx(_learn_slope(points, 0.0))
@@ -0,0 +1,138 @@
+"""The /state endpoints: overview versions and deltas, and list paging."""
+
+from __future__ import annotations
+
+import copy
+import random
+from datetime import datetime
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.app import app
+from backend.core import queries
+from backend.core.models import Ticket
+from backend.state import delta
+
+
+def _apply(state: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """What the dashboard does with a delta (applyDelta in frontend/lib/api.ts)."""
+
+    out = dict(state)
+    for section, value in changes.items():
+        key = delta.SECTION_KEYS.get(section)
+        if key is None:
+            out[section] = value
+            continue
+        rows = {row[key]: row for row in state.get(section) or []}
+        rows.update((row[key], row) for row in value["rows"])
+        out[section] = [rows[row_id] for row_id in value["ids"]]
+    return out
+
+
+def _random_overview(rng: random.Random) -> Dict[str, Any]:
+    overview: Dict[str, Any] = {
+        "summary": {"avg_fill": rng.choice([None, rng.uniform(0, 100)]), "alerts": rng.randint(0, 3)},
+        "network": {"nodes": rng.randint(0, 5)},
+    }
+    for section, key in delta.SECTION_KEYS.items():
+        ids = rng.sample(range(30), rng.randint(0, 12))
+        overview[section] = [{key: i, "value": rng.randint(0, 3)} for i in ids]
+    return overview
+
+
+def _mutate(rng: random.Random, overview: Dict[str, Any]) -> Dict[str, Any]:
+    new = copy.deepcopy(overview)
+    for section, key in delta.SECTION_KEYS.items():
+        rows = new[section]
+        if rows and rng.random() < 0.5:
+            rows.pop(rng.randrange(len(rows)))
+        for row in rows:
+            if rng.random() < 0.2:
+                row["value"] += 1
+        if rng.random() < 0.5:
+            rows.insert(rng.randint(0, len(rows)), {key: 100 + rng.randint(0, 50), "value": 0})
+        if rng.random() < 0.2:
+            rng.shuffle(rows)
+    if rng.random() < 0.5:
+        new["summary"]["alerts"] += 1
+    return new
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_delta_round_trip(seed: int) -> None:
+    rng = random.Random(seed)
+    old = _random_overview(rng)
+    new = _mutate(rng, old)
+    changes = delta.diff(old, new)
+    assert _apply(old, changes) == new
+    assert set(changes) <= {section for section in new if new[section] != old.get(section)}
+
+
+def test_overview_since_cursor_rebuilds_the_full_overview(db) -> None:
+    client = TestClient(app)
+    with db() as session:
+        queries.upsert_cauldron(session, {"id": "c0", "name": "C0", "maxVolume": 1000, "fillRate": 0.9})
+    first = client.get("/state/overview")
+    state, cursor = first.json(), first.headers["etag"].strip('"')
+    for minute in range(3):
+        with db() as session:
+            queries.record_levels(session, "c0", [{"timestamp": f"2025-01-01T00:0{minute}:00Z", "volume": 10.0 * minute}])
+            queries.log_agent_trace(session, agent="test", action=f"a{minute}", input_payload={}, output_payload={}, tags=[])
+        response = client.get("/state/overview", params={"since": cursor})
+        body = response.json()
+        assert body["full"] is False
+        state = _apply(state, body["changes"])
+        assert state == client.get("/state/overview").json()
+        cursor = body["cursor"]
+
+
+def test_overview_etag_survives_read_only_polls(db) -> None:
+    client = TestClient(app)
+    with db() as session:
+        queries.upsert_cauldron(session, {"id": "c0", "name": "C0", "maxVolume": 1000, "fillRate": 0.9})
+        queries.record_levels(session, "c0", [{"timestamp": "2025-01-01T00:00:00Z", "volume": 10.0}])
+    etag = client.get("/state/overview").headers["etag"]
+
+    # What the dashboard fetches alongside the overview.
+    assert client.post("/tools/audit", params={"log": False}).status_code == 200
+    assert client.post("/tools/forecast/batch", params={"log": False}, json={"cauldron_ids": ["c0"]}).status_code == 200
+    assert client.get("/state/overview", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/tools/forecast/batch", json={"cauldron_ids": ["c0"]})
+    changed = client.get("/state/overview", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["agent_trace"][0]["action"] == "forecast_batch"
+
+
+def _walk(client: TestClient, path: str, limit: int):
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get(path, params=params).json()
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 50])
+def test_keyset_pages_match_one_ordered_query(db, limit: int) -> None:
+    rng = random.Random(limit)
+    days = [None, "2025-01-01T00:00:00", "2025-01-02T00:00:00", "2025-01-03T00:00:00"]
+    with db() as session:
+        queries.upsert_cauldron(session, {"id": "c0", "name": "C0", "maxVolume": 1000, "fillRate": 0.9})
+        for i in range(40):
+            # Few distinct sort keys and some NULLs, so pages split ties and the undated tail.
+            queries.upsert_ticket(session, {"ticketId": f"T{i:02d}", "cauldronId": "c0", "date": rng.choice(days)})
+    with db() as session:
+        rows = session.execute(select(Ticket.id, Ticket.ticket_code, Ticket.scheduled_for)).all()
+    # The unpaged order: newest first, undated last, ties newest id first.
+    rows = sorted(rows, key=lambda row: row.id, reverse=True)
+    rows.sort(key=lambda row: row.scheduled_for or datetime.min, reverse=True)
+    expected = [row.ticket_code for row in rows]
+    assert [item["ticket_code"] for item in _walk(TestClient(app), "/state/tickets", limit)] == expected
@@ -0,0 +1,92 @@
+"""The overview stream: what each event carries and how it fans out."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import queries
+from backend.core.db import session_scope
+from backend.state import router
+from backend.state.stream import Broadcaster, _Subscriber
+
+
+def _seed(db) -> None:
+    with db() as session:
+        for i in range(5):
+            cid = f"c{i}"
+            queries.upsert_cauldron(session, {"id": cid, "name": cid, "maxVolume": 1000, "fillRate": 0.9})
+            rows = [{"timestamp": f"2025-01-01T00:{m:02d}:00Z", "volume": 100.0 + i + m} for m in range(20)]
+            queries.record_levels(session, cid, rows)
+
+
+def test_stream_snapshot_carries_overview_findings_and_forecasts(db) -> None:
+    _seed(db)
+    client = TestClient(app)
+    with db() as session:
+        etag, body = router._stream_snapshot(session)
+    event = json.loads(body)
+    response = client.get("/state/overview")
+    assert etag == response.headers["etag"]
+
+    findings, forecasts = event.pop("findings"), event.pop("forecasts")
+    assert event == response.json()
+    assert findings == client.post("/tools/audit", params={"log": False}).json()["findings"]
+    targets = {"cauldron_ids": ["c0", "c1", "c2"], "horizon_minutes": router.STREAM_HORIZON}
+    assert forecasts == client.post("/tools/forecast/batch", params={"log": False}, json=targets).json()["forecasts"]
+
+    # Building it wrote nothing, so the next event only comes with a real change.
+    with db() as session:
+        assert router._stream_snapshot(session) == (etag, body)
+
+
+def test_a_slow_subscriber_only_gets_the_newest_snapshot() -> None:
+    async def scenario():
+        subscriber = _Subscriber()
+        for version in range(3):
+            subscriber.offer((f'"{version}"', b"{}"))
+        assert await subscriber.next(0.1) == ('"2"', b"{}")
+        assert await subscriber.next(0.01) is None
+
+    asyncio.run(scenario())
+
+
+def test_one_overview_build_per_change_for_every_subscriber(db, monkeypatch) -> None:
+    _seed(db)
+    builds = []
+
+    def build_state_overview(session):
+        builds.append(1)
+        return queries.build_state_overview(session)
+
+    monkeypatch.setattr(router, "build_state_overview", build_state_overview)
+    broadcaster = Broadcaster(router._stream_snapshot)
+
+    async def scenario():
+        streams = [broadcaster.subscribe() for _ in range(3)]
+        first = [await anext(stream) for stream in streams]
+        assert len({snapshot[0] for snapshot in first}) == 1
+        assert len(builds) == 1
+        with session_scope() as session:
+            queries.record_levels(session, "c0", [{"timestamp": "2025-01-01T00:30:00Z", "volume": 500.0}])
+        second = [await asyncio.wait_for(anext(stream), 5) for stream in streams]
+        assert len({snapshot[0] for snapshot in second}) == 1
+        assert second[0][0] != first[0][0]
+        assert json.loads(second[0][1])["cauldrons"][0]["volume"] == 500.0
+        assert len(builds) == 2
+        # A reconnect that already has the current version waits for the next one.
+        resumed = broadcaster.subscribe(second[0][0])
+        try:
+            await asyncio.wait_for(anext(resumed), 0.2)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("resubscribing with the current ETag sent it again")
+        for stream in streams:
+            await stream.aclose()
+
+    asyncio.run(scenario())
+    assert broadcaster.subscribers == 0